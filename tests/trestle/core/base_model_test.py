@@ -16,6 +16,7 @@
 import json
 import pathlib
 from datetime import datetime, timezone, tzinfo
+from typing import List
 from uuid import uuid4
 
 import pytest
@@ -229,6 +230,42 @@ def test_multiple_variable_strip() -> None:
         stripped_catalog_object(uuid=str(uuid4()))
 
 
+def test_stripped_model_type_cache() -> None:
+    """Test stripped model types are created once per class and set of stripped fields."""
+    ospydantic.clear_model_type_cache()
+    first = oscatalog.Catalog.create_stripped_model_type(stripped_fields=['metadata', 'uuid'])
+    second = oscatalog.Catalog.create_stripped_model_type(stripped_fields_aliases=['uuid', 'metadata'])
+    other = oscatalog.Catalog.create_stripped_model_type(stripped_fields=['metadata'])
+    assert first is second
+    assert first is not other
+    cache_info = ospydantic.model_type_cache_info()['stripped']
+    assert cache_info.hits == 1
+    assert cache_info.misses == 2
+
+    wrapper = ospydantic.create_collection_wrapper_type('Roles', List[oscatalog.Role])
+    assert wrapper is ospydantic.create_collection_wrapper_type('Roles', List[oscatalog.Role])
+    assert wrapper.is_collection_container()
+    assert ospydantic.model_type_cache_info()['collection_wrapper'].hits == 1
+
+    ospydantic.clear_model_type_cache()
+    assert ospydantic.model_type_cache_info()['stripped'].currsize == 0
+
+
+def test_oscal_wrapped_json(sample_target_def: ostarget.TargetDefinition) -> None:
+    """Test the wrapped json is that of a wrapper model, whose class is created once."""
+    wrapped_model = sample_target_def._oscal_wrap()
+    assert type(wrapped_model) is type(sample_target_def._oscal_wrap())
+    assert sample_target_def.oscal_wrapped_json(indent=2) == wrapped_model.json(
+        exclude_none=True, by_alias=True, indent=2
+    )
+    assert json.loads(sample_target_def.oscal_wrapped_json()) == json.loads(sample_target_def.oscal_serialize_json())
+
+    roles = ospydantic.create_collection_wrapper_type('Roles', List[oscatalog.Role])(
+        __root__=[oscatalog.Role(id='a', title='A')]
+    )
+    assert json.loads(roles.oscal_wrapped_json('roles')) == {'roles': [{'id': 'a', 'title': 'A'}]}
+
+
 def test_copy_to() -> None:
     """Test the copy to functionality."""
     # Complex variable
@@ -338,3 +375,22 @@ def test_oscal_serialize_json() -> None:
     new_catalog = oscatalog.Catalog.parse_obj(jsoned['catalog'])
 
     assert simple_catalog_obj.metadata.title == new_catalog.metadata.title
+
+
+def test_trusted_construct(sample_target_def: ostarget.TargetDefinition) -> None:
+    """Test building a model from valid data without validation gives the same model as parse_obj."""
+    obj = json.loads(sample_target_def.json(exclude_none=True, by_alias=True))
+    parsed = ostarget.TargetDefinition.parse_obj(obj)
+    constructed = ostarget.TargetDefinition.trusted_construct(obj)
+    assert constructed == parsed
+    assert constructed.json(exclude_none=True, by_alias=True) == parsed.json(exclude_none=True, by_alias=True)
+    assert constructed.__fields_set__ == parsed.__fields_set__
+    assert isinstance(constructed.metadata.last_modified, datetime)
+
+    catalog = oscatalog.Catalog.oscal_read(pathlib.Path('tests/data/json/minimal_catalog.json'))
+    obj = json.loads(catalog.json(exclude_none=True, by_alias=True))
+    assert oscatalog.Catalog.trusted_construct(obj) == catalog
+
+    obj['unknown-field'] = 'value'
+    with pytest.raises(err.TrestleError):
+        oscatalog.Catalog.trusted_construct(obj)
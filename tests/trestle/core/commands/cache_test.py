@@ -0,0 +1,83 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle cache command."""
+import os
+import shutil
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from trestle import cli
+from trestle.core import const
+from trestle.core import generators
+from trestle.core.remote import cache
+from trestle.oscal.catalog import Catalog
+
+
+def test_cache_stats_and_clear(testdata_dir, tmp_trestle_dir, monkeypatch, capsys) -> None:
+    """Test the cache stats and clear subcommands."""
+    monkeypatch.setenv(const.ENV_MODEL_CACHE, 'on')
+    catalog_dir = tmp_trestle_dir / 'catalogs' / 'mycatalog'
+    catalog_dir.mkdir(parents=True)
+    shutil.copyfile(testdata_dir / 'json' / 'minimal_catalog.json', catalog_dir / 'catalog.json')
+    Catalog.oscal_read(catalog_dir / 'catalog.json')
+
+    with patch.object(sys, 'argv', ['trestle', 'cache', 'stats']):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code == 0
+    assert 'model cache (enabled): 1 entries' in capsys.readouterr().out
+
+    with patch.object(sys, 'argv', ['trestle', 'cache', 'clear']):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code == 0
+    assert 'removed 1 entries' in capsys.readouterr().out
+
+
+def test_cache_prune(tmp_trestle_dir, tmp_path_factory, capsys) -> None:
+    """Test the cache prune subcommand evicts the remote cache and the stats subcommand reports it."""
+    catalog_path = tmp_path_factory.mktemp('remote') / 'catalog.json'
+    generators.generate_sample_model(Catalog).oscal_write(catalog_path)
+    cache.FetcherFactory.get_fetcher(tmp_trestle_dir, str(catalog_path), False, False)._update_cache()
+
+    with patch.object(sys, 'argv', ['trestle', 'cache', 'stats']):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code == 0
+    assert 'remote cache: 1 objects in 1 blobs' in capsys.readouterr().out
+
+    with patch.object(sys, 'argv', ['trestle', 'cache', 'prune', '--max-size', '0']):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code == 0
+    out = capsys.readouterr().out
+    assert 'evicted 1 blobs down to 0 bytes' in out
+    assert 'transactions: recovered 0 interrupted commits' in out
+
+
+def test_cache_outside_project(tmp_path) -> None:
+    """Test the cache command fails outside a trestle project."""
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        with patch.object(sys, 'argv', ['trestle', 'cache', 'stats']):
+            with pytest.raises(SystemExit) as pytest_wrapped_e:
+                cli.run()
+            assert pytest_wrapped_e.value.code == 1
+    finally:
+        os.chdir(cwd)
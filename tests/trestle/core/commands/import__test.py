@@ -88,12 +88,17 @@ def test_import_run(tmp_trestle_dir: pathlib.Path, regen: bool) -> None:
     catalog_data.oscal_write(pathlib.Path(catalog_file))
     i = importcmd.ImportCmd()
     args = argparse.Namespace(file=catalog_file, output='imported', verbose=True, regenerate=regen)
-    rc = i._run(args)
+    # the input is parsed only once, and the model written is not read back
+    with patch('trestle.core.base_model.OscalBaseModel.oscal_read') as oscal_read_mock:
+        rc = i._run(args)
+        oscal_read_mock.assert_not_called()
     assert rc == 0
+    imported = trestle.oscal.catalog.Catalog.oscal_read(tmp_trestle_dir / 'catalogs' / 'imported' / 'catalog.json')
+    assert (imported == trestle.oscal.catalog.Catalog.oscal_read(pathlib.Path(catalog_file))) != regen
 
 
-def test_import_run_rollback(tmp_trestle_dir: pathlib.Path) -> None:
-    """Test successful _run() on invalid input with good or failed rollback."""
+def test_import_run_invalid(tmp_trestle_dir: pathlib.Path) -> None:
+    """Test _run() on invalid input fails without writing the model."""
     dup_cat = {
         'catalog': {
             'uuid': '525f94af-8007-4376-8069-aa40179e0f6e',
@@ -121,25 +126,19 @@ def test_import_run_rollback(tmp_trestle_dir: pathlib.Path) -> None:
     dup_file.close()
     j = importcmd.ImportCmd()
     args = argparse.Namespace(file=dup_file_name, output=f'dup-{rand_str}', verbose=True, regenerate=False)
-    # 1. Validation rejects above import, which results in non-zero exit code for import.
+    # 1. Validation rejects above import, which results in non-zero exit code for import, before anything is written.
     rc = j._run(args)
     assert rc > 0
+    assert not (tmp_trestle_dir / 'catalogs' / f'dup-{rand_str}').exists()
     rand_str = ''.join(random.choice(string.ascii_letters) for x in range(16))
-    # 2. ValidateCmd raises run (mocked), so import returns non-zero exit code.
+    # 2. Validation raises (mocked), so import returns non-zero exit code.
     j = importcmd.ImportCmd()
     args = argparse.Namespace(file=dup_file_name, output=f'dup-{rand_str}', verbose=True, regenerate=False)
-    with patch('trestle.core.commands.validate.ValidateCmd._run') as validate_import_mock:
+    with patch('trestle.core.all_validator.AllValidator.find_failure') as validate_import_mock:
         validate_import_mock.side_effect = err.TrestleError('validate run error')
         rc = j._run(args)
         assert rc > 0
-    rand_str = ''.join(random.choice(string.ascii_letters) for x in range(16))
-    # 3. Rollback raises exception, so import returns non-zero exit code:
-    j = importcmd.ImportCmd()
-    args = argparse.Namespace(file=dup_file_name, output=f'dup-{rand_str}', verbose=True, regenerate=False)
-    with patch('trestle.core.models.plans.Plan.rollback') as rollback_mock:
-        rollback_mock.side_effect = [None, err.TrestleError('rollback error')]
-        rc = j._run(args)
-        assert rc > 0
+    assert not (tmp_trestle_dir / 'catalogs' / f'dup-{rand_str}').exists()
 
 
 def test_import_clash_on_output(tmp_trestle_dir: pathlib.Path) -> None:
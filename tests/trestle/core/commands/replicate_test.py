@@ -84,6 +84,23 @@ def test_replicate_cmd(testdata_dir, tmp_trestle_dir, regen) -> None:
     assert (expected_model_instance == rep_model_instance) == (regen == '')
 
 
+def test_replicate_cmd_uuid_seed(testdata_dir, tmp_trestle_dir) -> None:
+    """Test the uuids regenerated with the same seed are the same."""
+    test_utils.ensure_trestle_config_dir(tmp_trestle_dir)
+    _copy_local(testdata_dir / 'split_merge/step4_split_groups_array', 'mycatalog', 'catalog')
+
+    for rep_name, seed in [('rep1', 'seed'), ('rep2', 'seed'), ('rep3', 'other')]:
+        test_args = f'trestle replicate catalog -n mycatalog -o {rep_name} -r --uuid-seed {seed}'.split()
+        with mock.patch.object(sys, 'argv', test_args):
+            assert Trestle().run() == 0
+
+    source = load_distributed(Path('catalogs/mycatalog/catalog.json'))[2]
+    rep1, rep2, rep3 = [Catalog.oscal_read(Path(f'catalogs/{name}/catalog.json')) for name in ['rep1', 'rep2', 'rep3']]
+    assert rep1.uuid != source.uuid
+    assert rep1 == rep2
+    assert rep1.uuid != rep3.uuid
+
+
 def test_replicate_cmd_failures(testdata_dir, tmp_trestle_dir) -> None:
     """Test replicate command failure paths."""
     # prepare trestle project dir with the file
@@ -411,3 +411,41 @@ def test_split_model_at_path_chain_failures(tmp_path, sample_catalog: oscatalog.
         SplitCmd.split_model_at_path_chain(
             sample_catalog, element_paths, catalog_dir, content_type, 0, split_plan, False
         )
+
+
+def test_split_run_commit_failure(
+    tmp_path: pathlib.Path, sample_target_def: ostarget.TargetDefinition, monkeypatch
+) -> None:
+    """Test the original file is put back in place if the files of the split cannot all be moved into place."""
+    test_utils.ensure_trestle_config_dir(tmp_path)
+    target_def_dir: pathlib.Path = tmp_path / 'target-definitions' / 'mytarget'
+    target_def_file: pathlib.Path = target_def_dir / 'target-definition.yaml'
+    target_def_dir.mkdir(exist_ok=True, parents=True)
+    sample_target_def.oscal_write(target_def_file)
+    content = target_def_file.read_text()
+
+    # the rename of the second staged file into place fails
+    staging_root = tmp_path / const.TRESTLE_CONFIG_DIR / const.STAGING_DIR
+    replace = os.replace
+    renames = []
+
+    def failing_replace(src, dst) -> None:
+        if pathlib.Path(src).parent.parent == staging_root:
+            renames.append(dst)
+            if len(renames) == 2:
+                raise OSError('Disk full')
+        replace(src, dst)
+
+    args = argparse.Namespace(file=str(target_def_file), element='target-definition.metadata', verbose=0)
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    with pytest.raises(TrestleError):
+        SplitCmd()._run(args)
+    monkeypatch.undo()
+
+    assert [path.name for path in target_def_dir.iterdir()] == ['target-definition.yaml']
+    assert target_def_file.read_text() == content
+    assert not trash.to_trash_file_path(target_def_file).exists()
+
+    assert SplitCmd()._run(args) == 0
+    assert (target_def_dir / 'target-definition' / 'metadata.yaml').exists()
+    assert trash.to_trash_file_path(target_def_file).read_text() == content
@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests for cli module command validate."""
+import json
 import pathlib
 import shutil
 import sys
@@ -192,3 +193,62 @@ def test_role_refs_validator(name, mode, parent, test_id, code, tmp_trestle_dir:
             cli.run()
         assert pytest_wrapped_e.type == SystemExit
         assert pytest_wrapped_e.value.code == code
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_validation_report(jobs: str, tmp_trestle_dir: pathlib.Path) -> None:
+    """Test every model is validated and reported, with a failure not stopping the validation of other models."""
+    for name, file_name in [('bad_model', 'bad_target_dup_uuid.yaml'), ('good_model', 'good_target.yaml'),
+                            ('broken_model', 'bad_simple.yaml')]:
+        (tmp_trestle_dir / test_utils.TARGET_DEFS_DIR / name).mkdir(exist_ok=True, parents=True)
+        shutil.copyfile(
+            test_data_dir / 'yaml' / file_name,
+            tmp_trestle_dir / test_utils.TARGET_DEFS_DIR / name / 'target-definition.yaml'
+        )
+    report_path = tmp_trestle_dir / 'report.json'
+
+    testcmd = f'trestle validate -a -j {jobs} --report {report_path}'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code == 1
+
+    report = json.loads(report_path.read_text())
+    assert not report['passed']
+    assert report['models'] == 3
+    assert report['failed'] == 2
+    results = {result['model-name']: result for result in report['results']}
+    assert results['good_model']['passed']
+    assert results['bad_model']['failed-validator'] == 'DuplicatesValidator'
+    assert results['broken_model']['error'] is not None
+    assert all(result['model-type'] == 'target-definition' for result in report['results'])
+
+
+def test_validation_manifest(tmp_trestle_dir: pathlib.Path) -> None:
+    """Test only the models changed since they were last validated in the mode are validated again."""
+    for name, file_name in [('bad_model', 'bad_target_dup_uuid.yaml'), ('good_model', 'good_target.yaml')]:
+        (tmp_trestle_dir / test_utils.TARGET_DEFS_DIR / name).mkdir(exist_ok=True, parents=True)
+        shutil.copyfile(
+            test_data_dir / 'yaml' / file_name,
+            tmp_trestle_dir / test_utils.TARGET_DEFS_DIR / name / 'target-definition.yaml'
+        )
+    report_path = tmp_trestle_dir / 'report.json'
+
+    def validate(options: str) -> dict:
+        with patch.object(sys, 'argv', f'trestle validate -a --report {report_path} {options}'.split()):
+            with pytest.raises(SystemExit) as pytest_wrapped_e:
+                cli.run()
+            assert pytest_wrapped_e.value.code == 1
+        report = json.loads(report_path.read_text())
+        outcomes = {result['model-name']: result['passed'] for result in report['results']}
+        assert outcomes == {'bad_model': False, 'good_model': True}
+        return {result['model-name']: result['cached'] for result in report['results']}
+
+    assert validate('') == {'bad_model': False, 'good_model': False}
+    assert validate('') == {'bad_model': True, 'good_model': True}
+    good_file = tmp_trestle_dir / test_utils.TARGET_DEFS_DIR / 'good_model' / 'target-definition.yaml'
+    good_file.write_text(good_file.read_text() + '\n')
+    assert validate('') == {'bad_model': True, 'good_model': False}
+    assert validate('') == {'bad_model': True, 'good_model': True}
+    assert validate('-m duplicates') == {'bad_model': False, 'good_model': False}
+    assert validate('--force') == {'bad_model': False, 'good_model': False}
@@ -0,0 +1,87 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle content_stamps module."""
+
+import pathlib
+
+from trestle.core import const
+from trestle.core.content_stamps import ContentStamps
+from trestle.core.models.actions import CreatePathAction, WriteFileAction
+from trestle.core.models.elements import Element
+from trestle.core.models.file_content_type import FileContentType
+from trestle.oscal.catalog import Catalog, Metadata
+
+
+def _write_catalog(testdata_dir: pathlib.Path, tmp_trestle_dir: pathlib.Path) -> pathlib.Path:
+    catalog = Catalog.oscal_read(testdata_dir / 'json' / 'minimal_catalog.json')
+    catalog_dir = tmp_trestle_dir / 'catalogs' / 'mycatalog'
+    catalog_dir.mkdir(parents=True)
+    catalog_file = catalog_dir / 'catalog.json'
+    catalog.oscal_write(catalog_file)
+    return catalog_file
+
+
+def test_content_stamps_disabled(testdata_dir, tmp_trestle_dir, monkeypatch) -> None:
+    """Test no stamps are recorded unless enabled."""
+    monkeypatch.delenv(const.ENV_CONTENT_STAMPS, raising=False)
+    catalog_file = _write_catalog(testdata_dir, tmp_trestle_dir)
+    assert ContentStamps.for_path(catalog_file) is None
+    assert not (tmp_trestle_dir / const.TRESTLE_CONFIG_DIR / const.CONTENT_STAMPS_DIR).exists()
+
+
+def test_trusted_read(testdata_dir, tmp_trestle_dir, monkeypatch) -> None:
+    """Test trusted reads skip validation only for files matching their stamp."""
+    monkeypatch.setenv(const.ENV_CONTENT_STAMPS, 'true')
+    catalog_file = _write_catalog(testdata_dir, tmp_trestle_dir)
+    stamps = ContentStamps.for_path(catalog_file)
+    assert stamps.count() == 1
+    assert stamps.verify(catalog_file, Catalog)
+    assert not stamps.verify(catalog_file, Metadata)
+
+    constructed = []
+
+    def trusted_construct(obj):
+        constructed.append(obj)
+        return Catalog.construct()
+
+    monkeypatch.setattr(Catalog, 'trusted_construct', trusted_construct)
+    Catalog.oscal_read(catalog_file)
+    assert not constructed
+    Catalog.oscal_read(catalog_file, trusted=True)
+    assert len(constructed) == 1
+
+    # a file edited outside of trestle is validated again
+    catalog_file.write_text(catalog_file.read_text().replace('"title"', '"title" ', 1))
+    assert not stamps.verify(catalog_file, Catalog)
+    catalog = Catalog.oscal_read(catalog_file, trusted=True)
+    assert len(constructed) == 1
+    assert catalog.metadata.title
+
+    assert stamps.clear() == 1
+    assert stamps.count() == 0
+
+
+def test_write_action_records_stamp(testdata_dir, tmp_trestle_dir, monkeypatch) -> None:
+    """Test files written by a plan are stamped."""
+    monkeypatch.setenv(const.ENV_CONTENT_STAMPS, '1')
+    catalog = Catalog.oscal_read(testdata_dir / 'json' / 'minimal_catalog.json')
+    metadata_file = tmp_trestle_dir / 'catalogs' / 'mycatalog' / 'catalog' / 'metadata.json'
+    CreatePathAction(metadata_file).execute()
+    WriteFileAction(metadata_file, Element(catalog.metadata), FileContentType.JSON).execute()
+
+    stamps = ContentStamps.for_path(metadata_file)
+    assert stamps.verify(metadata_file, Metadata)
+    assert Metadata.oscal_read(metadata_file, trusted=True) == catalog.metadata
@@ -0,0 +1,85 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle json_backend module."""
+
+import json
+import pathlib
+
+import pytest
+
+from trestle.core import const
+from trestle.core import json_backend
+from trestle.core.models.elements import Element
+from trestle.oscal.catalog import Catalog
+
+SAMPLE_VALUES = [
+    {
+        'text': 'café \U0001f600 \x7f\x01\n\t"\\ 5e8 ": 1e5',
+        'numbers': [1, -2, 2.5, 1e20, 1e-05, 0.00012, -1.5e-07, 1e16, 2**70],
+        'literals': [True, False, None, [], {}],
+        'nested': {
+            'items': [{
+                'empty': []
+            }, [[1e-07]]]
+        }
+    },
+    [],
+    'plain',
+]
+
+
+@pytest.mark.parametrize('backend', [json_backend.JSON_BACKEND_STDLIB, json_backend.JSON_BACKEND_ORJSON])
+def test_byte_identical(backend: str, monkeypatch) -> None:
+    """Test both backends encode and decode exactly like the json module."""
+    monkeypatch.setenv(const.ENV_JSON_BACKEND, backend)
+    for value in SAMPLE_VALUES:
+        for indent in [None, 1, 2, 4]:
+            assert json_backend.dumps(value, indent=indent) == json.dumps(value, indent=indent)
+        text = json.dumps(value)
+        assert json_backend.loads(text) == json.loads(text)
+        assert json_backend.loads(text.encode()) == json.loads(text)
+
+
+@pytest.mark.parametrize('backend', [json_backend.JSON_BACKEND_STDLIB, json_backend.JSON_BACKEND_ORJSON])
+def test_model_output(backend: str, testdata_dir: pathlib.Path, tmp_path: pathlib.Path, monkeypatch) -> None:
+    """Test the model output does not depend on the backend."""
+    catalog_file = testdata_dir / 'json' / 'minimal_catalog.json'
+    monkeypatch.delenv(const.ENV_JSON_BACKEND, raising=False)
+    catalog = Catalog.oscal_read(catalog_file)
+    expected_file = tmp_path / 'expected.json'
+    catalog.oscal_write(expected_file)
+    expected_element_json = Element(catalog).to_json()
+
+    monkeypatch.setenv(const.ENV_JSON_BACKEND, backend)
+    assert Catalog.oscal_read(catalog_file) == catalog
+    actual_file = tmp_path / 'actual.json'
+    catalog.oscal_write(actual_file)
+    assert actual_file.read_bytes() == expected_file.read_bytes()
+    assert Element(catalog).to_json() == expected_element_json
+
+
+def test_backend_selection(tmp_trestle_dir: pathlib.Path, monkeypatch) -> None:
+    """Test the backend is selected by the environment or the project config."""
+    monkeypatch.delenv(const.ENV_JSON_BACKEND, raising=False)
+    assert json_backend.get_backend() == json_backend.JSON_BACKEND_STDLIB
+
+    config_path = tmp_trestle_dir / const.TRESTLE_CONFIG_DIR / const.TRESTLE_CONFIG_FILE
+    config_path.write_text('[serialization]\njson_backend = orjson\n')
+    expected = json_backend.JSON_BACKEND_ORJSON if json_backend.orjson else json_backend.JSON_BACKEND_STDLIB
+    assert json_backend.get_backend() == expected
+
+    monkeypatch.setenv(const.ENV_JSON_BACKEND, 'unknown')
+    assert json_backend.get_backend() == json_backend.JSON_BACKEND_STDLIB
@@ -0,0 +1,114 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle model_cache module."""
+
+import os
+import pathlib
+import shutil
+import time
+
+from trestle.core import const
+from trestle.core.model_cache import ModelCache, RACY_ENTRY_WINDOW_NS
+from trestle.oscal.catalog import Catalog
+
+
+def _copy_catalog(testdata_dir: pathlib.Path, tmp_trestle_dir: pathlib.Path) -> pathlib.Path:
+    catalog_dir = tmp_trestle_dir / 'catalogs' / 'mycatalog'
+    catalog_dir.mkdir(parents=True)
+    catalog_file = catalog_dir / 'catalog.json'
+    shutil.copyfile(testdata_dir / 'json' / 'minimal_catalog.json', catalog_file)
+    # make the file old enough for its mtime to be trusted
+    old_ns = time.time_ns() - 2 * RACY_ENTRY_WINDOW_NS
+    os.utime(catalog_file, ns=(old_ns, old_ns))
+    return catalog_file
+
+
+def test_model_cache_disabled(testdata_dir, tmp_trestle_dir, monkeypatch) -> None:
+    """Test the cache is only used once enabled."""
+    catalog_file = _copy_catalog(testdata_dir, tmp_trestle_dir)
+    monkeypatch.delenv(const.ENV_MODEL_CACHE, raising=False)
+    assert ModelCache.for_path(catalog_file) is None
+    Catalog.oscal_read(catalog_file)
+    assert not (tmp_trestle_dir / const.TRESTLE_CONFIG_DIR / const.MODEL_CACHE_DIR).exists()
+
+    monkeypatch.setenv(const.ENV_MODEL_CACHE, 'true')
+    assert ModelCache.for_path(catalog_file) is ModelCache.for_path(catalog_file)
+
+
+def test_model_cache_read(testdata_dir, tmp_trestle_dir, monkeypatch) -> None:
+    """Test reads are served from the cache until the file changes."""
+    catalog_file = _copy_catalog(testdata_dir, tmp_trestle_dir)
+    monkeypatch.setenv(const.ENV_MODEL_CACHE, '1')
+    model_cache = ModelCache.for_path(catalog_file)
+    assert model_cache.get(catalog_file, Catalog) is None
+
+    catalog = Catalog.oscal_read(catalog_file)
+    cached = model_cache.get(catalog_file, Catalog)
+    assert cached is not None
+    assert Catalog.parse_obj(cached['catalog']) == catalog
+    assert model_cache.stats()['entries'] == 1
+    assert Catalog.oscal_read(catalog_file) == catalog
+
+    # the cached content was validated when stored, so a hit is built without validation
+    def fail_parse_obj(*args, **kwargs):
+        raise AssertionError('cache hit validated again')
+
+    with monkeypatch.context() as m:
+        m.setattr(Catalog, 'parse_obj', classmethod(fail_parse_obj))
+        assert Catalog.oscal_read(catalog_file) == catalog
+
+    # a different model class has its own entry
+    stripped_type = Catalog.create_stripped_model_type(stripped_fields_aliases=['metadata'])
+    assert model_cache.get(catalog_file, stripped_type) is None
+
+    # rewriting the file with the same size and mtime is still detected through the digest
+    content = catalog_file.read_bytes()
+    file_stat = catalog_file.stat()
+    catalog_file.write_bytes(content.replace(b'"title"', b'"TITLE"', 1))
+    os.utime(catalog_file, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1))
+    assert model_cache.get(catalog_file, Catalog) is None
+    catalog_file.write_bytes(content)
+    os.utime(catalog_file)
+    assert model_cache.get(catalog_file, Catalog) is not None
+
+    assert model_cache.clear() == 1
+    assert model_cache.stats()['entries'] == 0
+    assert model_cache.get(catalog_file, Catalog) is None
+
+
+def test_model_cache_eviction(testdata_dir, tmp_trestle_dir) -> None:
+    """Test the least recently used entries are evicted once the cache is full."""
+    catalog_file = _copy_catalog(testdata_dir, tmp_trestle_dir)
+    content = catalog_file.read_bytes()
+    obj = Catalog.__config__.json_loads(content)
+    model_cache = ModelCache(tmp_trestle_dir, max_size=3 * len(content))
+
+    paths = []
+    for i in range(5):
+        path = catalog_file.with_name(f'catalog{i}.json')
+        path.write_bytes(content)
+        model_cache.put(path, Catalog, path.stat(), content, obj)
+        # spread the entry mtimes so the eviction order is deterministic
+        entry_path = model_cache._entry_path(path, Catalog)
+        entry_ns = time.time_ns() - (10 - i) * 1000 * 1000 * 1000
+        os.utime(entry_path, ns=(entry_ns, entry_ns))
+        paths.append(path)
+
+    stats = model_cache.stats()
+    assert stats['size'] <= stats['max_size']
+    assert 0 < stats['entries'] < 5
+    assert model_cache.get(paths[-1], Catalog) is not None
+    assert model_cache.get(paths[0], Catalog) is None
@@ -0,0 +1,46 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle file system overlay module."""
+import pathlib
+
+from trestle.core.models.overlay import DIRECTORY, FILE, FileSystemOverlay
+
+
+def test_overlay(tmp_path: pathlib.Path) -> None:
+    """Test the overlay sees the file system with the paths created and removed over it."""
+    disk_dir = tmp_path / 'disk'
+    disk_dir.mkdir()
+    (disk_dir / 'model.json').touch()
+
+    overlay = FileSystemOverlay()
+    assert overlay.kind(disk_dir) == DIRECTORY
+    assert overlay.kind(disk_dir / 'model.json') == FILE
+    assert not overlay.exists(tmp_path / 'new')
+
+    overlay.create(tmp_path / 'new', DIRECTORY)
+    overlay.create(tmp_path / 'new' / 'model.json', FILE)
+    assert overlay.kind(tmp_path / 'new' / 'model.json') == FILE
+    assert not (tmp_path / 'new').exists()
+
+    overlay.remove(tmp_path / 'new')
+    assert not overlay.exists(tmp_path / 'new' / 'model.json')
+
+    # a directory created again does not hold what was removed with it
+    overlay.remove(disk_dir)
+    overlay.create(disk_dir, DIRECTORY)
+    assert overlay.kind(disk_dir) == DIRECTORY
+    assert not overlay.exists(disk_dir / 'model.json')
+    assert (disk_dir / 'model.json').exists()
@@ -17,9 +17,12 @@
 import pathlib
 from typing import List
 
+import pytest
+
 from tests import test_utils
 
-from trestle.core.models.actions import CreatePathAction, WriteFileAction
+from trestle.core.err import TrestleError
+from trestle.core.models.actions import CreatePathAction, RemovePathAction, WriteFileAction
 from trestle.core.models.elements import Element
 from trestle.core.models.file_content_type import FileContentType
 from trestle.core.models.plans import Plan
@@ -79,3 +82,60 @@ def test_plan_rollback():
 
 def test_plan_rollback_failure():
     """Test unsuccessful rollback of a valid plan."""
+
+
+def test_plan_bulk_execution(tmp_path: pathlib.Path, sample_target_def: target.TargetDefinition) -> None:
+    """Test the bulk execution of a plan writes the same files as a serial execution."""
+    test_utils.ensure_trestle_config_dir(tmp_path)
+    content_type = FileContentType.JSON
+    targets = list(sample_target_def.targets.values())
+
+    def make_plan(base_dir: pathlib.Path) -> Plan:
+        plan = Plan()
+        for index, target_ in enumerate(targets * 10):
+            target_file = base_dir / 'targets' / f'{index:05d}__target.json'
+            plan.add_action(CreatePathAction(target_file))
+            plan.add_action(WriteFileAction(target_file, Element(target_), content_type))
+        metadata_file = base_dir / 'metadata.json'
+        plan.add_action(CreatePathAction(metadata_file, True))
+        plan.add_action(WriteFileAction(metadata_file, Element(sample_target_def.metadata), content_type))
+        # rewrite the metadata once it has been cleared
+        plan.add_action(CreatePathAction(metadata_file, True))
+        plan.add_action(WriteFileAction(metadata_file, Element(sample_target_def.metadata), content_type))
+        return plan
+
+    serial_dir = tmp_path / 'serial'
+    make_plan(serial_dir).execute()
+    bulk_dir = tmp_path / 'bulk'
+    bulk_plan = make_plan(bulk_dir)
+    bulk_plan.execute(parallel=True, max_workers=4)
+
+    serial_files = sorted(path.relative_to(serial_dir) for path in serial_dir.rglob('*'))
+    assert serial_files == sorted(path.relative_to(bulk_dir) for path in bulk_dir.rglob('*'))
+    for rel_path in serial_files:
+        if (serial_dir / rel_path).is_file():
+            assert (serial_dir / rel_path).read_text() == (bulk_dir / rel_path).read_text()
+
+    bulk_plan.rollback()
+    assert not bulk_dir.exists()
+
+
+def test_plan_simulation(tmp_path: pathlib.Path, sample_target_def: target.TargetDefinition) -> None:
+    """Test the simulation of a plan checks its actions without touching the file system."""
+    test_utils.ensure_trestle_config_dir(tmp_path)
+    content_type = FileContentType.JSON
+    metadata_file = tmp_path / 'mytarget' / 'metadata.json'
+
+    plan = Plan()
+    plan.add_action(CreatePathAction(metadata_file))
+    plan.add_action(WriteFileAction(metadata_file, Element(sample_target_def.metadata), content_type))
+    plan.add_action(RemovePathAction(metadata_file))
+    plan.simulate()
+    assert not metadata_file.parent.exists()
+    assert not any(action.has_executed() for action in plan.get_actions())
+
+    # the file written to was removed by the previous action
+    plan.add_action(WriteFileAction(metadata_file, Element(sample_target_def.metadata), content_type))
+    with pytest.raises(TrestleError):
+        plan.simulate()
+    assert not metadata_file.parent.exists()
@@ -0,0 +1,252 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle transaction module."""
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from tests import test_utils
+
+import trestle.core.const as const
+from trestle.core.err import TrestleError
+from trestle.core.models import transaction
+from trestle.core.models.actions import CreatePathAction, RemovePathAction, WriteFileAction
+from trestle.core.models.elements import Element
+from trestle.core.models.file_content_type import FileContentType
+from trestle.core.models.plans import Plan
+from trestle.core.models.transaction import Transaction, recover_transactions
+from trestle.oscal import target
+from trestle.utils import trash
+
+
+def _make_plan(base_dir: pathlib.Path, target_def: target.TargetDefinition) -> Plan:
+    plan = Plan()
+    for tid, target_ in target_def.targets.items():
+        target_file = base_dir / 'targets' / f'{tid}.json'
+        plan.add_action(CreatePathAction(target_file))
+        plan.add_action(WriteFileAction(target_file, Element(target_), FileContentType.JSON))
+    metadata_file = base_dir / 'metadata.json'
+    plan.add_action(CreatePathAction(metadata_file, True))
+    plan.add_action(WriteFileAction(metadata_file, Element(target_def.metadata), FileContentType.JSON))
+    plan.add_action(WriteFileAction(metadata_file, Element(target_def.metadata), FileContentType.JSON))
+    return plan
+
+
+def _make_update_plan(tmp_path: pathlib.Path, target_def: target.TargetDefinition) -> Plan:
+    """Make a plan replacing two files, removing a directory and creating a file in a new directory."""
+    test_utils.ensure_trestle_config_dir(tmp_path)
+    base_dir = tmp_path / 'mytarget'
+    removed_dir = base_dir / 'removed'
+    removed_dir.mkdir(parents=True)
+    (removed_dir / 'part.json').write_text('removed content')
+    first_file = base_dir / 'first.json'
+    first_file.write_text('first content')
+    metadata_file = base_dir / 'metadata.json'
+    metadata_file.write_text('previous content')
+
+    plan = Plan()
+    plan.add_action(CreatePathAction(first_file, True))
+    plan.add_action(WriteFileAction(first_file, Element(target_def.metadata), FileContentType.JSON))
+    plan.add_action(RemovePathAction(removed_dir))
+    new_file = base_dir / 'targets' / 'new.json'
+    plan.add_action(CreatePathAction(new_file))
+    plan.add_action(WriteFileAction(new_file, Element(target_def.metadata), FileContentType.JSON))
+    plan.add_action(CreatePathAction(metadata_file, True))
+    plan.add_action(WriteFileAction(metadata_file, Element(target_def.metadata), FileContentType.JSON))
+    return plan
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_staged_execution(tmp_path: pathlib.Path, sample_target_def: target.TargetDefinition, parallel: bool) -> None:
+    """Test the staged execution of a plan writes the same files as a direct execution, and can be rolled back."""
+    test_utils.ensure_trestle_config_dir(tmp_path)
+    direct_dir = tmp_path / 'direct'
+    _make_plan(direct_dir, sample_target_def).execute()
+
+    staged_dir = tmp_path / 'staged'
+    staged_dir.mkdir()
+    (staged_dir / 'metadata.json').write_text('previous content')
+    staged_plan = _make_plan(staged_dir, sample_target_def)
+    staged_plan.execute(parallel, staged=True)
+
+    direct_files = sorted(path.relative_to(direct_dir) for path in direct_dir.rglob('*'))
+    assert direct_files == sorted(path.relative_to(staged_dir) for path in staged_dir.rglob('*'))
+    for rel_path in direct_files:
+        if (direct_dir / rel_path).is_file():
+            assert (direct_dir / rel_path).read_text() == (staged_dir / rel_path).read_text()
+    staging_root = tmp_path / const.TRESTLE_CONFIG_DIR / const.STAGING_DIR
+    assert not any(staging_root.iterdir())
+
+    staged_plan.rollback()
+    assert not (staged_dir / 'targets').exists()
+    assert (staged_dir / 'metadata.json').read_text() == 'previous content'
+
+
+def test_staged_execution_failure(
+    tmp_path: pathlib.Path, sample_target_def: target.TargetDefinition, monkeypatch
+) -> None:
+    """Test a failure while staging the files of a plan leaves the file system as it was."""
+    test_utils.ensure_trestle_config_dir(tmp_path)
+    base_dir = tmp_path / 'mytarget'
+    base_dir.mkdir()
+    metadata_file = base_dir / 'metadata.json'
+    metadata_file.write_text('previous content')
+
+    plan = _make_plan(base_dir, sample_target_def)
+    plan.add_action(RemovePathAction(metadata_file))
+    # the last element fails to encode, once the other files have been staged
+    failing_write = WriteFileAction(metadata_file, Element(sample_target_def.metadata), FileContentType.JSON)
+    monkeypatch.setattr(failing_write, '_encode', _fail_encode)
+    plan.add_action(CreatePathAction(metadata_file))
+    plan.add_action(failing_write)
+    with pytest.raises(TrestleError):
+        plan.execute(staged=True)
+    assert [path.name for path in base_dir.iterdir()] == ['metadata.json']
+    assert metadata_file.read_text() == 'previous content'
+    assert not any(action.has_executed() for action in plan.get_actions())
+
+
+def test_staged_execution_commit_failure(
+    tmp_path: pathlib.Path, sample_target_def: target.TargetDefinition, monkeypatch
+) -> None:
+    """Test a failure while moving the staged files into place undoes the changes already applied."""
+    plan = _make_update_plan(tmp_path, sample_target_def)
+    base_dir = tmp_path / 'mytarget'
+    removed_dir = base_dir / 'removed'
+    first_file = base_dir / 'first.json'
+    metadata_file = base_dir / 'metadata.json'
+
+    # the rename of the third staged file into place fails, once the first two are in place
+    staging_root = tmp_path / const.TRESTLE_CONFIG_DIR / const.STAGING_DIR
+    replace = os.replace
+    renames = []
+
+    def failing_replace(src, dst) -> None:
+        if pathlib.Path(src).parent.parent == staging_root:
+            renames.append(dst)
+            if len(renames) == 3:
+                raise OSError('Disk full')
+        replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    with pytest.raises(TrestleError):
+        plan.execute(staged=True)
+    monkeypatch.undo()
+
+    assert renames[-1] == metadata_file
+    assert sorted(path.name for path in base_dir.iterdir()) == ['first.json', 'metadata.json', 'removed']
+    assert first_file.read_text() == 'first content'
+    assert metadata_file.read_text() == 'previous content'
+    assert (removed_dir / 'part.json').read_text() == 'removed content'
+    assert not trash.to_trash_path(removed_dir).exists()
+    assert not any(action.has_executed() for action in plan.get_actions())
+    assert not any(staging_root.iterdir())
+
+    # once committed, the path removed is in the trash
+    plan.execute(staged=True)
+    assert not removed_dir.exists()
+    assert trash.to_trash_file_path(removed_dir / 'part.json').read_text() == 'removed content'
+    plan.rollback()
+    assert (removed_dir / 'part.json').read_text() == 'removed content'
+    assert first_file.read_text() == 'first content'
+
+
+class _Crash(BaseException):
+    """Interruption of trestle, e.g. when killed, which runs no exception handler."""
+
+
+def _commit_until_crash(plan: Plan) -> pathlib.Path:
+    """Commit the plan in a transaction interrupted by a crash, and return the staging directory left behind."""
+    transaction = Transaction()
+    for action in plan.get_actions():
+        action.stage(transaction)
+    with pytest.raises(_Crash):
+        transaction.commit()
+    staging_dir = transaction._staging_dir
+    # the process that was committing has stopped
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    (staging_dir / 'owner').write_text(str(process.pid))
+    return staging_dir
+
+
+@pytest.mark.parametrize('n_renames', [0, 1, 2])
+def test_recover_interrupted_commit(
+    tmp_path: pathlib.Path, sample_target_def: target.TargetDefinition, monkeypatch, n_renames: int
+) -> None:
+    """Test the changes of a commit interrupted while moving the staged files into place are undone on recovery."""
+    plan = _make_update_plan(tmp_path, sample_target_def)
+    base_dir = tmp_path / 'mytarget'
+    staging_root = tmp_path / const.TRESTLE_CONFIG_DIR / const.STAGING_DIR
+    replace = os.replace
+    renames = []
+
+    def crashing_replace(src, dst) -> None:
+        if pathlib.Path(src).parent.parent == staging_root:
+            renames.append(dst)
+            if len(renames) > n_renames:
+                raise _Crash()
+        replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', crashing_replace)
+    staging_dir = _commit_until_crash(plan)
+    monkeypatch.undo()
+    assert len(renames) == n_renames + 1
+
+    assert recover_transactions(tmp_path) == 1
+    assert sorted(path.name for path in base_dir.iterdir()) == ['first.json', 'metadata.json', 'removed']
+    assert (base_dir / 'first.json').read_text() == 'first content'
+    assert (base_dir / 'metadata.json').read_text() == 'previous content'
+    assert (base_dir / 'removed' / 'part.json').read_text() == 'removed content'
+    assert not staging_dir.exists()
+    assert recover_transactions(tmp_path) == 0
+
+
+def test_recover_committed_transaction(
+    tmp_path: pathlib.Path, sample_target_def: target.TargetDefinition, monkeypatch
+) -> None:
+    """Test the paths removed by a commit interrupted once done are moved into the trash on recovery."""
+    plan = _make_update_plan(tmp_path, sample_target_def)
+    base_dir = tmp_path / 'mytarget'
+
+    def crash(*args) -> None:
+        raise _Crash()
+
+    monkeypatch.setattr(transaction, '_store_in_trash', crash)
+    staging_dir = _commit_until_crash(plan)
+    monkeypatch.undo()
+    new_content = (base_dir / 'metadata.json').read_text()
+    assert new_content != 'previous content'
+
+    # the staging directory of a running transaction is left alone
+    (staging_dir / 'owner').write_text(str(os.getpid()))
+    assert recover_transactions(tmp_path) == 0
+    assert staging_dir.exists()
+
+    (staging_dir / 'owner').write_text('')
+    os.utime(staging_dir, (0, 0))
+    assert recover_transactions(tmp_path) == 1
+    assert sorted(path.name for path in base_dir.iterdir()) == ['first.json', 'metadata.json', 'targets']
+    assert (base_dir / 'metadata.json').read_text() == new_content
+    assert trash.to_trash_file_path(base_dir / 'removed' / 'part.json').read_text() == 'removed content'
+    assert not staging_dir.exists()
+
+
+def _fail_encode() -> str:
+    raise TrestleError('Unable to encode')
@@ -0,0 +1,70 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle reachability module."""
+
+from typing import Any, List, Optional
+
+import trestle.core.validator_helper as validator_helper
+from trestle.core.base_model import OscalBaseModel
+from trestle.core.generators import generate_sample_model
+from trestle.core.reachability import field_reaches, model_reach
+from trestle.oscal import catalog
+from trestle.oscal import ssp
+
+
+class _Node(OscalBaseModel):
+    title: str
+    nodes: Optional[List['_Node']] = None
+    extra: Any = None
+
+
+_Node.update_forward_refs()
+
+
+def test_field_reaches() -> None:
+    """Test the names and classes reachable within each field follow the declared field types."""
+    reaches = field_reaches(ssp.SystemSecurityPlan)
+    assert not reaches['import_profile'].may_contain_name('role_ids')
+    # the biblio of citations may hold anything
+    assert reaches['back_matter'].is_open
+    assert reaches['system_implementation'].may_contain_name('role_ids')
+    assert reaches['system_implementation'].may_contain_name('role-ids')
+    assert not reaches['uuid'].may_contain_name('uuid')
+    assert reaches['metadata'].may_contain_type(ssp.Party)
+    assert not reaches['import_profile'].may_contain_type(ssp.Party)
+    # only model classes are indexed
+    assert reaches['uuid'].may_contain_type(str)
+
+    # recursive classes reach themselves
+    assert field_reaches(catalog.Part)['parts'].may_contain_type(catalog.Part)
+    assert model_reach(catalog.Catalog).may_contain_name('prose')
+
+    # fields of type Any may hold anything
+    reaches = field_reaches(_Node)
+    assert reaches['extra'].is_open
+    assert not reaches['title'].is_open
+    assert reaches['nodes'].may_contain_name('title')
+
+
+def test_pruned_traversals() -> None:
+    """Test the traversal helpers still find the values of fields found within open fields."""
+    node = _Node(title='a', nodes=[_Node(title='b')], extra={'title': 'c'})
+    assert validator_helper.find_values_by_name_generic(node, 'title') == ['a', 'b', 'c']
+    assert validator_helper.find_values_by_type(node, _Node) == [node]
+
+    cat = generate_sample_model(catalog.Catalog)
+    assert validator_helper.find_values_by_type(cat, catalog.Metadata) == [cat.metadata]
+    assert validator_helper.find_values_by_name(cat, 'role_ids') == []
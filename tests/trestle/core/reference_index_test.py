@@ -0,0 +1,101 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle reference_index module."""
+
+import argparse
+import pathlib
+from uuid import uuid4
+
+import trestle.core.const as const
+import trestle.core.validator_factory as vfact
+from trestle.core.generators import generate_sample_model
+from trestle.core.reference_index import REF_KIND_ROLE, REF_KIND_UUID, ReferenceIndex
+from trestle.oscal import catalog
+from trestle.oscal import poam
+
+
+def test_reference_index_poam() -> None:
+    """Test the references to uuids are resolved to their definition or reported as dangling."""
+    plan = generate_sample_model(poam.PlanOfActionAndMilestones)
+    observation = generate_sample_model(poam.Observation)
+    risk = generate_sample_model(poam.Risk)
+    plan.observations = [observation]
+    plan.risks = [risk]
+    missing_uuid = str(uuid4())
+    plan.poam_items[0].related_observations = [
+        poam.RelatedObservation1(observation_uuid=observation.uuid),
+        poam.RelatedObservation1(observation_uuid=missing_uuid)
+    ]
+    plan.poam_items[0].related_risks = [poam.RelatedRisk(risk_uuid=risk.uuid)]
+
+    index = ReferenceIndex(plan)
+    assert index.uuids[observation.uuid] == '$.observations[0].uuid'
+    assert index.uuids[risk.uuid] == '$.risks[0].uuid'
+    assert len(index.references) == 3
+    assert all(reference.kind == REF_KIND_UUID for reference in index.references)
+    reference = index.references_to(observation.uuid)[0]
+    assert reference.path == '$.poam-items[0].related-observations[0].observation-uuid'
+    assert index.resolve(reference) == '$.observations[0].uuid'
+    dangling = index.dangling()
+    assert len(dangling) == 1
+    assert dangling[0].value == missing_uuid
+    assert dangling[0].path == '$.poam-items[0].related-observations[1].observation-uuid'
+
+    validator = vfact.validator_factory.get(argparse.Namespace(mode=const.VAL_MODE_REFS_FULL))
+    assert not validator.model_is_valid(plan)
+    # dangling references may be to other documents, so they are not checked in the all mode
+    assert vfact.validator_factory.get(argparse.Namespace(mode=const.VAL_MODE_ALL)).model_is_valid(plan)
+    plan.poam_items[0].related_observations.pop()
+    assert validator.model_is_valid(plan)
+
+
+def test_reference_index_roles(testdata_dir: pathlib.Path) -> None:
+    """Test the responsible parties refer to the roles and the parties."""
+    cat = catalog.Catalog.oscal_read(testdata_dir / 'json/minimal_catalog.json')
+    dangling = ReferenceIndex(cat).dangling()
+    assert [(reference.kind, reference.value) for reference in dangling] == [
+        (REF_KIND_ROLE, 'organisation'), (REF_KIND_UUID, '00000000-0000-4000-8000-000000000000')
+    ]
+    assert dangling[1].path == '$.metadata.responsible-parties.organisation.party-uuids[0]'
+
+    cat.metadata.roles = [catalog.Role(id='organisation', title='Organisation')]
+    index = ReferenceIndex(cat)
+    assert index.role_ids == {'organisation': '$.metadata.roles[0].id'}
+    assert index.ids['organisation'] == '$.metadata.roles[0].id'
+    assert len(index.dangling()) == 1
+
+
+def test_reference_index_member_of_organizations(testdata_dir: pathlib.Path) -> None:
+    """Test the organizations a party is a member of are references to parties."""
+    cat = catalog.Catalog.oscal_read(testdata_dir / 'json/minimal_catalog.json')
+    missing_uuid = str(uuid4())
+    cat.metadata.parties = [
+        catalog.Party(
+            uuid=str(uuid4()),
+            type='person',
+            name='me',
+            member_of_organizations=[catalog.MemberOfOrganization(__root__=missing_uuid)]
+        )
+    ]
+    dangling = [reference for reference in ReferenceIndex(cat).dangling() if reference.value == missing_uuid]
+    assert len(dangling) == 1
+    assert dangling[0].kind == REF_KIND_UUID
+    assert dangling[0].path == '$.metadata.parties[0].member-of-organizations[0]'
+
+    cat.metadata.parties.append(catalog.Party(uuid=missing_uuid, type='organization', name='my organization'))
+    index = ReferenceIndex(cat)
+    assert missing_uuid not in [reference.value for reference in index.dangling()]
+    assert index.references_to(missing_uuid)[0].field == 'member_of_organizations'
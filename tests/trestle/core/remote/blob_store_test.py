@@ -0,0 +1,142 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the content-addressed store of the remote cache."""
+
+import os
+import pathlib
+import time
+
+from trestle.core import const
+from trestle.core import generators
+from trestle.core.remote import cache
+from trestle.core.remote.blob_store import BlobStore
+from trestle.oscal.catalog import Catalog
+
+
+def _write_catalogs(dir_path: pathlib.Path, catalog: Catalog, count: int) -> list:
+    """Write the catalog to several directories, as if it was served by several mirrors."""
+    paths = []
+    for index in range(count):
+        catalog_path = dir_path / f'mirror{index}' / 'catalog.json'
+        catalog_path.parent.mkdir(parents=True)
+        catalog.oscal_write(catalog_path)
+        paths.append(catalog_path)
+    return paths
+
+
+def _put(store: BlobStore, content: bytes, age: int = 0) -> str:
+    """Put the content in the store as if it was used the given number of seconds ago."""
+    with store.download() as download_path:
+        download_path.write_bytes(content)
+        _, blob = store.put(download_path, '.json')
+    used_at = time.time() - age
+    os.utime(store.path(blob), (used_at, used_at))
+    return blob
+
+
+def test_identical_objects_stored_once(tmp_trestle_dir: pathlib.Path, tmp_path_factory, monkeypatch) -> None:
+    """Test identical objects fetched from different uris share a blob."""
+    monkeypatch.delenv(const.ENV_REMOTE_CACHE_COMPRESS, raising=False)
+    catalog = generators.generate_sample_model(Catalog)
+    fetchers = []
+    for catalog_path in _write_catalogs(tmp_path_factory.mktemp('mirrors'), catalog, 3):
+        fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, str(catalog_path), True, False)
+        fetcher._update_cache()
+        fetchers.append(fetcher)
+    assert len({fetcher._cached_blob() for fetcher in fetchers}) == 1
+    assert all(fetcher.get_oscal(Catalog).uuid == catalog.uuid for fetcher in fetchers)
+    stats = fetchers[0]._store.stats()
+    assert stats['objects'] == 3
+    assert stats['blobs'] == 1
+    assert stats['size'] == len(catalog_path.read_bytes())
+
+
+def test_compressed_blobs(tmp_trestle_dir: pathlib.Path, tmp_path_factory, monkeypatch) -> None:
+    """Test objects are read back from compressed blobs."""
+    monkeypatch.setenv(const.ENV_REMOTE_CACHE_COMPRESS, 'on')
+    catalog = generators.generate_sample_model(Catalog)
+    catalog_path = _write_catalogs(tmp_path_factory.mktemp('mirrors'), catalog, 1)[0]
+    fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, str(catalog_path), True, False)
+    fetcher._update_cache()
+    blob = fetcher._cached_blob()
+    assert BlobStore.is_compressed(blob)
+    assert fetcher._store.path(blob).stat().st_size < catalog_path.stat().st_size
+    assert fetcher.get_oscal(Catalog).uuid == catalog.uuid
+    assert fetcher.get_raw()['catalog']['uuid'] == catalog.uuid
+    assert fetcher._store.read_bytes(blob) == catalog_path.read_bytes()
+
+
+def test_eviction(tmp_trestle_dir: pathlib.Path) -> None:
+    """Test the least recently used blobs are evicted once the store exceeds its maximum size."""
+    store = BlobStore(tmp_trestle_dir / const.TRESTLE_CONFIG_DIR / 'cache', max_size=2500)
+    oldest = _put(store, b'a' * 1000, 300)
+    used = _put(store, b'b' * 1000, 200)
+    store.read_bytes(used)
+    newest = _put(store, b'c' * 1000)
+    assert not store.path(oldest).exists()
+    assert store.path(used).exists()
+    assert store.path(newest).exists()
+    assert store.stats()['size'] == 2000
+
+
+def test_evicted_object_fetched_again(tmp_trestle_dir: pathlib.Path, tmp_path_factory) -> None:
+    """Test an object whose blob was evicted is no longer in the cache and is fetched again."""
+    catalog = generators.generate_sample_model(Catalog)
+    catalog_path = _write_catalogs(tmp_path_factory.mktemp('mirrors'), catalog, 1)[0]
+    fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, str(catalog_path), False, False)
+    fetcher._update_cache()
+    fetcher._store.path(fetcher._cached_blob()).unlink()
+    assert not fetcher.in_cache()
+    assert fetcher.get_raw()['catalog']['uuid'] == catalog.uuid
+    assert fetcher.in_cache()
+
+
+def test_prune(tmp_trestle_dir: pathlib.Path, tmp_path_factory) -> None:
+    """Test pruning removes what is no longer used, then evicts down to the size given."""
+    catalog = generators.generate_sample_model(Catalog)
+    catalog_paths = _write_catalogs(tmp_path_factory.mktemp('mirrors'), catalog, 2)
+    catalog_paths[1].write_text(catalog_paths[1].read_text() + '\n')
+    fetchers = []
+    for catalog_path in catalog_paths:
+        fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, str(catalog_path), False, False)
+        fetcher._update_cache()
+        fetchers.append(fetcher)
+    store = fetchers[0]._store
+    # an object cached before the store, an unreferenced blob and an interrupted download, all from a day ago
+    legacy_path = fetchers[0]._inst_cache_path
+    legacy_path.write_text('{}')
+    unreferenced = _put(store, b'unreferenced', 86400)
+    with store.download() as download_path:
+        interrupted = download_path.with_name('interrupted.tmp')
+        download_path.rename(interrupted)
+    os.utime(interrupted, (time.time() - 86400, time.time() - 86400))
+    recent = _put(store, b'recent')
+    # an index entry whose blob was evicted
+    store.path(fetchers[1]._cached_blob()).unlink()
+
+    assert store.prune() == {'entries': 2, 'blobs': 1, 'evicted': 0}
+    assert not legacy_path.exists()
+    assert not fetchers[1]._metadata_path().exists()
+    assert not store.path(unreferenced).exists()
+    assert not interrupted.exists()
+    assert store.path(recent).exists()
+    assert fetchers[0].in_cache()
+
+    assert store.prune(0) == {'entries': 0, 'blobs': 0, 'evicted': 2}
+    assert not fetchers[0].in_cache()
+    assert store.stats() == {'objects': 0, 'blobs': 0, 'size': 0, 'max_size': const.REMOTE_CACHE_MAX_SIZE}
+    assert store.clear() == 1
+    assert list(store.cache_dir.iterdir()) == []
@@ -15,15 +15,17 @@
 # limitations under the License.
 """Testing for cache functionality."""
 
+import hashlib
 import pathlib
 import random
 import string
-from json.decoder import JSONDecodeError
 from unittest.mock import patch
+from urllib import parse
 
 import pytest
 
 import trestle.core.err as err
+from trestle.core import const
 from trestle.core import generators
 from trestle.core.err import TrestleError
 from trestle.core.remote import cache
@@ -133,7 +135,7 @@ def test_local_fetcher_absolute(tmp_trestle_dir):
     fetcher._refresh = True
     fetcher._cache_only = False
     fetcher._update_cache()
-    assert fetcher._inst_cache_path.exists()
+    assert fetcher.in_cache()
 
 
 def test_https_fetcher_fails(tmp_trestle_dir, monkeypatch):
@@ -157,11 +159,11 @@ def test_https_fetcher(tmp_trestle_dir, monkeypatch):
     fetcher._refresh = True
     fetcher._cache_only = False
     fetcher._update_cache()
-    assert len(open(fetcher._inst_cache_path).read()) > 0
-    dummy_existing_file = fetcher._inst_cache_path.__str__()
-    # Now we'll patch _update_cache() to fail with JSONDecodeError:
-    with patch('requests.Response.json') as json_mock:
-        json_mock.side_effect = JSONDecodeError(msg='Extra data:', doc=fetcher._uri, pos=0)
+    assert len(fetcher.get_raw()) > 0
+    dummy_existing_file = fetcher._store.path(fetcher._cached_blob()).__str__()
+    # Now we'll patch _update_cache() to download malformed JSON:
+    with patch('requests.Response.iter_content') as iter_content_mock:
+        iter_content_mock.return_value = [b'{"catalog": ']
         with pytest.raises(TrestleError):
             fetcher._update_cache()
     # Now we'll get a file that does not exist:
@@ -369,3 +371,142 @@ def test_fetcher_factory(tmp_trestle_dir: pathlib.Path, monkeypatch) -> None:
     sftp_uri_2 = 'sftp://user@hostname:2000/path/to/file.json'
     fetcher = cache.FetcherFactory.get_fetcher(pathlib.Path(tmp_trestle_dir), sftp_uri_2, False, False)
     assert type(fetcher) == cache.SFTPFetcher
+
+
+def test_https_fetcher_revalidation(tmp_trestle_dir: pathlib.Path, stand_in_server, monkeypatch) -> None:
+    """Test the HTTPS fetcher only downloads again a cached object which has changed, and not while it is fresh."""
+    monkeypatch.delenv(const.ENV_REMOTE_CACHE_TTL, raising=False)
+    catalog_data = generators.generate_sample_model(Catalog)
+    stand_in_server.documents['/catalog.json'] = catalog_data.oscal_serialize_json().encode()
+    fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, 'https://127.0.0.1/catalog.json', True, False)
+    # the fetcher is pointed at the plain http stand-in server
+    fetcher._url = stand_in_server.url('/catalog.json')
+
+    fetcher._update_cache()
+    assert fetcher.get_oscal(Catalog).uuid == catalog_data.uuid
+    fetcher._update_cache()
+    assert stand_in_server.requests == [('/catalog.json', 200), ('/catalog.json', 304)]
+    assert fetcher.get_oscal(Catalog).uuid == catalog_data.uuid
+
+    catalog_data.metadata.title = 'changed'
+    stand_in_server.documents['/catalog.json'] = catalog_data.oscal_serialize_json().encode()
+    fetcher._update_cache()
+    assert stand_in_server.requests[-1] == ('/catalog.json', 200)
+    assert fetcher.get_oscal(Catalog).metadata.title == 'changed'
+
+    # no request at all while the cached object is fresh
+    monkeypatch.setenv(const.ENV_REMOTE_CACHE_TTL, '3600')
+    fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, 'https://127.0.0.1/catalog.json', True, False)
+    fetcher._url = stand_in_server.url('/catalog.json')
+    assert fetcher.is_fresh()
+    fetcher._update_cache()
+    assert len(stand_in_server.requests) == 3
+
+
+def test_fetch_all(tmp_trestle_dir: pathlib.Path, stand_in_server, monkeypatch) -> None:
+    """Test fetching a batch of uris reports each outcome and reuses a single connection to the host."""
+    catalogs = {f'/catalog{index}.json': generators.generate_sample_model(Catalog) for index in range(4)}
+    for path, catalog in catalogs.items():
+        stand_in_server.documents[path] = catalog.oscal_serialize_json().encode()
+    original_init = cache.HTTPSFetcher.__init__
+
+    def init_stand_in(self, trestle_root, uri, refresh=False, cache_only=False):
+        original_init(self, trestle_root, uri, refresh, cache_only)
+        # the fetchers are pointed at the plain http stand-in server
+        self._url = stand_in_server.url(parse.urlparse(uri).path)
+
+    monkeypatch.setattr(cache.HTTPSFetcher, '__init__', init_stand_in)
+    uris = [f'https://127.0.0.1{path}' for path in catalogs]
+    uris += ['https://127.0.0.1/missing.json', 'sftp://some.host', uris[0]]
+
+    results = cache.FetcherFactory.fetch_all(tmp_trestle_dir, uris, max_workers=1)
+
+    assert [result.uri for result in results] == uris
+    assert [result.ok for result in results] == [True, True, True, True, False, False, True]
+    assert results[0] is results[-1]
+    assert results[5].fetcher is None
+    for result, path in zip(results, catalogs):
+        assert result.fetcher.get_oscal(Catalog).uuid == catalogs[path].uuid
+    # the uri given twice is fetched once, and every request went over the same kept-alive connection
+    assert len(stand_in_server.requests) == 5
+    assert len(stand_in_server.connections) == 1
+
+
+def test_fetch_all_sftp(tmp_trestle_dir: pathlib.Path) -> None:
+    """Test fetching a batch of sftp uris connects once per host."""
+    uris = [f'sftp://some.host/path/to/test{index}.json' for index in range(3)]
+    uris.append('sftp://other.host/path/to/test.json')
+
+    def get(remotepath, localpath):
+        pathlib.Path(localpath).write_text('{}')
+
+    with patch('paramiko.SSHClient.load_system_host_keys'):
+        with patch('paramiko.SSHClient.connect') as ssh_connect_mock:
+            with patch('paramiko.SSHClient.open_sftp') as sftp_open_mock:
+                with patch('paramiko.SSHClient.close'):
+                    sftp_client_mock = sftp_open_mock.return_value
+                    sftp_client_mock.stat.return_value.st_size = 2
+                    sftp_client_mock.get.side_effect = get
+                    results = cache.FetcherFactory.fetch_all(tmp_trestle_dir, uris)
+    assert all(result.ok for result in results)
+    assert ssh_connect_mock.call_count == 2
+    assert sftp_open_mock.call_count == 2
+    assert sftp_open_mock.return_value.get.call_count == 4
+
+
+def test_https_fetcher_verifies_download(tmp_trestle_dir: pathlib.Path, stand_in_server) -> None:
+    """Test the HTTPS fetcher only replaces the cached content by complete, well-formed content of the given digest."""
+    catalog_data = generators.generate_sample_model(Catalog)
+    content = catalog_data.oscal_serialize_json().encode()
+    stand_in_server.documents['/catalog.json'] = content
+    digest = hashlib.sha256(content).hexdigest()
+    uri = f'https://127.0.0.1/catalog.json#sha256={digest}'
+    fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, uri, True, False)
+    fetcher._url = stand_in_server.url('/catalog.json')
+    fetcher._update_cache()
+    assert fetcher._cached_blob().startswith(f'{digest[:2]}/{digest}')
+
+    # malformed JSON, then well-formed JSON which is not the content of the digest
+    for document in [b'{"catalog": {', content + b' ']:
+        stand_in_server.documents['/catalog.json'] = document
+        with pytest.raises(TrestleError):
+            fetcher._update_cache()
+        assert fetcher.get_oscal(Catalog).uuid == catalog_data.uuid
+
+    # new content cut in the middle of its transfer
+    catalog_data.metadata.title = 'changed'
+    stand_in_server.documents['/catalog.json'] = catalog_data.oscal_serialize_json().encode()
+    stand_in_server.truncated.add('/catalog.json')
+    fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, 'https://127.0.0.1/catalog.json', True, False)
+    fetcher._url = stand_in_server.url('/catalog.json')
+    with pytest.raises(TrestleError):
+        fetcher._update_cache()
+    assert fetcher.get_oscal(Catalog).metadata.title != 'changed'
+    # the interrupted downloads are all removed
+    assert not list(fetcher._store.path('').glob('*.tmp'))
+
+    stand_in_server.truncated.clear()
+    fetcher._update_cache()
+    assert fetcher.get_oscal(Catalog).metadata.title == 'changed'
+    with pytest.raises(TrestleError):
+        cache.FetcherFactory.get_fetcher(tmp_trestle_dir, 'https://127.0.0.1/catalog.json#sha256=abc', True, False)
+
+
+def test_sftp_fetcher_incomplete_transfer(tmp_trestle_dir: pathlib.Path) -> None:
+    """Test the sftp fetcher fails when the file transferred is smaller than the remote file."""
+    fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, 'sftp://some.host/path/to/test.json', True, False)
+
+    def get(remotepath, localpath):
+        pathlib.Path(localpath).write_text('{}')
+
+    with patch('paramiko.SSHClient.load_system_host_keys'):
+        with patch('paramiko.SSHClient.connect'):
+            with patch('paramiko.SSHClient.open_sftp') as sftp_open_mock:
+                sftp_open_mock.return_value.stat.return_value.st_size = 10
+                sftp_open_mock.return_value.get.side_effect = get
+                with pytest.raises(TrestleError):
+                    fetcher._update_cache()
+                assert not fetcher.in_cache()
+                sftp_open_mock.return_value.stat.return_value.st_size = 2
+                fetcher._update_cache()
+                assert fetcher.get_raw() == {}
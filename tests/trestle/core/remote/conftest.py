@@ -0,0 +1,93 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Local HTTP server standing in for the remote servers of the fetchers."""
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Set, Tuple
+
+import pytest
+
+
+class StandInServer:
+    """HTTP/1.1 server serving documents with an ETag and a Last-Modified date, and logging the requests."""
+
+    last_modified = 'Wed, 21 Oct 2020 07:28:00 GMT'
+
+    def __init__(self) -> None:
+        """Start the server on a free local port."""
+        self.documents: Dict[str, bytes] = {}
+        # path and status of each request served
+        self.requests: List[Tuple[str, int]] = []
+        # client address of each connection accepted
+        self.connections: Set[Tuple[str, int]] = set()
+        # paths of the documents whose transfer is cut in the middle
+        self.truncated: Set[str] = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            # keep the connections alive between requests
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self) -> None:  # noqa: N802
+                content = server.documents.get(self.path)
+                if content is None:
+                    self._reply(404)
+                    return
+                etag = f'"{hashlib.sha256(content).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._reply(304)
+                    return
+                self._reply(200, content, {'ETag': etag, 'Last-Modified': server.last_modified})
+
+            def _reply(self, status: int, content: bytes = b'', headers: Dict[str, str] = None) -> None:
+                server.requests.append((self.path, status))
+                server.connections.add(self.client_address)
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                if self.path in server.truncated:
+                    content = content[:len(content) // 2]
+                    self.close_connection = True
+                self.wfile.write(content)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        """Return the url of the document at the path."""
+        return f'http://127.0.0.1:{self._httpd.server_port}{path}'
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture(scope='function')
+def stand_in_server() -> Iterator[StandInServer]:
+    """Return a local HTTP server standing in for a remote server."""
+    server = StandInServer()
+    yield server
+    server.stop()
@@ -0,0 +1,84 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the in-process cache of parsed remote objects."""
+
+import pathlib
+from unittest.mock import patch
+
+from trestle.core import generators
+from trestle.core.remote import cache
+from trestle.core.remote import parsed_models
+from trestle.oscal.catalog import Catalog
+
+
+def test_copy_value(testdata_dir: pathlib.Path) -> None:
+    """Test a copy of a model is equal to it and shares nothing mutable with it."""
+    catalog = Catalog.oscal_read(testdata_dir / 'json' / 'minimal_catalog_roles.json')
+    catalog_copy = parsed_models.copy_value(catalog)
+    assert catalog_copy == catalog
+    assert catalog_copy is not catalog
+    assert catalog_copy.metadata is not catalog.metadata
+    assert catalog_copy.metadata.roles is not catalog.metadata.roles
+    catalog_copy.metadata.title = 'changed'
+    catalog_copy.metadata.roles.clear()
+    assert catalog.metadata.title != 'changed'
+    assert catalog.metadata.roles
+    assert catalog_copy.__fields_set__ == catalog.__fields_set__
+
+
+def test_parsed_model_cache() -> None:
+    """Test the cache loads an object once, returns copies of it and evicts beyond its maximum size."""
+    model_cache = parsed_models.ParsedModelCache()
+    loads = []
+
+    def load(value):
+        loads.append(value)
+        return {'values': [value] * 100}
+
+    first = model_cache.get('a', lambda: load('a'))
+    first['values'].clear()
+    assert model_cache.get('a', lambda: load('a')) == {'values': ['a'] * 100}
+    assert loads == ['a']
+    info = model_cache.info()
+    assert (info['hits'], info['misses'], info['entries']) == (1, 1, 1)
+    assert info['size'] == parsed_models.deep_size({'values': ['a'] * 100})
+
+    # only room for one entry, the least recently used is evicted
+    model_cache.get('b', lambda: load('b'), info['size'] + 1)
+    model_cache.get('a', lambda: load('a'))
+    assert loads == ['a', 'b', 'a']
+    info = model_cache.info()
+    assert (info['entries'], info['evictions']) == (1, 2)
+    model_cache.clear()
+    assert model_cache.info()['entries'] == 0
+
+
+def test_get_oscal_parses_once(tmp_trestle_dir: pathlib.Path, tmp_path_factory) -> None:
+    """Test the fetchers of an object only parse it once and each get their own copy."""
+    catalog = generators.generate_sample_model(Catalog)
+    catalog_path = tmp_path_factory.mktemp('remote') / 'catalog.json'
+    catalog.oscal_write(catalog_path)
+    fetcher = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, str(catalog_path), False, False)
+    fetcher._update_cache()
+    with patch('trestle.oscal.catalog.Catalog.oscal_read', wraps=Catalog.oscal_read) as oscal_read_mock:
+        first = fetcher.get_oscal(Catalog)
+        first.metadata.title = 'changed'
+        second = cache.FetcherFactory.get_fetcher(tmp_trestle_dir, str(catalog_path), False, False).get_oscal(Catalog)
+        oscal_read_mock.assert_called_once()
+    assert second.metadata.title == catalog.metadata.title
+    assert second.uuid == catalog.uuid
+    assert fetcher.get_raw() == fetcher.get_raw()
+    assert parsed_models.parsed_model_cache_info()['size'] > 0
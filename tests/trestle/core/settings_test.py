@@ -0,0 +1,41 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle settings module."""
+
+import pathlib
+
+from trestle.core import const
+from trestle.core import settings
+
+
+def test_find_trestle_root_after_init(tmp_path: pathlib.Path) -> None:
+    """Test a project initialized after a lookup outside of any project is found."""
+    file_path = tmp_path / 'catalogs' / 'mycatalog' / 'catalog.json'
+    assert settings.find_trestle_root(file_path) is None
+    (tmp_path / const.TRESTLE_CONFIG_DIR).mkdir()
+    assert settings.find_trestle_root(file_path) == tmp_path
+    assert settings.find_trestle_root(tmp_path / 'catalogs' / 'other' / 'catalog.json') == tmp_path
+
+
+def test_find_trestle_root_bounded(tmp_path: pathlib.Path, monkeypatch) -> None:
+    """Test the memoized roots are bounded, the least recently used being dropped."""
+    monkeypatch.setattr(const, 'TRESTLE_ROOT_CACHE_SIZE', 3)
+    monkeypatch.setattr(settings, '_roots', settings.collections.OrderedDict())
+    (tmp_path / const.TRESTLE_CONFIG_DIR).mkdir()
+    for index in range(5):
+        assert settings.find_trestle_root(tmp_path / f'dir{index}' / 'catalog.json') == tmp_path
+    # the root itself is memoized too, and used by every lookup
+    assert list(settings._roots) == [tmp_path / 'dir3', tmp_path, tmp_path / 'dir4']
@@ -0,0 +1,159 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle stream_reader module."""
+
+import json
+import pathlib
+
+import pytest
+
+from trestle.core.err import TrestleError
+from trestle.core.generators import generate_sample_model
+from trestle.core.stream_reader import OscalStreamReader, check_json
+from trestle.oscal import assessment_results as ar
+from trestle.oscal import poam
+from trestle.oscal.catalog import Catalog
+
+
+@pytest.fixture(scope='function')
+def sample_results() -> ar.AssessmentResults:
+    """Return assessment results with several results, observations and findings."""
+    results = generate_sample_model(ar.AssessmentResults)
+    result = results.results[0]
+    observation = generate_sample_model(ar.Observation)
+    result.observations = [observation.copy(update={'title': f'observation "{i}"\\ é'}) for i in range(5)]
+    result.findings = [result.findings[0].copy(update={'title': f'finding {i}'}) for i in range(2)]
+    results.results = [result, result.copy(update={'title': 'second result', 'observations': None})]
+    return results
+
+
+@pytest.mark.parametrize('extension', ['json', 'yaml'])
+def test_stream_assessment_results(
+    extension: str, sample_results: ar.AssessmentResults, tmp_path: pathlib.Path
+) -> None:
+    """Test the observations, findings and results are yielded one at a time."""
+    results_file = tmp_path / f'assessment-results.{extension}'
+    sample_results.oscal_write(results_file)
+    sample_results = ar.AssessmentResults.oscal_read(results_file)
+
+    # a tiny chunk size puts chunk boundaries within every token
+    with OscalStreamReader(results_file, ar.AssessmentResults, chunk_size=7) as reader:
+        assert reader.metadata == sample_results.metadata
+        assert reader.header['uuid'] == sample_results.uuid
+        items = list(reader)
+
+    first, second = sample_results.results
+    observations = [item for item in items if isinstance(item, ar.Observation)]
+    findings = [item for item in items if isinstance(item, ar.Finding)]
+    assert observations == first.observations
+    assert findings == first.findings + second.findings
+    results = [item for item in items if type(item).__name__ == 'Result']
+    assert len(results) == 2
+    assert results[0].title == first.title
+    assert results[1].title == second.title
+    assert not hasattr(results[0], 'observations')
+    # a result is yielded after its observations and findings
+    assert items.index(results[0]) == len(first.observations) + len(first.findings)
+
+
+def test_stream_metadata_last(sample_results: ar.AssessmentResults, tmp_path: pathlib.Path) -> None:
+    """Test the metadata is available up front when it follows the streamed collections."""
+    results_data = json.loads(sample_results.oscal_serialize_json())
+    content = results_data['assessment-results']
+    results_data['assessment-results'] = {'results': content.pop('results'), **content}
+    results_file = tmp_path / 'assessment-results.json'
+    results_file.write_text(json.dumps(results_data))
+    sample_results = ar.AssessmentResults.oscal_read(results_file)
+
+    with ar.AssessmentResults.oscal_stream(results_file) as reader:
+        assert reader.metadata == sample_results.metadata
+        items = list(reader)
+        with pytest.raises(TrestleError):
+            list(reader)
+    assert len(items) == 5 + 2 + 2 + 2
+
+
+def test_stream_number_across_chunks(sample_results: ar.AssessmentResults, tmp_path: pathlib.Path) -> None:
+    """Test a number split across chunks at its decimal point is read whole."""
+    results_data = json.loads(sample_results.oscal_serialize_json())
+    content = results_data['assessment-results']
+    # the title of a result is a plain string, so a number is accepted and converted
+    result = content.pop('results')[0]
+    del result['title']
+    result = {'title': 1234.5678, **result}
+    results_data['assessment-results'] = {
+        'uuid': content.pop('uuid'), 'metadata': content.pop('metadata'), 'results': [result], **content
+    }
+    results_file = tmp_path / 'assessment-results.json'
+    text = json.dumps(results_data)
+    results_file.write_text(text)
+
+    # the first chunk holds everything up to the decimal point of the number
+    chunk_size = text.index('1234.') + len('1234.')
+    with OscalStreamReader(results_file, ar.AssessmentResults, chunk_size=chunk_size) as reader:
+        results = [item for item in reader if type(item).__name__ == 'Result']
+    assert results[0].title == '1234.5678'
+
+
+def test_stream_poam(tmp_path: pathlib.Path) -> None:
+    """Test the poam items of a POA&M are yielded."""
+    plan = generate_sample_model(poam.PlanOfActionAndMilestones)
+    plan_file = tmp_path / 'plan.json'
+    plan.oscal_write(plan_file)
+    plan = poam.PlanOfActionAndMilestones.oscal_read(plan_file)
+    with poam.PlanOfActionAndMilestones.oscal_stream(plan_file) as reader:
+        assert list(reader) == plan.poam_items
+
+
+def test_stream_invalid(sample_results: ar.AssessmentResults, tmp_path: pathlib.Path) -> None:
+    """Test invalid element paths and documents are rejected."""
+    results_file = tmp_path / 'assessment-results.json'
+    sample_results.oscal_write(results_file)
+    for element_path in ['assessment-results.results',
+                         'results.*',
+                         'assessment-results.uuid.*',
+                         'assessment-results.*.*']:
+        with pytest.raises(TrestleError):
+            ar.AssessmentResults.oscal_stream(results_file, [element_path])
+    with pytest.raises(TrestleError):
+        Catalog.oscal_stream(results_file)
+    with pytest.raises(TrestleError):
+        Catalog.oscal_stream(results_file, ['catalog.groups.*'])
+
+    results_file.write_text(results_file.read_text()[:-200])
+    with pytest.raises(TrestleError):
+        with ar.AssessmentResults.oscal_stream(results_file) as reader:
+            list(reader)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+@pytest.mark.parametrize(
+    'content, valid',
+    [
+        ('{"a": [1.5, -2e+10, {"b": "x\\"y"}], "c": {}, "d": null}', True), ('  [[[]]] ', True), ('"é"', True),
+        ('1.25', True), ('', False), ('{"a": 1', False), ('{"a": 1}}', False), ('{"a" 1}', False), ('[1,]', False),
+        ('{"a": tru}', False), ('{1: 2}', False), ('"abc', False)
+    ]
+)
+def test_check_json(content: str, valid: bool, chunk_size: int, tmp_path: pathlib.Path) -> None:
+    """Test checking the well-formedness of JSON content read in chunks of any size."""
+    json_path = tmp_path / 'content.json'
+    json_path.write_text(content, encoding='utf8')
+    if valid:
+        check_json(json_path, chunk_size)
+    else:
+        with pytest.raises(TrestleError):
+            check_json(json_path, chunk_size)
@@ -0,0 +1,70 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle validation_manifest module."""
+
+import json
+import pathlib
+
+from trestle.core import const
+from trestle.core.validation_manifest import ValidationManifest
+
+
+def test_fingerprint_fragments(tmp_trestle_dir: pathlib.Path) -> None:
+    """Test the fingerprint changes with the fragments of the model and outcomes are kept until it does."""
+    model_dir = tmp_trestle_dir / 'catalogs' / 'mycatalog'
+    (model_dir / 'catalog').mkdir(parents=True)
+    (model_dir / 'catalog.json').write_text('{}')
+    (model_dir / 'catalog' / 'metadata.json').write_text('{}')
+
+    manifest = ValidationManifest(tmp_trestle_dir)
+    fingerprint = manifest.fingerprint(model_dir)
+    manifest.record(model_dir, const.VAL_MODE_ALL, fingerprint, 'RefsValidator')
+    manifest.save()
+
+    manifest = ValidationManifest(tmp_trestle_dir)
+    assert manifest.fingerprint(model_dir) == fingerprint
+    assert manifest.lookup(model_dir, const.VAL_MODE_ALL, fingerprint) == {'failed-validator': 'RefsValidator'}
+    assert manifest.lookup(model_dir, const.VAL_MODE_REFS, fingerprint) is None
+
+    # ignored files are not fragments of the model
+    (model_dir / '.keep').write_text('')
+    assert manifest.fingerprint(model_dir) == fingerprint
+    (model_dir / 'catalog' / 'back-matter.json').write_text('{}')
+    added = manifest.fingerprint(model_dir)
+    assert added != fingerprint
+    assert manifest.lookup(model_dir, const.VAL_MODE_ALL, added) is None
+    (model_dir / 'catalog' / 'back-matter.json').rename(model_dir / 'catalog' / 'groups.json')
+    assert manifest.fingerprint(model_dir) not in [fingerprint, added]
+
+    assert ValidationManifest(tmp_trestle_dir).count() == 1
+    assert ValidationManifest(tmp_trestle_dir).clear() == 1
+    assert not manifest.manifest_path.exists()
+
+
+def test_manifest_out_of_date(tmp_trestle_dir: pathlib.Path) -> None:
+    """Test a manifest written by another version of trestle is discarded."""
+    model_dir = tmp_trestle_dir / 'catalogs' / 'mycatalog'
+    model_dir.mkdir(parents=True)
+    (model_dir / 'catalog.json').write_text('{}')
+    manifest = ValidationManifest(tmp_trestle_dir)
+    fingerprint = manifest.fingerprint(model_dir)
+    manifest.record(model_dir, const.VAL_MODE_ALL, fingerprint, None)
+    manifest.save()
+
+    content = json.loads(manifest.manifest_path.read_text())
+    content['trestle-version'] = '0.0.0'
+    manifest.manifest_path.write_text(json.dumps(content))
+    assert ValidationManifest(tmp_trestle_dir).lookup(model_dir, const.VAL_MODE_ALL, fingerprint) is None
@@ -15,7 +15,9 @@
 # limitations under the License.
 """Tests for models util module."""
 
+import copy
 import pathlib
+import uuid
 from uuid import uuid4
 
 import trestle.core.validator_helper as validator_helper
@@ -96,15 +98,101 @@ def test_find_all_attribs_by_regex() -> None:
 def test_validations_on_dict() -> None:
     """Test regen of uuid in dict."""
     my_uuid = str(uuid4())
-    my_dict = {'uuid': my_uuid, 'ref': my_uuid}
-    new_dict, lut = validator_helper.regenerate_uuids_in_place(my_dict, {})
-    assert my_dict['uuid'] != new_dict['uuid']
+    my_dict = {'uuid': my_uuid, 'party-uuid': my_uuid}
+    fixed_dict, lut, count = validator_helper.regenerate_uuids(my_dict)
+    assert fixed_dict['uuid'] != my_uuid
     assert len(lut) == 1
-
-    fixed_dict, count = validator_helper.update_new_uuid_refs(new_dict, lut)
-    assert fixed_dict['uuid'] == fixed_dict['ref']
+    assert fixed_dict['uuid'] == fixed_dict['party-uuid']
     assert count == 1
 
     attrs = validator_helper.find_all_attribs_by_regex(fixed_dict, 'uuid')
-    assert len(attrs) == 1
+    assert len(attrs) == 2
     assert attrs[0] == ('uuid', fixed_dict['uuid'])
+
+
+def test_regenerate_uuids_member_of_organizations(testdata_dir: pathlib.Path) -> None:
+    """Test the organizations a party is a member of are updated with the uuid of the organization."""
+    cat = catalog.Catalog.oscal_read(testdata_dir / 'json/minimal_catalog.json')
+    organization_uuid = str(uuid4())
+    organization = catalog.Party(uuid=organization_uuid, type='organization', name='my organization')
+    person = catalog.Party(
+        uuid=str(uuid4()),
+        type='person',
+        name='me',
+        member_of_organizations=[catalog.MemberOfOrganization(__root__=organization_uuid)]
+    )
+    cat.metadata.parties = [organization, person]
+    new_cat, lut, n_refs_updated = validator_helper.regenerate_uuids(cat)
+    assert n_refs_updated == 1
+    new_organization_uuid = lut[organization_uuid]
+    assert new_cat.metadata.parties[0].uuid == new_organization_uuid
+    assert new_cat.metadata.parties[1].member_of_organizations[0].__root__ == new_organization_uuid
+
+
+def test_find_duplicate_values() -> None:
+    """Test the duplicates are reported with the JSON path of each occurrence."""
+    bad_target = ostarget.TargetDefinition.oscal_read(pathlib.Path('tests/data/yaml/bad_target_dup_uuid.yaml'))
+    duplicates = validator_helper.find_duplicate_values_by_name(bad_target, 'uuid')
+    assert len(duplicates) == 1
+    value, locations = duplicates[0]
+    assert locations[0] == '$.uuid'
+    assert locations[1].endswith('.target-control-implementations[0].implemented-requirements[86].uuid')
+    assert locations[1].startswith("$.targets['56666738-0f9a")
+    assert validator_helper.find_duplicate_values_generic(bad_target, 'uuid') == duplicates
+
+    my_dict = {'a': [{'uuid': 'x', 'p': [1, 2]}, {'uuid': 'y', 'p': (1, 2)}], 'b': {'uuid': 'x', 'p': [1, 2]}}
+    assert validator_helper.find_duplicate_values_generic(my_dict, 'uuid') == [('x', ['$.a[0].uuid', '$.b.uuid'])]
+    # a list is not a duplicate of a tuple
+    assert validator_helper.find_duplicate_values_generic(my_dict, 'p') == [([1, 2], ['$.a[0].p', '$.b.p'])]
+    assert validator_helper.find_duplicate_values_by_type(my_dict,
+                                                          int)[1] == (2, ['$.a[0].p[1]', '$.a[1].p[1]', '$.b.p[1]'])
+    assert validator_helper.has_no_duplicate_values_by_type(my_dict, tuple)
+
+
+def test_regenerate_uuids_single_pass() -> None:
+    """Test the uuids and the references to them are regenerated, deterministically with a seed."""
+    party_uuid = str(uuid4())
+    role_uuid = str(uuid4())
+    component_uuid = str(uuid4())
+    my_dict = {
+        'metadata': {
+            'responsible-parties': {
+                'owner': {
+                    'party-uuids': [party_uuid]
+                }
+            },
+            'parties': [{
+                'uuid': party_uuid, 'remarks': party_uuid
+            }]
+        },
+        'components': {
+            component_uuid: {
+                'title': 'my component'
+            }
+        },
+        'by-components': {
+            component_uuid: {
+                'uuid': role_uuid
+            }
+        }
+    }
+    new_dict, lut, n_refs_updated = validator_helper.regenerate_uuids(copy.deepcopy(my_dict), 'seed')
+    assert set(lut) == {party_uuid, role_uuid, component_uuid}
+    assert n_refs_updated == 2
+    new_party_uuid = new_dict['metadata']['parties'][0]['uuid']
+    assert new_party_uuid == lut[party_uuid]
+    assert new_dict['metadata']['responsible-parties']['owner']['party-uuids'] == [new_party_uuid]
+    # only references are updated
+    assert new_dict['metadata']['parties'][0]['remarks'] == party_uuid
+    assert list(new_dict['by-components']) == list(new_dict['components']) == [lut[component_uuid]]
+    assert uuid.UUID(new_party_uuid).version == 4
+
+    assert validator_helper.regenerate_uuids(copy.deepcopy(my_dict), 'seed')[0] == new_dict
+    assert validator_helper.regenerate_uuids(copy.deepcopy(my_dict), 'other')[0] != new_dict
+    assert validator_helper.regenerate_uuids(copy.deepcopy(my_dict))[0] != new_dict
+
+    target = ostarget.TargetDefinition.oscal_read(pathlib.Path('tests/data/yaml/good_target.yaml'))
+    new_target, lut, _ = validator_helper.regenerate_uuids(target.copy(deep=True), 'seed')
+    assert new_target.uuid == lut[target.uuid]
+    assert list(new_target.targets) == [lut[key] for key in target.targets]
+    ostarget.TargetDefinition.parse_obj(new_target.dict())
@@ -0,0 +1,115 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the visiting validators of trestle validator module."""
+
+import argparse
+import pathlib
+import shutil
+from typing import Any, List
+
+import pytest
+
+import trestle.core.const as const
+import trestle.core.validator_factory as vfact
+from trestle.core.base_model import OscalBaseModel
+from trestle.core.validator import ModelVisitor, Validator, VisitingValidator, visit_model
+from trestle.oscal import catalog
+from trestle.oscal import target
+
+
+class _CountingVisitor(ModelVisitor):
+
+    def __init__(self) -> None:
+        self.visits: List[Any] = []
+
+    def visit(self, name: str, value: Any, path: List[str]) -> bool:
+        self.visits.append((name, value, list(path)))
+        return True
+
+
+class _CountingValidator(VisitingValidator):
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.visit_names = frozenset(kwargs.get('names', []))
+        self.visit_types = kwargs.get('types', ())
+        self.visitors: List[_CountingVisitor] = []
+
+    def create_visitor(self, model: OscalBaseModel) -> ModelVisitor:
+        self.visitors.append(_CountingVisitor())
+        return self.visitors[-1]
+
+
+def test_visit_model(sample_target_def: target.TargetDefinition) -> None:
+    """Test one traversal feeds each validator the nodes of its names and types."""
+    by_name = _CountingValidator(names=['title', 'uuid'])
+    by_type = _CountingValidator(types=(target.Party, ))
+    assert visit_model(sample_target_def, [by_name, by_type])
+
+    name_visits = by_name.visitors[0].visits
+    assert ('title', sample_target_def.metadata.title, ['metadata', 'title']) in name_visits
+    assert ('uuid', sample_target_def.uuid, ['uuid']) in name_visits
+    assert len([visit for visit in name_visits if visit[0] == 'uuid']) > 1
+    type_visits = by_type.visitors[0].visits
+    assert [visit[1] for visit in type_visits] == sample_target_def.metadata.parties
+    assert all(visit[0] == 'parties' for visit in type_visits)
+
+
+@pytest.mark.parametrize(
+    'mode, model_type, file_name',
+    [
+        (const.VAL_MODE_DUPLICATES, target.TargetDefinition, 'yaml/bad_target_dup_uuid.yaml'),
+        (const.VAL_MODE_REFS, catalog.Catalog, 'json/minimal_catalog.json'),
+    ]
+)
+def test_all_validator_matches(mode: str, model_type, file_name: str, testdata_dir: pathlib.Path) -> None:
+    """Test the fused validation finds the errors of each validator."""
+    model = model_type.oscal_read(testdata_dir / file_name)
+    assert not vfact.validator_factory.get(argparse.Namespace(mode=mode)).model_is_valid(model)
+    assert not vfact.validator_factory.get(argparse.Namespace(mode=const.VAL_MODE_ALL)).model_is_valid(model)
+
+    good_model = catalog.Catalog.oscal_read(testdata_dir / 'json/minimal_catalog_no_responsible-parties.json')
+    assert all(validator.model_is_valid(good_model) for validator in vfact.validator_factory.get_all())
+
+
+def test_ncname_visitor() -> None:
+    """Test role ids which are not NCNames are found by the fused validation."""
+    user = target.SystemUser(**{'role-ids': [target.RoleId(__root__='role_1')]})
+    all_validator = vfact.validator_factory.get(argparse.Namespace(mode=const.VAL_MODE_ALL))
+    assert all_validator.model_is_valid(user)
+    user.role_ids.append(target.RoleId(__root__='1 role'))
+    assert not all_validator.model_is_valid(user)
+
+
+class _CrashingValidator(Validator):
+
+    def model_is_valid(self, model: OscalBaseModel) -> bool:
+        raise ValueError('validator crash')
+
+
+def test_validate_models_errors(testdata_dir: pathlib.Path, tmp_trestle_dir: pathlib.Path) -> None:
+    """Test a crash of the validator is reported apart from an error loading the model."""
+    for name, file_name in [('good_model', 'good_target.yaml'), ('broken_model', 'bad_simple.yaml')]:
+        model_dir = tmp_trestle_dir / 'target-definitions' / name
+        model_dir.mkdir(parents=True)
+        shutil.copyfile(testdata_dir / 'yaml' / file_name, model_dir / 'target-definition.yaml')
+
+    results = _CrashingValidator().validate_models(
+        tmp_trestle_dir, [('target-definition', 'good_model'), ('target-definition', 'broken_model')]
+    )
+    assert [result.model_name for result in results] == ['good_model', 'broken_model']
+    assert results[0].error == 'Validator error validator crash'
+    assert results[1].error.startswith('File load error')
+    assert not any(result.passed for result in results)
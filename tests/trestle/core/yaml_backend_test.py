@@ -0,0 +1,67 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle yaml_backend module."""
+
+import json
+import pathlib
+
+import pytest
+
+from trestle.core import yaml_backend
+from trestle.core.models.elements import Element
+from trestle.oscal import catalog
+from trestle.oscal import target
+
+import yaml
+
+
+@pytest.mark.parametrize(
+    'model_type, file_name',
+    [
+        (catalog.Catalog, 'json/minimal_catalog.json'),
+        (target.TargetDefinition, 'yaml/good_target.yaml'),
+        (target.TargetDefinition, 'json/sample-target-definition.json'),
+    ]
+)
+def test_yaml_data_matches_json(model_type, file_name: str, testdata_dir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    """Test models are written as the same yaml content as their decoded json form."""
+    model = model_type.oscal_read(testdata_dir / file_name)
+    wrapped_model = model._oscal_wrap()
+    expected = json.loads(wrapped_model.json(exclude_none=True, by_alias=True))
+    assert yaml_backend.to_yaml_data(wrapped_model) == expected
+
+    yaml_file = tmp_path / 'model.yaml'
+    model.oscal_write(yaml_file)
+    assert yaml.safe_load(yaml_file.read_text()) == expected
+    assert model_type.oscal_read(yaml_file) == model
+
+
+def test_yaml_data_types(sample_target_def: target.TargetDefinition) -> None:
+    """Test the values that are not plain data are converted like json does."""
+    data = yaml_backend.to_yaml_data(sample_target_def.metadata)
+    assert type(data['last-modified']) is str
+    assert data['last-modified'] == json.loads(sample_target_def.metadata.json(by_alias=True))['last-modified']
+    assert 'props' not in data
+    assert yaml_backend.to_yaml_data({'values': ('a', 1, None)}) == {'values': ['a', 1, None]}
+
+
+def test_element_to_yaml(sample_target_def: target.TargetDefinition) -> None:
+    """Test elements are written as yaml without going through json."""
+    element = Element(sample_target_def.metadata)
+    assert yaml_backend.load(element.to_yaml()) == json.loads(element.to_json())
+
+    element = Element({'metadata': 'metadata.yaml'}, Element.IGNORE_WRAPPER_ALIAS)
+    assert element.to_yaml() == 'metadata: metadata.yaml\n'
@@ -134,3 +134,30 @@ def test_load_distributed(testdata_dir, tmp_trestle_dir):
     assert actual_model_type == expected_model_type
     assert actual_model_alias == 'catalog'
     assert expected_model_instance == actual_model_instance
+
+
+def test_load_distributed_parallel(testdata_dir, tmp_trestle_dir):
+    """Test parallel distributed load gives the same result as the sequential load."""
+    test_utils.ensure_trestle_config_dir(tmp_trestle_dir)
+
+    test_data_source = testdata_dir / 'split_merge/step4_split_groups_array/catalogs'
+
+    catalogs_dir = Path('catalogs/')
+    catalog_file = catalogs_dir / 'mycatalog' / 'catalog.json'
+
+    shutil.rmtree(catalogs_dir)
+    shutil.copytree(test_data_source, catalogs_dir)
+
+    expected_model_type, expected_model_alias, expected_model_instance = load_distributed(catalog_file)
+    actual_model_type, actual_model_alias, actual_model_instance = load_distributed(
+        catalog_file, parallel=True, max_workers=4
+    )
+
+    assert actual_model_type.__signature__ == expected_model_type.__signature__
+    assert actual_model_alias == expected_model_alias
+    assert actual_model_instance == expected_model_instance
+
+    groups_dir = catalogs_dir / 'mycatalog' / 'catalog' / 'groups'
+    _, _, expected_groups = _load_list(groups_dir)
+    _, _, actual_groups = load_distributed(groups_dir, list, parallel=True)
+    assert actual_groups == expected_groups
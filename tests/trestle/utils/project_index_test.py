@@ -0,0 +1,98 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle project_index module."""
+
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from tests import test_utils
+
+from trestle.core.err import TrestleError
+from trestle.utils import fs
+from trestle.utils.project_index import ProjectIndex, RACY_LISTING_WINDOW_NS
+
+
+def _copy_split_catalog(testdata_dir: Path, tmp_trestle_dir: Path) -> Path:
+    test_utils.ensure_trestle_config_dir(tmp_trestle_dir)
+    catalogs_dir = Path('catalogs/')
+    shutil.rmtree(catalogs_dir)
+    shutil.copytree(testdata_dir / 'split_merge/step4_split_groups_array/catalogs', catalogs_dir)
+    return (catalogs_dir / 'mycatalog').resolve()
+
+
+def test_index_matches_fs(testdata_dir, tmp_trestle_dir):
+    """Test the indexed lookups give the same results as the fs lookups for every path of a model."""
+    model_dir = _copy_split_catalog(testdata_dir, tmp_trestle_dir)
+    index = ProjectIndex(model_dir)
+    assert index.model_path == model_dir
+
+    paths = [model_dir] + list(model_dir.rglob('*'))
+    for path in paths:
+        assert index.get_contextual_model_type(path) == fs.get_contextual_model_type(path)
+        model_type, model_alias = index.get_stripped_contextual_model(path)
+        expected_type, expected_alias = fs.get_stripped_contextual_model(path)
+        assert model_alias == expected_alias
+        assert model_type.__signature__ == expected_type.__signature__
+
+    catalog_file = model_dir / 'catalog.json'
+    not_stripped = ['metadata', 'groups']
+    model_type, _ = index.get_stripped_contextual_model(catalog_file, not_stripped)
+    expected_type, _ = fs.get_stripped_contextual_model(catalog_file, not_stripped)
+    assert model_type.__signature__ == expected_type.__signature__
+
+    # relative paths are resolved against the current directory
+    assert index.get_contextual_model_type(Path('catalogs/mycatalog/catalog/metadata.json'))[1] == 'catalog.metadata'
+
+
+def test_index_shared(testdata_dir, tmp_trestle_dir):
+    """Test that all paths of a model share a single index."""
+    model_dir = _copy_split_catalog(testdata_dir, tmp_trestle_dir)
+    index = ProjectIndex.for_path(model_dir / 'catalog.json')
+    assert ProjectIndex.for_path(Path('catalogs/mycatalog/catalog/groups')) is index
+    assert ProjectIndex.for_path(model_dir) is index
+    ProjectIndex.clear()
+    assert ProjectIndex.for_path(model_dir) is not index
+
+    with pytest.raises(TrestleError):
+        ProjectIndex.for_path(tmp_trestle_dir / 'catalogs')
+    with pytest.raises(TrestleError):
+        ProjectIndex(tmp_trestle_dir / 'catalogs')
+    with pytest.raises(TrestleError):
+        index.get_contextual_model_type(tmp_trestle_dir / 'profiles' / 'myprofile')
+
+
+def test_index_refresh(testdata_dir, tmp_trestle_dir):
+    """Test that listings are re-read once a directory changes."""
+    model_dir = _copy_split_catalog(testdata_dir, tmp_trestle_dir)
+    catalog_dir = model_dir / 'catalog'
+    old_ns = time.time_ns() - 2 * RACY_LISTING_WINDOW_NS
+    os.utime(catalog_dir, ns=(old_ns, old_ns))
+
+    index = ProjectIndex(model_dir)
+    model_type, _ = index.get_stripped_contextual_model(model_dir / 'catalog.json')
+    assert 'back_matter' not in model_type.__fields__
+
+    (catalog_dir / 'back-matter.json').unlink()
+    model_type, _ = index.get_stripped_contextual_model(model_dir / 'catalog.json')
+    assert 'back_matter' in model_type.__fields__
+
+    index.refresh()
+    model_type, _ = index.get_stripped_contextual_model(model_dir / 'catalog.json')
+    assert 'back_matter' in model_type.__fields__
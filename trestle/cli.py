@@ -14,9 +14,11 @@
 # limitations under the License.
 """Starting point for the Trestle CLI."""
 import logging
+import pathlib
 
 from trestle.core.commands.add import AddCmd
 from trestle.core.commands.assemble import AssembleCmd
+from trestle.core.commands.cache import CacheCmd
 from trestle.core.commands.command_docs import CommandPlusDocs
 from trestle.core.commands.create import CreateCmd
 from trestle.core.commands.import_ import ImportCmd
@@ -29,6 +31,8 @@ from trestle.core.commands.split import SplitCmd
 from trestle.core.commands.task import TaskCmd
 from trestle.core.commands.validate import ValidateCmd
 from trestle.core.commands.version import VersionCmd
+from trestle.core.models.transaction import recover_transactions
+from trestle.utils import fs
 from trestle.utils import log
 
 logger = logging.getLogger('trestle')
@@ -50,6 +54,7 @@ class Trestle(CommandPlusDocs):
         ImportCmd,
         TaskCmd,
         AssembleCmd,
+        CacheCmd,
         VersionCmd
     ]
 
@@ -62,4 +67,9 @@ def run() -> None:
     log.set_global_logging_levels()
     logger.debug('Main entry point.')
 
+    # recover from the transactions of the project interrupted while committing, e.g. if trestle was killed
+    trestle_root = fs.get_trestle_project_root(pathlib.Path.cwd())
+    if trestle_root is not None:
+        recover_transactions(trestle_root)
+
     exit(Trestle().run())
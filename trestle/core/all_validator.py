@@ -15,9 +15,11 @@
 # limitations under the License.
 """Validate based on all registered validators."""
 
+from typing import Optional
+
 import trestle.core.validator_factory as vfact
 from trestle.core.base_model import OscalBaseModel
-from trestle.core.validator import Validator
+from trestle.core.validator import Validator, VisitingValidator, find_visit_failure
 
 
 class AllValidator(Validator):
@@ -25,8 +27,22 @@ class AllValidator(Validator):
 
     def model_is_valid(self, model: OscalBaseModel) -> bool:
         """Test if the model is valid."""
+        return self.find_failure(model) is None
+
+    def find_failure(self, model: OscalBaseModel) -> Optional[str]:
+        """Return the name of the first registered validator the model fails, or None if the model is valid.
+
+        The visiting validators share a single traversal of the model, the others validate the model in turn.
+        Validators which opt out of the all mode are not run.
+        """
+        visiting_validators = []
         for val in vfact.validator_factory.get_all():
-            if val != self:
-                if not val.model_is_valid(model):
-                    return False
-        return True
+            if val != self and val.run_in_all_mode:
+                if isinstance(val, VisitingValidator):
+                    visiting_validators.append(val)
+                else:
+                    failure = val.find_failure(model)
+                    if failure is not None:
+                        return failure
+        failed_validator = find_visit_failure(model, visiting_validators)
+        return None if failed_validator is None else failed_validator.__class__.__name__
@@ -27,21 +27,26 @@ I can write a comment in here and you can even edit on the same line.
 """
 
 import datetime
+import enum
+import functools
 import logging
 import pathlib
-from typing import Any, Dict, List, Optional, Type, Union, cast
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Type, Union, cast
 
-from pydantic import BaseModel, Extra, Field, create_model
-from pydantic.fields import ModelField
-from pydantic.parse import load_file
+from pydantic import BaseModel, ConstrainedInt, ConstrainedStr, EmailStr, Extra, Field, create_model
+from pydantic.fields import ModelField, SHAPE_DICT, SHAPE_LIST, SHAPE_MAPPING, SHAPE_SINGLETON
+from pydantic.utils import lenient_issubclass
 
 import trestle.core.const as const
 import trestle.core.err as err
+from trestle.core import json_backend
+from trestle.core import yaml_backend
+from trestle.core.content_stamps import ContentStamps
+from trestle.core.model_cache import ModelCache
 from trestle.core.models.file_content_type import FileContentType
+from trestle.core.stream_reader import OscalStreamReader
 from trestle.core.utils import classname_to_alias, get_origin, is_collection_field_type
 
-import yaml
-
 logger = logging.getLogger(__name__)
 
 
@@ -83,6 +88,9 @@ class OscalBaseModel(BaseModel):
         """Overriding configuration class for pydantic base model, for use with OSCAL data classes."""
 
         json_encoders = {datetime.datetime: lambda x: robust_datetime_serialization(x)}
+        # encode and decode through the configured JSON backend, see trestle.core.json_backend
+        json_loads = json_backend.loads
+        json_dumps = json_backend.dumps
         # this is not safe and caused class: nan in yaml output
         # TODO: Explore fix.
         allow_population_by_field_name = True
@@ -105,6 +113,9 @@ class OscalBaseModel(BaseModel):
         are mandatory. Given this the corresponding dataclasses are also strict. Workflows with trestle require missing
         mandatory fields. This allows creation of derivative models missing certain fields.
 
+        Created types are cached process wide, keyed by the current class and the set of stripped fields, so repeated
+        calls return the same class. See model_type_cache_info() for the cache statistics.
+
         Args:
             stripped_fields: The fields to be removed from the current data class.
             stripped_fields_aliases: The fields to be removed from the current data class provided by alias.
@@ -124,7 +135,8 @@ class OscalBaseModel(BaseModel):
         # create alias to field_name mapping
         excluded_fields = []
         if stripped_fields is not None:
-            excluded_fields = stripped_fields
+            # a single field name may be passed as a plain string
+            excluded_fields = [stripped_fields] if isinstance(stripped_fields, str) else stripped_fields
         elif stripped_fields_aliases is not None:
             alias_to_field = cls.alias_to_field_map()
             try:
@@ -132,28 +144,7 @@ class OscalBaseModel(BaseModel):
             except KeyError as e:
                 raise err.TrestleError(f'Field {str(e)} does not exist in the model')
 
-        current_fields = cls.__fields__
-        new_fields_for_model = {}
-        # Build field list
-        for current_mfield in current_fields.values():
-            if current_mfield.name in excluded_fields:
-                continue
-            # Validate name in the field
-            # Cehcke behaviour with an alias
-            if current_mfield.required:
-                new_fields_for_model[
-                    current_mfield.name
-                ] = (current_mfield.outer_type_, Field(..., title=current_mfield.name, alias=current_mfield.alias))
-            else:
-                new_fields_for_model[current_mfield.name] = (
-                    Optional[current_mfield.outer_type_],
-                    Field(None, title=current_mfield.name, alias=current_mfield.alias)
-                )
-        new_model = create_model(cls.__name__, __base__=OscalBaseModel, **new_fields_for_model)  # type: ignore
-        # TODO: This typing cast should NOT be necessary. Potentially fixable with a fix to pydantic. Issue #175
-        new_model = cast(Type[OscalBaseModel], new_model)
-
-        return new_model
+        return _create_stripped_model_type(cls, frozenset(excluded_fields))
 
     def get_field_value(self, field_name_or_alias: str) -> Any:
         """Get attribute value by field alias or field name."""
@@ -214,21 +205,33 @@ class OscalBaseModel(BaseModel):
         """
         Wrap a oscal object such that it is inside a containing object.
 
+        The wrapper class is created once per model class.
+
         Returns:
             Wrapped model as a OscalBaseModel.
         """
-        class_name = self.__class__.__name__
-        # It would be nice to pass through the description but I can't seem to and
-        # it does not affect the output
-        dynamic_parser = {}
-        dynamic_parser[classname_to_alias(class_name, 'field')] = (
-            self.__class__,
-            Field(self, title=classname_to_alias(class_name, 'field'), alias=classname_to_alias(class_name, 'json'))
-        )
-        wrapper_model = create_model(class_name, __base__=OscalBaseModel, **dynamic_parser)  # type: ignore
-        # Default behaviour is strange here.
-        wrapped_model = wrapper_model(**{classname_to_alias(class_name, 'json'): self})
-        return wrapped_model
+        alias = classname_to_alias(self.__class__.__name__, 'json')
+        return _wrapper_model_type(self.__class__, alias)(**{alias: self})
+
+    def oscal_wrapped_json(self, alias: Optional[str] = None, indent: Optional[int] = None) -> str:
+        """
+        Return the model serialized inside a json object with the alias as its only key.
+
+        The output is that of a model wrapping this one, e.g. from _oscal_wrap(), without creating the wrapper.
+
+        Args:
+            alias: The key of the wrapping object, by default the alias of the class, e.g. target-definition.
+            indent: The indentation of the json output, or None for a single line.
+
+        Returns:
+            The wrapped model as json.
+        """
+        if alias is None:
+            alias = classname_to_alias(self.__class__.__name__, 'json')
+        data = self.dict(by_alias=True, exclude_none=True)
+        if self.__custom_root_type__:
+            data = data['__root__']
+        return self.__config__.json_dumps({alias: data}, default=self.__json_encoder__, indent=indent)
 
     def oscal_serialize_json(self) -> str:
         """
@@ -257,24 +260,49 @@ class OscalBaseModel(BaseModel):
         Raises:
             err.TrestleError: If a unknown file extension is provided.
         """
-        wrapped_model = self._oscal_wrap()
-        #
+        alias = classname_to_alias(self.__class__.__name__, 'json')
         content_type = FileContentType.to_content_type(path.suffix)
-        write_file = pathlib.Path(path).open('w', encoding=const.FILE_ENCODING)
-        if content_type == FileContentType.YAML:
-            yaml.dump(yaml.safe_load(wrapped_model.json(exclude_none=True, by_alias=True)), write_file)
-        elif content_type == FileContentType.JSON:
-            write_file.write(wrapped_model.json(exclude_none=True, by_alias=True, indent=2))
+        with pathlib.Path(path).open('w', encoding=const.FILE_ENCODING) as write_file:
+            if content_type == FileContentType.YAML:
+                yaml_backend.dump({alias: yaml_backend.to_yaml_data(self)}, write_file)
+            elif content_type == FileContentType.JSON:
+                write_file.write(self.oscal_wrapped_json(alias, indent=2))
+        stamps = ContentStamps.for_path(path)
+        if stamps is not None:
+            stamps.record(path, self.__class__)
+
+    @classmethod
+    def oscal_stream(cls, path: pathlib.Path, element_paths: Optional[List[str]] = None) -> OscalStreamReader:
+        """
+        Open an OSCAL document to read the items of its large collections one at a time.
+
+        The top level members other than the streamed collections, e.g. the metadata, are available from the reader
+        before the items are read. Assessment results and POA&M documents have default collections to stream, e.g.
+        the observations, findings and results of assessment results.
+
+        Args:
+            path: The path of the oscal object to read.
+            element_paths: The element paths of the collections to stream, e.g.
+                assessment-results.results.*.observations.*, see trestle.core.stream_reader.
+        Returns:
+            The reader of the document, to be closed once read.
+        """
+        return OscalStreamReader(path, cls, element_paths)
 
     @classmethod
-    def oscal_read(cls, path: pathlib.Path) -> 'OscalBaseModel':
+    def oscal_read(cls, path: pathlib.Path, trusted: bool = False) -> 'OscalBaseModel':
         """
         Read OSCAL objects.
 
         Handles the fact OSCAL wraps top level elements and also deals with both yaml and json.
+        If the model cache is enabled for the trestle project containing the file, the decoded content is read from
+        and stored to the cache. Content read from the cache was validated against the model class when it was stored,
+        so the object is built from it without validation.
 
         Args:
             path: The path of the oscal object to read.
+            trusted: Whether the object is built without validation if the file still matches the content stamp
+                recorded when trestle wrote it. Files without a matching stamp are always validated.
         Returns:
             The oscal object read into trestle oscal models.
         """
@@ -288,23 +316,63 @@ class OscalBaseModel(BaseModel):
             logger.error(f'path does not exist in oscal_read: {path}')
             return None
 
-        obj: Dict[str, Any] = {}
-        try:
-            if content_type == FileContentType.YAML:
-                obj = yaml.safe_load(path.open())
-            elif content_type == FileContentType.JSON:
-                obj = load_file(
-                    path,
-                    json_loads=cls.__config__.json_loads,
-                )
-        except Exception as e:
-            raise err.TrestleError(f'Error loading file {path} {e}')
-        try:
-            parsed = cls.parse_obj(obj[alias])
-        except Exception as e:
-            raise err.TrestleError(f'Error parsing file {path} {e}')
+        cache = ModelCache.for_path(path)
+        obj: Optional[Dict[str, Any]] = None
+        content: Optional[bytes] = None
+        if cache is not None:
+            obj = cache.get(path, cls)
+            if obj is not None:
+                logger.debug(f'oscal_read using model cache entry for {path}')
+
+        if obj is None:
+            try:
+                file_stat = path.stat()
+                content = path.read_bytes()
+                if content_type == FileContentType.YAML:
+                    obj = yaml_backend.load(content)
+                elif content_type == FileContentType.JSON:
+                    obj = cls.__config__.json_loads(content)
+            except Exception as e:
+                raise err.TrestleError(f'Error loading file {path} {e}')
+
+        parsed = None
+        # an entry of the model cache is only stored once its content has been validated against the model class
+        validated = content is None
+        if not validated and trusted:
+            stamps = ContentStamps.for_path(path)
+            validated = stamps is not None and stamps.verify(path, cls, content)
+        if validated:
+            try:
+                parsed = cls.trusted_construct(obj[alias])
+            except Exception as e:
+                logger.debug(f'Trusted read of {path} failed, falling back to validation: {e}')
+        if parsed is None:
+            try:
+                parsed = cls.parse_obj(obj[alias])
+            except Exception as e:
+                raise err.TrestleError(f'Error parsing file {path} {e}')
+        if cache is not None and content is not None:
+            cache.put(path, cls, file_stat, content, obj)
         return parsed
 
+    @classmethod
+    def trusted_construct(cls, obj: Any) -> 'OscalBaseModel':
+        """
+        Build an instance from already validated data without running the pydantic validators.
+
+        Unlike construct(), the nested models, enums and datetimes are built recursively from the raw data, so the
+        result is equivalent to parse_obj() for data that is known to be valid, e.g. written by trestle itself.
+        Only the leaf values with a non trivial type (urls, datetimes) are still validated.
+
+        Args:
+            obj: The decoded json or yaml content of the object, keyed by alias.
+        Returns:
+            The oscal object.
+        Raises:
+            err.TrestleError: If the data has a field that is not part of the model.
+        """
+        return _construct_model(cls, obj)
+
     def copy_to(self, new_oscal_type: Type['OscalBaseModel']) -> 'OscalBaseModel':
         """
         Opportunistic copy operation between similar types of data classes.
@@ -410,3 +478,170 @@ class OscalBaseModel(BaseModel):
         if not cls.is_collection_container():
             raise err.TrestleError('OscalBaseModel is not wrapping a collection type')
         return get_origin(cls.__fields__['__root__'].outer_type_)
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def _create_stripped_model_type(base_model_type: Type[OscalBaseModel],
+                                excluded_fields: FrozenSet[str]) -> Type[OscalBaseModel]:
+    """Create, or return the already created, stripped variant of base_model_type missing excluded_fields."""
+    current_fields = base_model_type.__fields__
+    new_fields_for_model = {}
+    # Build field list
+    for current_mfield in current_fields.values():
+        if current_mfield.name in excluded_fields:
+            continue
+        # Validate name in the field
+        # Cehcke behaviour with an alias
+        if current_mfield.required:
+            new_fields_for_model[
+                current_mfield.name
+            ] = (current_mfield.outer_type_, Field(..., title=current_mfield.name, alias=current_mfield.alias))
+        else:
+            new_fields_for_model[current_mfield.name] = (
+                Optional[current_mfield.outer_type_],
+                Field(None, title=current_mfield.name, alias=current_mfield.alias)
+            )
+    new_model = create_model(base_model_type.__name__, __base__=OscalBaseModel, **new_fields_for_model)  # type: ignore
+    # TODO: This typing cast should NOT be necessary. Potentially fixable with a fix to pydantic. Issue #175
+    new_model = cast(Type[OscalBaseModel], new_model)
+
+    return new_model
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def create_collection_wrapper_type(class_name: str, collection_type: Any) -> Type[OscalBaseModel]:
+    """Create, or return the already created, model wrapping a collection type in a __root__ field.
+
+    Args:
+        class_name: The name of the wrapper class.
+        collection_type: The collection type being wrapped e.g. List[Role].
+
+    Returns:
+        Pydantic data class with a single __root__ field of the collection type.
+    """
+    wrapper_model = create_model(class_name, __base__=OscalBaseModel, __root__=(collection_type, ...))
+    return cast(Type[OscalBaseModel], wrapper_model)
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def _wrapper_model_type(model_type: Type[OscalBaseModel], alias: str) -> Type[OscalBaseModel]:
+    """Create, or return the already created, model wrapping a model of the class in a field with the alias."""
+    field_name = alias.replace('-', '_')
+    wrapper_model = create_model(
+        model_type.__name__,
+        __base__=OscalBaseModel,
+        **{field_name: (model_type, Field(..., title=field_name, alias=alias))}  # type: ignore
+    )
+    return cast(Type[OscalBaseModel], wrapper_model)
+
+
+# Builds a field value from raw data, or None if the raw value is used as is.
+_ValueBuilder = Optional[Callable[[Any], Any]]
+
+
+class _ModelBuilder:
+    """Builds instances of a model class from already validated raw data without running the validators."""
+
+    def __init__(self, model_type: Type[BaseModel]) -> None:
+        self._model_type = model_type
+        self._custom_root = model_type.__custom_root_type__
+        # map of alias and field name to field name and value builder
+        self._builders: Dict[str, Tuple[str, _ValueBuilder]] = {}
+        # names of the fields in order, with the field if it is optional and its default is not simply None
+        self._layout: List[Tuple[str, bool, Optional[ModelField]]] = []
+        for field in model_type.__fields__.values():
+            builder = _value_builder(field)
+            self._builders[field.name] = (field.name, builder)
+            self._builders[field.alias] = (field.name, builder)
+            default_field = None if field.required or field.default is None else field
+            self._layout.append((field.name, bool(field.required), default_field))
+
+    def __call__(self, obj: Any) -> BaseModel:
+        raw_values: Dict[str, Any] = {}
+        if self._custom_root:
+            obj = {'__root__': obj}
+        for key, value in obj.items():
+            entry = self._builders.get(key)
+            if entry is None:
+                raise err.TrestleError(f'Field {key} does not exist in the model {self._model_type.__name__}')
+            name, builder = entry
+            raw_values[name] = value if value is None or builder is None else builder(value)
+
+        # like construct(), keep the field order and fill in the defaults of the fields not set
+        values: Dict[str, Any] = {}
+        for name, required, default_field in self._layout:
+            if name in raw_values:
+                values[name] = raw_values[name]
+            elif default_field is not None:
+                values[name] = default_field.get_default()
+            elif not required:
+                values[name] = None
+        instance = self._model_type.__new__(self._model_type)
+        object.__setattr__(instance, '__dict__', values)
+        object.__setattr__(instance, '__fields_set__', set(raw_values))
+        instance._init_private_attributes()
+        return instance
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def _model_builder(model_type: Type[BaseModel]) -> _ModelBuilder:
+    """Create, or return the already created, builder of model_type."""
+    return _ModelBuilder(model_type)
+
+
+def _construct_model(model_type: Type[BaseModel], obj: Any) -> BaseModel:
+    """Build an instance of model_type from raw data without validation."""
+    return _model_builder(model_type)(obj)
+
+
+def _validate_value(field: ModelField, value: Any) -> Any:
+    validated, errors = field.validate(value, {}, loc=field.alias)
+    if errors:
+        raise err.TrestleError(f'Invalid value for field {field.alias}: {errors}')
+    return validated
+
+
+def _value_builder(field: ModelField) -> _ValueBuilder:
+    """Return the builder of the values of a field, recursing into collections and models."""
+    if field.shape == SHAPE_SINGLETON:
+        field_type = field.type_
+        if lenient_issubclass(field_type, BaseModel):
+            # resolved lazily since models can be recursive, e.g. parts of a part
+            return functools.partial(_construct_model, field_type)
+        if lenient_issubclass(field_type, enum.Enum):
+            return field_type
+        if field_type in (str, int, float, bool) or lenient_issubclass(field_type,
+                                                                       (ConstrainedStr, ConstrainedInt, EmailStr)):
+            return None
+    elif field.shape == SHAPE_LIST:
+        item_builder = _value_builder(field.sub_fields[0])
+        if item_builder is None:
+            return list
+        return lambda value: [None if item is None else item_builder(item) for item in value]
+    elif field.shape in (SHAPE_DICT, SHAPE_MAPPING):
+        item_builder = _value_builder(field.sub_fields[0])
+        if item_builder is None:
+            return dict
+        return lambda value: {key: None if item is None else item_builder(item) for key, item in value.items()}
+    # anything else, e.g. urls and datetimes, still goes through the field validators
+    return functools.partial(_validate_value, field)
+
+
+def model_type_cache_info() -> Dict[str, Any]:
+    """Return the hit/miss statistics of the caches holding dynamically created model types.
+
+    Returns:
+        A dict of cache name to functools CacheInfo named tuple (hits, misses, maxsize, currsize).
+    """
+    return {
+        'stripped': _create_stripped_model_type.cache_info(),
+        'collection_wrapper': create_collection_wrapper_type.cache_info(),
+        'wrapper': _wrapper_model_type.cache_info()
+    }
+
+
+def clear_model_type_cache() -> None:
+    """Clear the caches holding dynamically created model types."""
+    _create_stripped_model_type.cache_clear()
+    create_collection_wrapper_type.cache_clear()
+    _wrapper_model_type.cache_clear()
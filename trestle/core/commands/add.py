@@ -90,7 +90,7 @@ class AddCmd(CommandPlusDocs):
             add_plan.add_action(write_action)
 
             add_plan.simulate()
-            add_plan.execute()
+            add_plan.execute(staged=True)
 
         except BaseException as err:
             logger.error(f'Add failed: {err}')
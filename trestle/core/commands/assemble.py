@@ -192,7 +192,7 @@ class AssembleCmd(CommandPlusDocs):
                 return 1
 
             # distributed load
-            _, _, assembled_model = load_distributed(root_model_filepath)
+            _, _, assembled_model = load_distributed(root_model_filepath, trusted=True)
             plural_alias = fs.model_type_to_model_dir(model_alias)
 
             assembled_model_dir = trestle_root / const.TRESTLE_DIST_DIR / plural_alias
@@ -211,7 +211,7 @@ class AssembleCmd(CommandPlusDocs):
 
             try:
                 plan.simulate()
-                plan.execute()
+                plan.execute(staged=True)
             except Exception as e:
                 logger.error('Unknown error executing trestle create operations. Rolling back.')
                 logger.debug(e)
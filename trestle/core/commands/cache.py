@@ -0,0 +1,138 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Trestle Cache Command.
+
+Umbrella command for inspecting and managing the caches kept under .trestle.
+"""
+import argparse
+import logging
+import pathlib
+from typing import Optional
+
+import trestle.utils.fs as fs
+import trestle.utils.log as log
+from trestle.core.commands.command_docs import CommandPlusDocs
+from trestle.core.content_stamps import ContentStamps
+from trestle.core.model_cache import ModelCache
+from trestle.core.models.transaction import recover_transactions
+from trestle.core.remote.blob_store import BlobStore
+from trestle.core.validation_manifest import ValidationManifest
+
+logger = logging.getLogger(__name__)
+
+
+def _get_trestle_root() -> Optional[pathlib.Path]:
+    trestle_root = fs.get_trestle_project_root(pathlib.Path.cwd())
+    if trestle_root is None:
+        logger.error(f'Current working directory {pathlib.Path.cwd()} is not within a trestle project.')
+    return trestle_root
+
+
+class CacheStatsCmd(CommandPlusDocs):
+    """Show the number of entries and the size of the trestle caches."""
+
+    name = 'stats'
+
+    def _run(self, args: argparse.Namespace) -> int:
+        log.set_log_level_from_args(args)
+        trestle_root = _get_trestle_root()
+        if trestle_root is None:
+            return 1
+        model_cache = ModelCache(trestle_root)
+        stats = model_cache.stats()
+        enabled = ModelCache.is_enabled(trestle_root)
+        self.out(
+            f'model cache ({"enabled" if enabled else "disabled"}): {stats["entries"]} entries, '
+            f'{stats["size"]} bytes in {model_cache.cache_dir}'
+        )
+        content_stamps = ContentStamps(trestle_root)
+        enabled = ContentStamps.is_enabled(trestle_root)
+        self.out(
+            f'content stamps ({"enabled" if enabled else "disabled"}): {content_stamps.count()} stamps in '
+            f'{content_stamps.stamps_dir}'
+        )
+        manifest = ValidationManifest(trestle_root)
+        enabled = ValidationManifest.is_enabled(trestle_root)
+        self.out(
+            f'validation manifest ({"enabled" if enabled else "disabled"}): {manifest.count()} models in '
+            f'{manifest.manifest_path}'
+        )
+        store = BlobStore.for_trestle_root(trestle_root)
+        stats = store.stats()
+        self.out(
+            f'remote cache: {stats["objects"]} objects in {stats["blobs"]} blobs, {stats["size"]} of '
+            f'{stats["max_size"]} bytes in {store.cache_dir}'
+        )
+        return 0
+
+
+class CacheClearCmd(CommandPlusDocs):
+    """Remove all entries from the trestle caches."""
+
+    name = 'clear'
+
+    def _run(self, args: argparse.Namespace) -> int:
+        log.set_log_level_from_args(args)
+        trestle_root = _get_trestle_root()
+        if trestle_root is None:
+            return 1
+        removed = ModelCache(trestle_root).clear()
+        self.out(f'model cache: removed {removed} entries')
+        removed = ContentStamps(trestle_root).clear()
+        self.out(f'content stamps: removed {removed} stamps')
+        removed = ValidationManifest(trestle_root).clear()
+        self.out(f'validation manifest: removed {removed} models')
+        removed = BlobStore.for_trestle_root(trestle_root).clear()
+        self.out(f'remote cache: removed {removed} objects')
+        return 0
+
+
+class CachePruneCmd(CommandPlusDocs):
+    """Remove the unused entries of the remote cache and evict it down to its maximum size, and recover transactions."""
+
+    name = 'prune'
+
+    def _init_arguments(self) -> None:
+        self.add_argument(
+            '--max-size',
+            help='Size in bytes to evict the remote cache down to, by default its maximum size.',
+            type=int
+        )
+
+    def _run(self, args: argparse.Namespace) -> int:
+        log.set_log_level_from_args(args)
+        trestle_root = _get_trestle_root()
+        if trestle_root is None:
+            return 1
+        store = BlobStore.for_trestle_root(trestle_root)
+        removed = store.prune(args.max_size)
+        stats = store.stats()
+        self.out(
+            f'remote cache: removed {removed["entries"]} unused entries and {removed["blobs"]} unused blobs, evicted '
+            f'{removed["evicted"]} blobs down to {stats["size"]} bytes'
+        )
+        recovered = recover_transactions(trestle_root)
+        self.out(f'transactions: recovered {recovered} interrupted commits')
+        return 0
+
+
+class CacheCmd(CommandPlusDocs):
+    """Inspect and manage the caches kept under .trestle."""
+
+    name = 'cache'
+
+    subcommands = [CacheStatsCmd, CacheClearCmd, CachePruneCmd]
@@ -191,7 +191,7 @@ class CreateCmd(CommandPlusDocs):
             create_plan.add_action(create_action)
             create_plan.add_action(write_action)
             create_plan.simulate()
-            create_plan.execute()
+            create_plan.execute(staged=True)
             return 0
         except Exception as e:
             logger.error('Unknown error executing trestle create operations. Rolling back.')
@@ -19,7 +19,7 @@ import logging
 import pathlib
 from json.decoder import JSONDecodeError
 
-import trestle.core.commands.validate as validatecmd
+import trestle.core.const as const
 from trestle.core import parser
 from trestle.core import validator_helper
 from trestle.core.commands.command_docs import CommandPlusDocs
@@ -28,6 +28,7 @@ from trestle.core.models.actions import CreatePathAction, WriteFileAction
 from trestle.core.models.elements import Element
 from trestle.core.models.file_content_type import FileContentType
 from trestle.core.models.plans import Plan
+from trestle.core.validator_factory import validator_factory
 from trestle.utils import fs
 from trestle.utils import log
 
@@ -50,6 +51,13 @@ class ImportCmd(CommandPlusDocs):
             '-r', '--regenerate', action='store_true', help='Enable regeneration of uuids within the document'
         )
 
+        self.add_argument(
+            '--uuid-seed',
+            help='Seed of the uuids regenerated with -r, the same seed always giving the same uuids.',
+            type=str,
+            required=False
+        )
+
     def _run(self, args: argparse.Namespace) -> int:
         """Top level import run command."""
         log.set_log_level_from_args(args)
@@ -116,14 +124,16 @@ class ImportCmd(CommandPlusDocs):
             logger.error(f'Import failed, failed to parse input file for root key: {err}')
             return 1
 
-        # 4.3 parse the model
+        # 4.3 parse the model, which is then validated and written from memory
         parent_model_name = parser.to_full_model_name(parent_alias)
         try:
-            parent_model = parser.parse_dict(data[parent_alias], parent_model_name)
+            model_read = parser.parse_dict(data[parent_alias], parent_model_name)
         except TrestleError as err:
             logger.debug(f'parser.parse_file() failed: {err}')
             logger.error(f'Import failed, failed to parse valid contents of input file: {err}')
             return 1
+        # release the loaded data, which is as large as the model
+        del data
 
         # 5. Work out output directory and file
         plural_path = fs.model_type_to_model_dir(parent_alias)
@@ -139,12 +149,26 @@ class ImportCmd(CommandPlusDocs):
             logger.error('Aborting trestle import.')
             return 1
 
-        # 6. Prepare actions and plan
-        model_read = parent_model.oscal_read(input_file)
+        # 6. Validate the model before anything is written
         if args.regenerate:
             logger.debug(f'regenerating uuids in {input_file}')
-            model_read, lut, nchanged = validator_helper.regenerate_uuids(model_read)
+            seed = args.uuid_seed if 'uuid_seed' in args else None
+            model_read, lut, nchanged = validator_helper.regenerate_uuids(model_read, seed)
             logger.debug(f'uuid lut has {len(lut.items())} entries and {nchanged} refs were updated')
+
+        try:
+            failed_validator = validator_factory.get(argparse.Namespace(mode=const.VAL_MODE_ALL)
+                                                     ).find_failure(model_read)
+        except TrestleError as err:
+            logger.debug(f'validator.find_failure() raised exception: {err}')
+            logger.error(f'Import of {str(input_file.resolve())} failed, validation failed with error: {err}')
+            return 1
+        if failed_validator is not None:
+            logger.debug(f'{failed_validator} rejected {input_file}')
+            logger.error(f'Import of {str(input_file.resolve())} failed, validation failed with {failed_validator}')
+            return 1
+
+        # 7. Prepare actions and plan
         top_element = Element(model_read)
         create_action = CreatePathAction(desired_model_path, True)
         write_action = WriteFileAction(desired_model_path, top_element, content_type)
@@ -161,39 +185,14 @@ class ImportCmd(CommandPlusDocs):
             logger.error(f'Import failed, error in testing import operation: {err}')
             return 1
 
+        # the file is staged and then moved into place, so nothing is left behind on failure
         try:
-            import_plan.execute()
+            import_plan.execute(staged=True)
         except TrestleError as err:
             logger.debug(f'import_plan.execute() failed: {err}')
             logger.error(f'Import failed, error in actual import operation: {err}')
             return 1
 
-        # 7. Validate the imported file, rollback if unsuccessful:
-        args = argparse.Namespace(file=desired_model_path, mode='all', verbose=args.verbose)
-        rollback = False
-        try:
-            rc = validatecmd.ValidateCmd()._run(args)
-        except TrestleError as err:
-            logger.debug(f'validator.validate() raised exception: {err}')
-            logger.error(f'Import of {str(input_file.resolve())} failed, validation failed with error: {err}')
-            rollback = True
-        else:
-            if rc > 0:
-                logger.debug(f'validator.validate() found duplicates in {desired_model_path}')
-                msg = f'Validation of imported file {desired_model_path} failed due to the presence of duplicate uuids'
-                logger.error(msg)
-                rollback = True
-
-        if rollback:
-            logger.debug(f'Rolling back import of {str(input_file.resolve())} to {desired_model_path}')
-            try:
-                import_plan.rollback()
-            except TrestleError as err:
-                logger.debug(f'Failed rollback attempt with error: {err}')
-                logger.error(f'Failed to rollback: {err}. Remove {desired_model_path} to resolve state.')
-            return 1
-        else:
-            logger.debug(f'Successful rollback of import to {desired_model_path}')
         # 8. Leave the rest to trestle split
 
         return 0
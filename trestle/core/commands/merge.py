@@ -29,6 +29,7 @@ from trestle.core.models.file_content_type import FileContentType
 from trestle.core.models.plans import Plan
 from trestle.utils import fs, load_distributed
 from trestle.utils import log
+from trestle.utils.project_index import ProjectIndex
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +46,7 @@ class MergeCmd(CommandPlusDocs):
             help=f'{const.ARG_DESC_ELEMENT}(s) to be merged. The last element is merged into the second last element.',
             required=True
         )
+        self.add_argument(f'--{const.ARG_PARALLEL}', help=const.ARG_DESC_PARALLEL, action='store_true')
 
     def _run(self, args: argparse.Namespace) -> int:
         """Merge elements into the parent oscal model."""
@@ -54,23 +56,24 @@ class MergeCmd(CommandPlusDocs):
         elements_clean = args.element.strip("'")
 
         element_paths = elements_clean.split(',')
+        parallel = const.ARG_PARALLEL in args and args.parallel
         logger.debug(f'merge _run element paths {element_paths}')
         try:
             for element_path in element_paths:
                 logger.debug(f'merge {element_path}')
-                plan = self.merge(ElementPath(element_path))
+                plan = self.merge(ElementPath(element_path), parallel)
                 plan.simulate()
-                plan.execute()
+                plan.execute(parallel, staged=True)
         except BaseException as err:
             logger.error(f'Merge failed: {err}')
             return 1
         return 0
 
     @classmethod
-    def merge(cls, element_path: ElementPath) -> Plan:
+    def merge(cls, element_path: ElementPath, parallel: bool = False) -> Plan:
         """Merge operations.
 
-        It returns a plan for the operation
+        It returns a plan for the operation. If parallel is True the distributed models are loaded concurrently.
         """
         element_path_list = element_path.get_full_path_parts()
         target_model_alias = element_path_list[-1]
@@ -91,13 +94,14 @@ class MergeCmd(CommandPlusDocs):
         destination_model_filename = Path(f'{utils.classname_to_alias(destination_model_alias, "json")}{file_ext}')
         destination_model_filename = destination_model_filename.resolve()
         logger.debug(f'destination model filename is {destination_model_filename}')
-        destination_model_type, _ = fs.get_stripped_contextual_model(destination_model_filename)
+        project_index = ProjectIndex.for_path(destination_model_filename)
+        destination_model_type, _ = project_index.get_stripped_contextual_model(destination_model_filename)
 
         # if there is no .json file then there is no destination model object at this point, so create empty one
         destination_model_object: OscalBaseModel = None
         if destination_model_filename.exists():
             logger.debug('dest filename exists so read it')
-            destination_model_object = destination_model_type.oscal_read(destination_model_filename)
+            destination_model_object = destination_model_type.oscal_read(destination_model_filename, trusted=True)
         else:
             logger.debug('dest filename does not exist')
         """1.5. If target is wildcard, load distributed destrination model and replace destination model."""
@@ -109,7 +113,7 @@ class MergeCmd(CommandPlusDocs):
                 collection_type = destination_model_type.get_collection_type()
 
             merged_model_type, merged_model_alias, merged_model_instance = load_distributed.load_distributed(
-                destination_model_filename, collection_type)
+                destination_model_filename, collection_type, parallel, trusted=True)
             plan = Plan()
             reset_destination_action = CreatePathAction(destination_model_filename.resolve(), clear_content=True)
             wrapper_alias = destination_model_alias
@@ -125,7 +129,7 @@ class MergeCmd(CommandPlusDocs):
 
         logger.debug(f'get dest model with fields stripped: {target_model_alias}')
         # Get destination model without the target field stripped
-        merged_model_type, merged_model_alias = fs.get_stripped_contextual_model(
+        merged_model_type, merged_model_alias = project_index.get_stripped_contextual_model(
             destination_model_filename,
             aliases_not_to_be_stripped=[target_model_alias])
         """2. Load Target model. Target model could be stripped"""
@@ -156,14 +160,18 @@ class MergeCmd(CommandPlusDocs):
         target_model_filename = target_model_path.with_suffix(file_ext)
         if target_model_filename.exists():
             logger.debug(f'target model path with extension does exist so load distrib {target_model_filename}')
-            _, _, target_model_object = load_distributed.load_distributed(target_model_filename)
+            _, _, target_model_object = load_distributed.load_distributed(
+                target_model_filename, parallel=parallel, trusted=True
+            )
         else:
             target_model_filename = Path(target_model_path)
             logger.debug(f'target model path plus extension does not exist so load distrib {target_model_filename}')
             logger.debug(f'get collection type for model type {target_model_type}')
             collection_type = utils.get_origin(target_model_type)
             logger.debug(f'load {target_model_filename} as collection type {collection_type}')
-            _, _, target_model_object = load_distributed.load_distributed(target_model_filename, collection_type)
+            _, _, target_model_object = load_distributed.load_distributed(
+                target_model_filename, collection_type, parallel, trusted=True
+            )
 
         if hasattr(target_model_object, '__dict__') and '__root__' in target_model_object.__dict__:
             logger.debug('loaded object has dict and root so set target model object to root contents')
@@ -113,7 +113,7 @@ class RemoveCmd(CommandPlusDocs):
             return 1
 
         try:
-            add_plan.execute()
+            add_plan.execute(staged=True)
         except TrestleError as err:
             logger.debug(f'Remove failed at execute(): {err}')
             logger.error(f'Remove failed (execute()): {err}')
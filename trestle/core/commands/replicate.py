@@ -156,6 +156,13 @@ class ReplicateCmd(CommandPlusDocs):
             '-r', '--regenerate', action='store_true', help='Enable regeneration of uuids within the document'
         )
 
+        self.add_argument(
+            '--uuid-seed',
+            help='Seed of the uuids regenerated with -r, the same seed always giving the same uuids.',
+            type=str,
+            required=False
+        )
+
     @classmethod
     def replicate_object(cls, model_alias: str, object_type: Type[TLO], args: argparse.Namespace) -> int:
         """
@@ -222,7 +229,8 @@ class ReplicateCmd(CommandPlusDocs):
 
         if args.regenerate:
             logger.debug(f'regenerating uuids for model {input_file}')
-            model_instance, uuid_lut, n_refs_updated = validator_helper.regenerate_uuids(model_instance)
+            seed = args.uuid_seed if 'uuid_seed' in args else None
+            model_instance, uuid_lut, n_refs_updated = validator_helper.regenerate_uuids(model_instance, seed)
             logger.debug(f'{len(uuid_lut)} uuids generated and {n_refs_updated} references updated')
 
         # 6. Prepare actions and plan
@@ -243,7 +251,7 @@ class ReplicateCmd(CommandPlusDocs):
             return 1
 
         try:
-            replicate_plan.execute()
+            replicate_plan.execute(staged=True)
         except TrestleError as err:
             logger.debug(f'replicate_plan.execute() failed: {err}')
             logger.error(f'Replicate failed, error in executing replication operation: {err}')
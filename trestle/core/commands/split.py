@@ -26,11 +26,11 @@ from trestle.core.base_model import OscalBaseModel
 from trestle.core.commands import cmd_utils
 from trestle.core.commands.command_docs import CommandPlusDocs
 from trestle.core.err import TrestleError
-from trestle.core.models.actions import Action, CreatePathAction, WriteFileAction
+from trestle.core.models.actions import Action, CreatePathAction, RemovePathAction, WriteFileAction
 from trestle.core.models.elements import Element, ElementPath
 from trestle.core.models.file_content_type import FileContentType
 from trestle.core.models.plans import Plan
-from trestle.utils import fs, trash
+from trestle.utils.project_index import ProjectIndex
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +51,7 @@ class SplitCmd(CommandPlusDocs):
             f'--{const.ARG_ELEMENT}',
             help=const.ARG_DESC_ELEMENT + ' to split.',
         )
+        self.add_argument(f'--{const.ARG_PARALLEL}', help=const.ARG_DESC_PARALLEL_WRITE, action='store_true')
 
     def _run(self, args: argparse.Namespace) -> int:
         """Split an OSCAL file into elements."""
@@ -72,7 +73,7 @@ class SplitCmd(CommandPlusDocs):
         file_absolute_path = pathlib.Path(file_path.resolve())
         base_dir = file_absolute_path.parent
 
-        model_type, _ = fs.get_stripped_contextual_model(file_absolute_path)
+        model_type, _ = ProjectIndex.for_path(file_absolute_path).get_stripped_contextual_model(file_absolute_path)
 
         # FIXME: Handle list/dicts
         model: OscalBaseModel = model_type.oscal_read(file_path)
@@ -87,16 +88,19 @@ class SplitCmd(CommandPlusDocs):
             model, element_paths, base_dir, content_type, root_file_name=args_raw[const.ARG_FILE]
         )
 
+        # the original file is first moved to the trash, within the same transaction as the files of the split
+        # so that it is put back in place if the split fails
+        plan = Plan()
+        plan.add_action(RemovePathAction(file_absolute_path))
+        plan.add_actions(split_plan.get_actions())
+
         # Simulate the plan
         # if it fails, it would throw errors and get out of this command
-        split_plan.simulate()
-
-        # If we are here then simulation passed
-        # so move the original file to the trash
-        trash.store(file_path, True)
+        parallel = const.ARG_PARALLEL in args and args.parallel
+        plan.simulate()
 
         # execute the plan
-        split_plan.execute()
+        plan.execute(parallel, staged=True)
         return 0
 
     @classmethod
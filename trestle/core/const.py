@@ -86,9 +86,14 @@ ARG_ITEM = 'item'
 ARG_ITEM_SHORT = 'i'
 ARG_DESC_ITEM = 'Item used'
 
+ARG_PARALLEL = 'parallel'
+ARG_DESC_PARALLEL = 'Read and parse decomposed model fragments concurrently'
+ARG_DESC_PARALLEL_WRITE = 'Serialize and write the model fragments concurrently'
+
 VAL_MODE_DUPLICATES = 'duplicates'
 VAL_MODE_NCNAME = 'ncname'
 VAL_MODE_REFS = 'refs'
+VAL_MODE_REFS_FULL = 'refs-full'
 VAL_MODE_ALL = 'all'
 
 FILE_ENCODING = 'utf8'
@@ -104,3 +109,77 @@ WEBSITE_ROOT = 'https://ibm.github.io/compliance-trestle'
 BUG_REPORT = 'https://github.com/IBM/compliance-trestle/issues/new/choose'
 
 NCNAME_REGEX = r'^[a-zA-Z_][\w.-]*$'
+
+# Collections of OSCAL models keyed by the uuid of their members
+UUID_KEYED_FIELDS = frozenset(['capabilities', 'components', 'diagrams', 'targets', 'users'])
+# Collections of OSCAL models keyed by the uuid of the object their members refer to
+UUID_REF_KEYED_FIELDS = frozenset(['by_components', 'incorporates_components', 'incorporates_targets'])
+# Collections of OSCAL models keyed by the id of the role their members refer to
+ROLE_KEYED_FIELDS = frozenset(['responsible_parties', 'responsible_roles'])
+# Fields of OSCAL models holding a reference to a uuid
+UUID_REF_FIELDS = frozenset(
+    [
+        'activity_uuid',
+        'component_uuid',
+        'implementation_statement_uuid',
+        'implementation_uuid',
+        'observation_uuid',
+        'party_uuid',
+        'provided_uuid',
+        'response_uuid',
+        'responsibility_uuid',
+        'risk_uuid',
+        'subject_placeholder_uuid',
+        'target_uuid',
+        'task_uuid',
+        'uuid_ref'
+    ]
+)
+# Fields of OSCAL models holding a list of references to uuids, e.g. the organizations a party is a member of
+UUID_REF_LIST_FIELDS = frozenset(['location_uuids', 'member_of_organizations', 'party_uuids'])
+
+# Maximum number of dynamically created (stripped or collection wrapper) model types kept in memory
+MODEL_TYPE_CACHE_SIZE = 1024
+
+# Maximum number of directories whose trestle project root is kept in memory
+TRESTLE_ROOT_CACHE_SIZE = 4096
+
+# Section of .trestle/config.ini holding the cache settings
+CACHE_SECTION = 'cache'
+
+# Persistent cache of decoded model files under .trestle
+MODEL_CACHE_DIR = 'model-cache'
+MODEL_CACHE_MAX_SIZE = 256 * 1024 * 1024
+ENV_MODEL_CACHE = 'TRESTLE_MODEL_CACHE'
+ENV_MODEL_CACHE_MAX_SIZE = 'TRESTLE_MODEL_CACHE_MAX_SIZE'
+
+# Content stamps of the files written by trestle, allowing trusted reads to skip validation
+CONTENT_STAMPS_DIR = 'content-stamps'
+ENV_CONTENT_STAMPS = 'TRESTLE_CONTENT_STAMPS'
+
+# Manifest of the fragments and last validation outcome of each model, allowing unchanged models to skip validation
+VALIDATION_MANIFEST_FILE = 'validation-manifest.json'
+ENV_VALIDATION_MANIFEST = 'TRESTLE_VALIDATION_MANIFEST'
+
+# Remote objects cached under .trestle/cache, with the metadata of each object in a file next to it
+REMOTE_CACHE_METADATA_SUFFIX = '.meta.json'
+ENV_REMOTE_CACHE_TTL = 'TRESTLE_REMOTE_CACHE_TTL'
+
+# Content-addressed store of the content of the remote objects cached under .trestle/cache
+REMOTE_CACHE_BLOBS_DIR = '_blobs'
+REMOTE_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+ENV_REMOTE_CACHE_MAX_SIZE = 'TRESTLE_REMOTE_CACHE_MAX_SIZE'
+ENV_REMOTE_CACHE_COMPRESS = 'TRESTLE_REMOTE_CACHE_COMPRESS'
+# Number of bytes of a remote object downloaded at a time
+REMOTE_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# In-process cache of the remote objects parsed from the remote cache
+PARSED_MODEL_CACHE_MAX_SIZE = 256 * 1024 * 1024
+ENV_PARSED_MODEL_CACHE_MAX_SIZE = 'TRESTLE_PARSED_MODEL_CACHE_MAX_SIZE'
+
+# Staging directory under .trestle of the files written by a plan before they are moved into place
+STAGING_DIR = '_staging'
+
+# Section of .trestle/config.ini holding the serialization settings
+SERIALIZATION_SECTION = 'serialization'
+ENV_JSON_BACKEND = 'TRESTLE_JSON_BACKEND'
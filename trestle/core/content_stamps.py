@@ -0,0 +1,182 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Content stamps of the OSCAL files written by trestle within a trestle project.
+
+When trestle writes a model it records a stamp under .trestle/content-stamps holding the sha256 digest of the file and
+the model class it was written from. A trusted read of a file whose content still matches its stamp can then build the
+model without running the pydantic validators, since the content is known to have been produced from a valid model.
+Any file edited outside of trestle no longer matches its stamp and is validated as usual.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from trestle.core import const
+from trestle.core import settings
+from trestle.core.model_cache import content_digest, model_type_key
+
+logger = logging.getLogger(__name__)
+
+_STAMP_VERSION = 1
+_STAMP_SUFFIX = '.json'
+
+# A stamp recorded less than this long after the file was modified is only trusted after comparing digests, since a
+# rewrite within the granularity of the filesystem timestamps would not alter the mtime. Such a stamp is recorded
+# again once the digest has been compared outside of the window, so that later reads only compare the file stat.
+RACY_STAMP_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+class ContentStamps:
+    """Store of the content stamps of the files written by trestle in a trestle project."""
+
+    _stores: Dict[pathlib.Path, 'ContentStamps'] = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, trestle_root: pathlib.Path) -> None:
+        """Initialize the store of a trestle project.
+
+        Args:
+            trestle_root: Path of the trestle project, i.e., within which .trestle is to be found.
+        """
+        self._stamps_dir = trestle_root / const.TRESTLE_CONFIG_DIR / const.CONTENT_STAMPS_DIR
+
+    @classmethod
+    def for_path(cls, path: pathlib.Path) -> Optional['ContentStamps']:
+        """Return the store of the trestle project containing the path, if content stamps are enabled for the project.
+
+        Content stamps are enabled by the content_stamps option of the [cache] section of .trestle/config.ini, or the
+        TRESTLE_CONTENT_STAMPS environment variable.
+        """
+        trestle_root = settings.find_trestle_root(path)
+        if trestle_root is None or not cls.is_enabled(trestle_root):
+            return None
+        store = cls._stores.get(trestle_root)
+        if store is None:
+            with cls._stores_lock:
+                store = cls._stores.setdefault(trestle_root, cls(trestle_root))
+        return store
+
+    @staticmethod
+    def is_enabled(trestle_root: pathlib.Path) -> bool:
+        """Check whether content stamps are enabled for the trestle project."""
+        return settings.get_bool_setting(trestle_root, const.CACHE_SECTION, 'content_stamps', const.ENV_CONTENT_STAMPS)
+
+    @property
+    def stamps_dir(self) -> pathlib.Path:
+        """Return the directory holding the stamps."""
+        return self._stamps_dir
+
+    def _stamp_path(self, path: pathlib.Path) -> pathlib.Path:
+        key = os.path.normpath(path.absolute())
+        return self._stamps_dir / (hashlib.sha256(key.encode(const.FILE_ENCODING)).hexdigest() + _STAMP_SUFFIX)
+
+    def record(self, path: pathlib.Path, model_type: Type[BaseModel]) -> None:
+        """Record the stamp of a file that has just been written by trestle from a model of the given class."""
+        try:
+            file_stat = path.stat()
+            self._write_stamp(path, model_type_key(model_type), content_digest(path.read_bytes()), file_stat)
+        except OSError as e:
+            logger.debug(f'Unable to record content stamp for {path}: {e}')
+
+    def _write_stamp(self, path: pathlib.Path, model_key: str, digest: str, file_stat: os.stat_result) -> None:
+        stamp = {
+            'version': _STAMP_VERSION,
+            'model': model_key,
+            'digest': digest,
+            'size': file_stat.st_size,
+            'mtime_ns': file_stat.st_mtime_ns,
+            'recorded_ns': time.time_ns()
+        }
+        # only the stamps directory is created, never .trestle itself
+        self._stamps_dir.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self._stamps_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding=const.FILE_ENCODING) as tmp_file:
+            json.dump(stamp, tmp_file)
+        os.replace(tmp_name, self._stamp_path(path))
+
+    def discard(self, path: pathlib.Path) -> None:
+        """Remove the stamp of a file, if any."""
+        try:
+            self._stamp_path(path).unlink()
+        except OSError:
+            pass
+
+    def verify(self, path: pathlib.Path, model_type: Type[BaseModel], content: Optional[bytes] = None) -> bool:
+        """Check whether the file is unchanged since trestle wrote it from a model of the given class.
+
+        Args:
+            path: Path of the file.
+            model_type: The model class the file is to be read into.
+            content: The raw content of the file, if already read.
+
+        Returns:
+            True if the file matches its stamp, False otherwise.
+        """
+        try:
+            stamp = json.loads(self._stamp_path(path).read_text(encoding=const.FILE_ENCODING))
+            file_stat = path.stat()
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.debug(f'Ignoring unreadable content stamp of {path}: {e}')
+            return False
+        if not isinstance(stamp, dict) or stamp.get('version') != _STAMP_VERSION:
+            return False
+        if stamp.get('model') != model_type_key(model_type) or stamp.get('size') != file_stat.st_size:
+            return False
+        mtime_ns = stamp.get('mtime_ns')
+        if mtime_ns == file_stat.st_mtime_ns and stamp.get('recorded_ns', 0) - mtime_ns >= RACY_STAMP_WINDOW_NS:
+            return True
+        if content is None:
+            content = path.read_bytes()
+        if content_digest(content) != stamp.get('digest'):
+            return False
+        if time.time_ns() - file_stat.st_mtime_ns >= RACY_STAMP_WINDOW_NS:
+            try:
+                self._write_stamp(path, stamp['model'], stamp['digest'], file_stat)
+            except OSError as e:
+                logger.debug(f'Unable to refresh content stamp for {path}: {e}')
+        return True
+
+    def count(self) -> int:
+        """Return the number of stamps recorded."""
+        if not self._stamps_dir.is_dir():
+            return 0
+        return len([stamp_path for stamp_path in self._stamps_dir.iterdir() if stamp_path.suffix == _STAMP_SUFFIX])
+
+    def clear(self) -> int:
+        """Remove all the stamps and return the number removed."""
+        if not self._stamps_dir.is_dir():
+            return 0
+        removed = 0
+        for stamp_path in self._stamps_dir.iterdir():
+            try:
+                stamp_path.unlink()
+            except OSError:
+                continue
+            if stamp_path.suffix == _STAMP_SUFFIX:
+                removed += 1
+        return removed
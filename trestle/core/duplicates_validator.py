@@ -15,14 +15,31 @@
 # limitations under the License.
 """Validate by confirming no duplicate items."""
 
+from typing import Any, List, Set
+
 from trestle.core.base_model import OscalBaseModel
-from trestle.core.validator import Validator
-from trestle.core.validator_helper import has_no_duplicate_values_by_name
+from trestle.core.validator import ModelVisitor, VisitingValidator
+
+
+class _DuplicatesVisitor(ModelVisitor):
+    """Collect the uuids of a model until one is found twice."""
 
+    def __init__(self) -> None:
+        self._uuids: Set[Any] = set()
 
-class DuplicatesValidator(Validator):
+    def visit(self, name: str, value: Any, path: List[str]) -> bool:
+        """Check the uuid is not a duplicate."""
+        if value in self._uuids:
+            return False
+        self._uuids.add(value)
+        return True
+
+
+class DuplicatesValidator(VisitingValidator):
     """Check for duplicate items in oscal object."""
 
-    def model_is_valid(self, model: OscalBaseModel) -> bool:
-        """Test if the model is valid."""
-        return has_no_duplicate_values_by_name(model, 'uuid')
+    visit_names = frozenset(['uuid'])
+
+    def create_visitor(self, model: OscalBaseModel) -> ModelVisitor:
+        """Return a new visitor to check the model."""
+        return _DuplicatesVisitor()
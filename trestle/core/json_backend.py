@@ -0,0 +1,118 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pluggable JSON backend used to encode and decode OSCAL models.
+
+The backend is selected by the TRESTLE_JSON_BACKEND environment variable, or the json_backend option of the
+[serialization] section of the .trestle/config.ini of the trestle project containing the current directory. The
+default json backend is the python standard library. The orjson backend requires the optional orjson package, e.g.
+pip install compliance-trestle[fast], and falls back to the standard library if it is not installed.
+
+Both backends produce byte identical output for valid JSON content: orjson is only used for indented output, which is
+re-indented and escaped to match json.dumps(ensure_ascii=True), and any value orjson does not handle the same way as the
+standard library (e.g. integers beyond 64 bits, floats written with an exponent) is encoded or decoded by the standard
+library instead. NaN and infinite floats, which are not valid JSON, are written as null by orjson.
+"""
+
+import json
+import logging
+import pathlib
+import re
+from typing import Any, Callable, Match, Optional, Union
+
+from trestle.core import const
+from trestle.core import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND_STDLIB = 'json'
+JSON_BACKEND_ORJSON = 'orjson'
+
+# json.dumps(ensure_ascii=True) escapes everything outside of the printable ascii range, orjson escapes less
+_NON_ASCII = re.compile('[\x7f-\U0010ffff]')
+_INDENT = re.compile('^( +)', re.MULTILINE)
+# Number tokens of the indented output that json.dumps writes differently, e.g. 1e+16 and 1e-05 are written as 1e16 and
+# 0.00001 by orjson. Number tokens always end their line, unlike strings which end with a quote.
+_EXPONENT_NUMBER = re.compile(r'e-?\d+,?$', re.MULTILINE)
+_SMALL_NUMBER = re.compile(r'(?:": |^ +)-?0\.0000\d*,?$', re.MULTILINE)
+
+_warned_unavailable = False
+
+
+def _escape_non_ascii(match: Match[str]) -> str:
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return '\\u{0:04x}\\u{1:04x}'.format(0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u{0:04x}'.format(code)
+
+
+def get_backend() -> str:
+    """Return the name of the JSON backend in use."""
+    global _warned_unavailable
+    trestle_root = settings.find_trestle_root(pathlib.Path.cwd() / const.TRESTLE_CONFIG_DIR)
+    backend = settings.get_setting(
+        trestle_root, const.SERIALIZATION_SECTION, 'json_backend', const.ENV_JSON_BACKEND, JSON_BACKEND_STDLIB
+    ).strip().lower()
+    if backend == JSON_BACKEND_ORJSON:
+        if orjson is not None:
+            return JSON_BACKEND_ORJSON
+        if not _warned_unavailable:
+            logger.warning('orjson JSON backend requested but orjson is not installed, using the json module')
+            _warned_unavailable = True
+    elif backend != JSON_BACKEND_STDLIB and not _warned_unavailable:
+        logger.warning(f'Unknown JSON backend {backend}, using the json module')
+        _warned_unavailable = True
+    return JSON_BACKEND_STDLIB
+
+
+def dumps(obj: Any, *, default: Optional[Callable[[Any], Any]] = None, indent: Optional[int] = None, **kwargs) -> str:
+    """Encode to a JSON string, with the same signature and output as json.dumps.
+
+    Only indented output with no other json.dumps options goes through orjson, since the compact separators of
+    json.dumps cannot be reproduced by orjson.
+    """
+    if isinstance(indent, int) and indent > 0 and not kwargs and get_backend() == JSON_BACKEND_ORJSON:
+        try:
+            data = orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME)
+        except (orjson.JSONEncodeError, TypeError):
+            pass
+        else:
+            text = data.decode(const.FILE_ENCODING)
+            if not _EXPONENT_NUMBER.search(text) and not ('0.0000' in text and _SMALL_NUMBER.search(text)):
+                if not text.isascii() or '\x7f' in text:
+                    text = _NON_ASCII.sub(_escape_non_ascii, text)
+                if indent != 2:
+                    # every line starts with its indentation only, since newlines within strings are escaped
+                    text = _INDENT.sub(lambda match: ' ' * (len(match.group(1)) // 2 * indent), text)
+                return text
+    return json.dumps(obj, default=default, indent=indent, **kwargs)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode a JSON string or bytes, with the same output as json.loads."""
+    if get_backend() == JSON_BACKEND_ORJSON:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # e.g. NaN or integers beyond 64 bits, which json accepts
+            pass
+    return json.loads(data)
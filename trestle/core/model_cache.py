@@ -0,0 +1,242 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Persistent cache of the decoded content of OSCAL files read within a trestle project.
+
+Entries are stored under .trestle/model-cache in the python marshal format, which is much faster to load than JSON or
+YAML. An entry is only written once the content has been successfully validated against the model class, and it is
+keyed by the path of the file and the model class. An entry is used if the size and the mtime of the file match, or
+failing that if the sha256 digest of the file content matches. Since its content was validated when it was stored, the
+object is built from an entry used without running the validators again.
+
+The marshal format can only hold plain data, so unlike pickle loading a tampered entry cannot execute code.
+"""
+
+import functools
+import hashlib
+import logging
+import marshal
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from trestle.core import const
+from trestle.core import settings
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_VERSION = 1
+_ENTRY_SUFFIX = '.marshal'
+
+# An entry recorded less than this long after the file was modified is only trusted after comparing digests,
+# since a rewrite within the granularity of the filesystem timestamps would not alter the mtime.
+RACY_ENTRY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+def content_digest(content: bytes) -> str:
+    """Return the sha256 hex digest of the content."""
+    return hashlib.sha256(content).hexdigest()
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def model_type_key(model_type: Type[BaseModel]) -> str:
+    """Return a key identifying the model class, including dynamically created stripped classes.
+
+    Dynamically created classes of the same name all belong to the pydantic module, so the key also holds the shape and
+    type of every field to tell apart e.g. the stripped Metadata classes of the catalog and of the profile.
+    """
+    fields = []
+    for name, field in sorted(model_type.__fields__.items()):
+        field_type = field.type_
+        type_name = getattr(field_type, '__qualname__', repr(field_type))
+        fields.append(f'{name}:{field.shape}:{getattr(field_type, "__module__", "")}.{type_name}')
+    return f'{model_type.__module__}.{model_type.__qualname__}:{",".join(fields)}'
+
+
+class ModelCache:
+    """Size bounded persistent cache of decoded OSCAL file content for a trestle project."""
+
+    _caches: Dict[pathlib.Path, 'ModelCache'] = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, trestle_root: pathlib.Path, max_size: int = const.MODEL_CACHE_MAX_SIZE) -> None:
+        """Initialize the cache of a trestle project.
+
+        Args:
+            trestle_root: Path of the trestle project, i.e., within which .trestle is to be found.
+            max_size: Maximum size in bytes of all the cache entries before the least recently used are evicted.
+        """
+        self._cache_dir = trestle_root / const.TRESTLE_CONFIG_DIR / const.MODEL_CACHE_DIR
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    @classmethod
+    def for_path(cls, path: pathlib.Path) -> Optional['ModelCache']:
+        """Return the cache of the trestle project containing the path, if the cache is enabled for the project.
+
+        The cache is enabled by the model_cache option of the [cache] section of .trestle/config.ini, or the
+        TRESTLE_MODEL_CACHE environment variable.
+        """
+        trestle_root = settings.find_trestle_root(path)
+        if trestle_root is None or not cls.is_enabled(trestle_root):
+            return None
+        cache = cls._caches.get(trestle_root)
+        if cache is None:
+            max_size = settings.get_int_setting(
+                trestle_root,
+                const.CACHE_SECTION,
+                'model_cache_max_size',
+                const.ENV_MODEL_CACHE_MAX_SIZE,
+                const.MODEL_CACHE_MAX_SIZE
+            )
+            with cls._caches_lock:
+                cache = cls._caches.setdefault(trestle_root, cls(trestle_root, max_size))
+        return cache
+
+    @staticmethod
+    def is_enabled(trestle_root: pathlib.Path) -> bool:
+        """Check whether the cache is enabled for the trestle project."""
+        return settings.get_bool_setting(trestle_root, const.CACHE_SECTION, 'model_cache', const.ENV_MODEL_CACHE)
+
+    @property
+    def cache_dir(self) -> pathlib.Path:
+        """Return the directory holding the cache entries."""
+        return self._cache_dir
+
+    def _entry_path(self, path: pathlib.Path, model_type: Type[BaseModel]) -> pathlib.Path:
+        key = f'{os.path.normpath(path.absolute())}\0{model_type_key(model_type)}'
+        return self._cache_dir / (hashlib.sha256(key.encode(const.FILE_ENCODING)).hexdigest() + _ENTRY_SUFFIX)
+
+    def get(self, path: pathlib.Path, model_type: Type[BaseModel]) -> Optional[Any]:
+        """Return the cached decoded content of the file for the model class, or None if not cached or stale."""
+        entry_path = self._entry_path(path, model_type)
+        try:
+            version, mtime_ns, size, digest, obj = marshal.loads(entry_path.read_bytes())
+            file_stat = path.stat()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f'Discarding unreadable model cache entry {entry_path}: {e}')
+            self._discard(entry_path)
+            return None
+        if version != _ENTRY_VERSION or size != file_stat.st_size:
+            return None
+        if mtime_ns != file_stat.st_mtime_ns or time.time_ns() - mtime_ns < RACY_ENTRY_WINDOW_NS:
+            if content_digest(path.read_bytes()) != digest:
+                return None
+        try:
+            # mark the entry as recently used
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return obj
+
+    def put(
+        self, path: pathlib.Path, model_type: Type[BaseModel], file_stat: os.stat_result, content: bytes, obj: Any
+    ) -> None:
+        """Store the decoded content of the file for the model class.
+
+        Args:
+            path: Path of the file that was read.
+            model_type: The model class the content was validated against.
+            file_stat: The stat of the file taken before it was read.
+            content: The raw content of the file.
+            obj: The decoded content of the file.
+        """
+        try:
+            data = marshal.dumps(
+                (_ENTRY_VERSION, file_stat.st_mtime_ns, file_stat.st_size, content_digest(content), obj)
+            )
+        except ValueError as e:
+            logger.debug(f'Content of {path} cannot be stored in the model cache: {e}')
+            return
+        entry_path = self._entry_path(path, model_type)
+        try:
+            # only the cache directory is created, never .trestle itself
+            self._cache_dir.mkdir(exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, entry_path)
+        except OSError as e:
+            logger.debug(f'Unable to write model cache entry for {path}: {e}')
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data)
+        self._evict()
+
+    def _discard(self, entry_path: pathlib.Path) -> None:
+        try:
+            entry_path.unlink()
+        except OSError:
+            pass
+
+    def _entries(self) -> Dict[pathlib.Path, os.stat_result]:
+        entries: Dict[pathlib.Path, os.stat_result] = {}
+        if not self._cache_dir.is_dir():
+            return entries
+        for entry in os.scandir(self._cache_dir):
+            if entry.name.endswith(_ENTRY_SUFFIX):
+                try:
+                    entries[pathlib.Path(entry.path)] = entry.stat()
+                except OSError:
+                    pass
+        return entries
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries once the total size of the entries exceeds the maximum size."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry_stat.st_size for entry_stat in self._entries().values())
+            if self._size <= self._max_size:
+                return
+            entries = self._entries()
+            self._size = sum(entry_stat.st_size for entry_stat in entries.values())
+            # evict down to 90% of the maximum size so that eviction does not happen on every write
+            target_size = self._max_size * 9 // 10
+            for entry_path, entry_stat in sorted(entries.items(), key=lambda item: item[1].st_mtime_ns):
+                if self._size <= target_size:
+                    break
+                self._discard(entry_path)
+                self._size -= entry_stat.st_size
+            logger.debug(f'model cache evicted down to {self._size} bytes')
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries, their total size in bytes and the maximum size of the cache."""
+        entries = self._entries()
+        size = sum(entry_stat.st_size for entry_stat in entries.values())
+        with self._lock:
+            self._size = size
+        return {'entries': len(entries), 'size': size, 'max_size': self._max_size}
+
+    def clear(self) -> int:
+        """Remove all the entries from the cache and return the number removed."""
+        entries = self._entries()
+        for entry_path in entries:
+            self._discard(entry_path)
+        # also remove temporary files left behind by interrupted writes
+        for tmp_path in self._cache_dir.glob('*.tmp'):
+            self._discard(tmp_path)
+        with self._lock:
+            self._size = 0
+        return len(entries)
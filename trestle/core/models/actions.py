@@ -13,17 +13,22 @@
 # limitations under the License.
 """Action wrapper of a command."""
 
+import functools
 import io
 import pathlib
 from abc import ABC, abstractmethod
 from enum import Enum
 from typing import List, Optional
 
+from trestle.core.base_model import OscalBaseModel
+from trestle.core.content_stamps import ContentStamps
 from trestle.core.err import TrestleError
 from trestle.utils import fs, trash
 
 from .elements import Element, ElementPath
 from .file_content_type import FileContentType
+from .overlay import DIRECTORY, FILE, FileSystemOverlay
+from .transaction import Transaction
 
 
 class ActionType(Enum):
@@ -97,6 +102,22 @@ class Action(ABC):
     def execute(self) -> None:
         """Execute the action."""
 
+    def simulate(self, overlay: FileSystemOverlay) -> None:
+        """Simulate the action, making its checks against an overlay of the file system.
+
+        Actions which do not touch the file system, e.g. updating an element in memory, are executed and must then be
+        rolled back like after an execution.
+        """
+        self.execute()
+
+    def stage(self, transaction: Transaction) -> None:
+        """Stage the changes of the action to the file system in a transaction, to be committed with the others.
+
+        Actions which do not touch the file system, e.g. updating an element in memory, are executed.
+        The action is marked as executed once its changes have been committed, so it can then be rolled back.
+        """
+        self.execute()
+
     @abstractmethod
     def rollback(self) -> None:
         """Rollback the action."""
@@ -134,6 +155,21 @@ class WriteAction(Action):
 
         raise TrestleError(f'Invalid content type {self._content_type}')
 
+    def _check_element(self) -> None:
+        """Check the element can be encoded to the content type."""
+        if self._element is None:
+            raise TrestleError('Element is empty and cannot write')
+
+        if self._content_type not in [FileContentType.YAML, FileContentType.JSON]:
+            raise TrestleError(f'Invalid content type {self._content_type}')
+
+    def simulate(self, overlay: FileSystemOverlay) -> None:
+        """Simulate the action without writing the element."""
+        self._check_element()
+
+        if not self._is_writer_valid():
+            raise TrestleError('Writer is not provided or closed')
+
     def execute(self) -> None:
         """Execute the action."""
         if self._element is None:
@@ -186,6 +222,39 @@ class WriteFileAction(WriteAction):
         # Note, execute and rollback sets the writer as appropriate
         super().__init__(None, element, content_type)
 
+    def get_file_path(self) -> pathlib.Path:
+        """Return the path of the file written to."""
+        return self._file_path
+
+    def simulate(self, overlay: FileSystemOverlay) -> None:
+        """Simulate the action, checking the file exists in the overlay, without writing the element."""
+        if overlay.kind(self._file_path) != FILE:
+            raise TrestleError(f'File at {self._file_path} does not exist')
+
+        self._check_element()
+
+    def stage(self, transaction: Transaction) -> None:
+        """Stage the element to be appended to the file, which is encoded when the transaction is committed."""
+        if transaction.overlay.kind(self._file_path) != FILE:
+            raise TrestleError(f'File at {self._file_path} does not exist')
+
+        self._check_element()
+        transaction.append(self._file_path, self._encode, self._written_at)
+
+    def _written_at(self, position: int) -> None:
+        """Record the position the element was written at, once committed."""
+        self._lastStreamPos = position
+        self._mark_executed()
+        self._record_stamp()
+
+    def _record_stamp(self) -> None:
+        """Record the content stamp of a complete model file so it can later be read without validation."""
+        element = self._element.get()
+        if self._lastStreamPos == 0 and isinstance(element, OscalBaseModel):
+            stamps = ContentStamps.for_path(self._file_path)
+            if stamps is not None:
+                stamps.record(self._file_path, element.__class__)
+
     def execute(self) -> None:
         """Execute the action."""
         if not self._file_path.exists():
@@ -200,6 +269,8 @@ class WriteFileAction(WriteAction):
             self._writer = writer
             super().execute()
 
+        self._record_stamp()
+
     def rollback(self) -> None:
         """Execute the rollback action."""
         if not self._file_path.exists():
@@ -296,6 +367,43 @@ class CreatePathAction(Action):
 
         self._mark_executed()
 
+    def simulate(self, overlay: FileSystemOverlay) -> None:
+        """Simulate the action, creating the missing directories and file in the overlay."""
+        cur_path = self._trestle_project_root
+        for part in self._sub_path.parts[len(self._trestle_project_root.parts):]:
+            cur_path = cur_path.joinpath(part)
+            if not overlay.exists(cur_path):
+                overlay.create(cur_path, FILE if cur_path.suffix != '' else DIRECTORY)
+
+    def stage(self, transaction: Transaction) -> None:
+        """Stage the creation of the missing directories and file, or the clearing of the file content."""
+        is_staged = False
+        cur_path = self._trestle_project_root
+        for part in self._sub_path.parts[len(self._trestle_project_root.parts):]:
+            cur_path = cur_path.joinpath(part)
+            if not transaction.overlay.exists(cur_path):
+                if cur_path.suffix != '':
+                    transaction.create_file(cur_path, functools.partial(self._path_created, cur_path))
+                else:
+                    transaction.create_dir(cur_path, functools.partial(self._path_created, cur_path))
+                is_staged = True
+            elif cur_path.suffix != '' and self._clear_content:
+                # read file content for rollback, unless the content is itself staged
+                if not transaction.is_staged(cur_path):
+                    with open(cur_path, 'r') as fp:
+                        self._old_file_content = fp.read()
+                transaction.create_file(cur_path, self._mark_executed)
+                is_staged = True
+
+        # every path is already in place
+        if not is_staged:
+            self._mark_executed()
+
+    def _path_created(self, path: pathlib.Path) -> None:
+        """Record a path created by the commit of the staged action, for rollback."""
+        self._created_paths.append(path)
+        self._mark_executed()
+
     def rollback(self) -> None:
         """Rollback the action."""
         if self.has_executed():
@@ -357,6 +465,20 @@ class RemovePathAction(Action):
         trash.store(self._sub_path, True)
         self._mark_executed()
 
+    def simulate(self, overlay: FileSystemOverlay) -> None:
+        """Simulate the action, removing the path from the overlay."""
+        if not overlay.exists(self._sub_path):
+            raise FileNotFoundError(f'Path "{self._sub_path}" does not exist')
+
+        overlay.remove(self._sub_path)
+
+    def stage(self, transaction: Transaction) -> None:
+        """Stage the removal of the path into trash."""
+        if not transaction.overlay.exists(self._sub_path):
+            raise FileNotFoundError(f'Path "{self._sub_path}" does not exist')
+
+        transaction.remove(self._sub_path, self._mark_executed)
+
     def rollback(self) -> None:
         """Rollback the action."""
         if self.has_executed():
@@ -13,21 +13,19 @@
 # limitations under the License.
 """Element wrapper of an OSCAL model element."""
 
-import json
 import pathlib
 from typing import Dict, List, Optional, Union
 
-from pydantic import Field, create_model
 from pydantic.error_wrappers import ValidationError
 
 import trestle.core.const as const
+from trestle.core import json_backend
 from trestle.core import utils
+from trestle.core import yaml_backend
 from trestle.core.base_model import OscalBaseModel
 from trestle.core.err import TrestleError, TrestleNotFoundError
 from trestle.core.models.file_content_type import FileContentType
 
-import yaml
-
 
 class ElementPath:
     """Element path wrapper of an element.
@@ -369,19 +367,18 @@ class Element:
 
     def to_yaml(self) -> str:
         """Convert into YAML string."""
-        yaml_data = yaml.dump(yaml.safe_load(self.to_json()))
-        return yaml_data
+        if self._wrapper_alias == self.IGNORE_WRAPPER_ALIAS:
+            yaml_data = yaml_backend.to_yaml_data(self._elem)
+        else:
+            yaml_data = {self._wrapper_alias: yaml_backend.to_yaml_data(self._elem, OscalBaseModel.__json_encoder__)}
+        return yaml_backend.dump(yaml_data)
 
     def to_json(self) -> str:
         """Convert into JSON string."""
         if self._wrapper_alias == self.IGNORE_WRAPPER_ALIAS:
-            json_data = json.dumps(self._elem, sort_keys=False, indent=4)
+            json_data = json_backend.dumps(self._elem, indent=4)
         else:
-            dynamic_passer = {}
-            dynamic_passer['TransientField'] = (self._elem.__class__, Field(self, alias=self._wrapper_alias))
-            wrapper_model = create_model('TransientModel', __base__=OscalBaseModel, **dynamic_passer)  # type: ignore
-            wrapped_model = wrapper_model(**{self._wrapper_alias: self._elem})
-            json_data = wrapped_model.json(exclude_none=True, by_alias=True, indent=4)
+            json_data = self._elem.oscal_wrapped_json(self._wrapper_alias, indent=4)
 
         return json_data
 
@@ -0,0 +1,73 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+In-memory overlay of the file system used to simulate a plan.
+
+The overlay records the files and directories created and the paths removed by the simulated actions, on top of the
+file system which is only ever read. The checks of the actions, e.g. that the file written to exists, are made against
+the overlay so a plan can be simulated without writing, and then rolling back, its full output.
+"""
+
+import os
+import pathlib
+from typing import Dict, Optional, Set
+
+FILE = 'file'
+DIRECTORY = 'directory'
+
+
+class FileSystemOverlay:
+    """Files and directories created or removed by simulated actions, over the file system."""
+
+    def __init__(self) -> None:
+        """Initialize an empty overlay, where the file system is seen as it is."""
+        # absolute path to the kind of the path created, or None if the path was removed
+        self._paths: Dict[pathlib.Path, Optional[str]] = {}
+        # removed paths, below which the file system is no longer seen
+        self._removed: Set[pathlib.Path] = set()
+
+    @staticmethod
+    def _key(path: pathlib.Path) -> pathlib.Path:
+        return pathlib.Path(os.path.abspath(path))
+
+    def kind(self, path: pathlib.Path) -> Optional[str]:
+        """Return whether the path is a file or a directory in the overlay, or None if it does not exist."""
+        key = self._key(path)
+        if key in self._paths:
+            return self._paths[key]
+        if self._removed and not self._removed.isdisjoint(key.parents):
+            return None
+        if key.is_dir():
+            return DIRECTORY
+        if key.exists():
+            return FILE
+        return None
+
+    def exists(self, path: pathlib.Path) -> bool:
+        """Check whether the path exists in the overlay."""
+        return self.kind(path) is not None
+
+    def create(self, path: pathlib.Path, kind: str) -> None:
+        """Create the file or directory at the path in the overlay."""
+        self._paths[self._key(path)] = kind
+
+    def remove(self, path: pathlib.Path) -> None:
+        """Remove the path, and everything below it, from the overlay."""
+        key = self._key(path)
+        for created in [created for created in self._paths if key in created.parents]:
+            del self._paths[created]
+        self._paths[key] = None
+        self._removed.add(key)
@@ -13,10 +13,13 @@
 # limitations under the License.
 """Plan of action of a command."""
 
+from concurrent.futures import ThreadPoolExecutor
 from io import UnsupportedOperation
-from typing import List
+from typing import List, Optional
 
 from .actions import Action
+from .overlay import FileSystemOverlay
+from .transaction import Transaction
 
 
 class Plan:
@@ -57,24 +60,61 @@ class Plan:
         self._actions = []
 
     def simulate(self) -> None:
-        """Simulate execution of the plan."""
+        """Simulate execution of the plan.
+
+        The actions are simulated against an in-memory overlay of the file system, so the checks of the file system
+        actions are made without writing anything to disk. The actions updating elements in memory are executed and
+        then rolled back.
+        """
         # Check if all of the actions support rollback or not
         for action in self._actions:
             if action.has_rollback() is False:
                 raise UnsupportedOperation(f'{action.get_type()} does not support rollback')
 
+        overlay = FileSystemOverlay()
         try:
-            self.execute()
-        except Exception as ex:
-            raise ex
+            for action in self._actions:
+                action.simulate(overlay)
         finally:
-            self.rollback()
+            for action in reversed(self._actions):
+                if action.has_executed():
+                    action.rollback()
+
+    def execute(self, parallel: bool = False, max_workers: Optional[int] = None, staged: bool = False) -> None:
+        """Execute the actions in the plan.
+
+        Args:
+            parallel: Whether the files written, e.g. the fragments of a split model, are serialized and written by a
+                pool of worker threads. The changes are then committed as a transaction, as with staged, whose staged
+                files are written by the pool. The files are identical to a serial execution.
+            max_workers: The maximum number of worker threads used when parallel is True.
+                Defaults to the ThreadPoolExecutor default.
+            staged: Whether the changes to the file system are committed as a transaction. Every file written is
+                first staged in full under .trestle, and the staged files are then flushed to disk together and moved
+                into place with atomic renames, so no file is ever left half written. The executed actions can be
+                rolled back as usual.
+        """
+        if staged or parallel:
+            self._execute_staged(parallel, max_workers)
+            return
 
-    def execute(self) -> None:
-        """Execute the actions in the plan."""
         for action in self._actions:
             action.execute()
 
+    def _execute_staged(self, parallel: bool, max_workers: Optional[int]) -> None:
+        """Stage the actions in a transaction and commit it."""
+        transaction = Transaction()
+        try:
+            for action in self._actions:
+                action.stage(transaction)
+            if not parallel:
+                transaction.commit()
+                return
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                transaction.commit(executor)
+        finally:
+            transaction.close()
+
     def rollback(self) -> None:
         """Rollback the actions in the plan."""
         # execute in reverse order
@@ -0,0 +1,497 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Transaction staging the changes of a plan to the file system before committing them.
+
+The files written by the actions are first written in full to a staging directory under .trestle, which is on the same
+file system as the trestle project. Once every file has been staged, they are flushed to disk together and moved into
+place with atomic renames, so a file of the project is either left as it was or replaced by its complete new content,
+and never half written, even if trestle is interrupted.
+
+The files replaced and the paths removed are kept in the staging directory until every change has been applied, so
+that if a change fails, e.g. a model split into several files, the changes already applied are undone and the model is
+left as it was. The paths removed are only then moved into the trash.
+
+Before any change is applied, the steps of the commit are written to a journal in the staging directory, and once they
+have all been applied the commit is marked as done. If trestle is interrupted while committing, e.g. killed, the
+staging directory is left behind with its journal, and recover_transactions, which is run by the trestle command line
+on start and by trestle cache prune, then undoes the steps of a commit not marked as done, or completes the moves into
+the trash of a commit marked as done, and removes the staging directory.
+"""
+
+import json
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from trestle.core import const
+from trestle.core import settings
+from trestle.core.err import TrestleError
+from trestle.utils import trash
+
+from .overlay import DIRECTORY, FILE, FileSystemOverlay
+
+logger = logging.getLogger(__name__)
+
+_OP_DIR = 'dir'
+_OP_FILE = 'file'
+_OP_REMOVE = 'remove'
+
+# Directory of the staging directory keeping the files replaced and the paths removed until the commit succeeds
+_ORIGINALS_DIR = 'originals'
+# Files of the staging directory holding the steps of the commit, marking the commit as done, and holding the process id
+# of the trestle process owning the staging directory
+_JOURNAL = 'journal.json'
+_COMMITTED = 'committed'
+_OWNER = 'owner'
+# Age in seconds beyond which a staging directory whose owner cannot be checked is considered abandoned
+_ABANDONED_SECONDS = 3600
+
+_STEP_MKDIR = 'mkdir'
+_STEP_CREATE = 'create'
+_STEP_REPLACE = 'replace'
+_STEP_REMOVE = 'remove'
+
+
+class _StagedFile:
+    """New content of a file, written to the staging directory before it replaces the file."""
+
+    __slots__ = ('path', 'keep_content', 'writes', 'positions', 'staged_path')
+
+    def __init__(self, path: pathlib.Path, keep_content: bool) -> None:
+        self.path = path
+        # whether the new content is appended to the content of the file on disk
+        self.keep_content = keep_content
+        # the encoding of each write, with the callback given the position at which it was written
+        self.writes: List[Tuple[Callable[[], str], Callable[[int], None]]] = []
+        self.positions: List[int] = []
+        self.staged_path: Optional[pathlib.Path] = None
+
+
+class _Operation:
+    """Change to the file system applied when the transaction is committed."""
+
+    __slots__ = ('kind', 'path', 'staged_file', 'callbacks')
+
+    def __init__(self, kind: str, path: pathlib.Path, staged_file: Optional[_StagedFile] = None) -> None:
+        self.kind = kind
+        self.path = path
+        self.staged_file = staged_file
+        # called once the operation has been applied
+        self.callbacks: List[Callable[[], None]] = []
+
+
+class _Step:
+    """Change to the file system applied by the commit, recorded in the journal so that it can be undone."""
+
+    __slots__ = ('kind', 'path', 'staged_path', 'original_path')
+
+    def __init__(
+        self,
+        kind: str,
+        path: pathlib.Path,
+        staged_path: Optional[pathlib.Path] = None,
+        original_path: Optional[pathlib.Path] = None
+    ) -> None:
+        self.kind = kind
+        self.path = path
+        # the staged file moved into place
+        self.staged_path = staged_path
+        # where the file replaced or the path removed is kept until the commit is done
+        self.original_path = original_path
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'kind': self.kind,
+            'path': str(self.path),
+            'staged': None if self.staged_path is None else str(self.staged_path),
+            'original': None if self.original_path is None else str(self.original_path)
+        }
+
+    @classmethod
+    def from_json(cls, obj: Dict[str, Any]) -> '_Step':
+        return cls(
+            obj['kind'],
+            pathlib.Path(obj['path']),
+            None if obj['staged'] is None else pathlib.Path(obj['staged']),
+            None if obj['original'] is None else pathlib.Path(obj['original'])
+        )
+
+    def apply(self) -> None:
+        if self.kind == _STEP_MKDIR:
+            self.path.mkdir()
+        elif self.kind == _STEP_CREATE:
+            os.replace(self.staged_path, self.path)
+        elif self.kind == _STEP_REPLACE:
+            _keep_original(self.path, self.original_path)
+            os.replace(self.staged_path, self.path)
+        else:
+            os.replace(self.path, self.original_path)
+
+    def undo(self) -> None:
+        """Undo the step, whether it was applied or not, e.g. if trestle was interrupted while applying it."""
+        if self.kind == _STEP_MKDIR:
+            if self.path.is_dir():
+                self.path.rmdir()
+        elif self.kind == _STEP_CREATE:
+            # the staged file is no longer in the staging directory once moved into place
+            if not self.staged_path.exists() and self.path.exists():
+                self.path.unlink()
+        elif self.original_path.exists():
+            os.replace(self.original_path, self.path)
+
+
+class Transaction:
+    """Changes to the file system staged by the actions of a plan, and committed with atomic renames."""
+
+    def __init__(self) -> None:
+        """Initialize an empty transaction."""
+        self._overlay = FileSystemOverlay()
+        self._operations: List[_Operation] = []
+        # absolute path to the operation staging the current content of the file
+        self._staged_files: Dict[pathlib.Path, _Operation] = {}
+        self._staging_dir: Optional[pathlib.Path] = None
+        # whether the staging directory is kept, holding the only copy of files that could not be put back
+        self._keep_staging_dir = False
+
+    @property
+    def overlay(self) -> FileSystemOverlay:
+        """Return the overlay of the file system with the changes staged so far."""
+        return self._overlay
+
+    @staticmethod
+    def _key(path: pathlib.Path) -> pathlib.Path:
+        return pathlib.Path(os.path.abspath(path))
+
+    def is_staged(self, path: pathlib.Path) -> bool:
+        """Check whether new content of the file has been staged."""
+        return self._key(path) in self._staged_files
+
+    def create_dir(self, path: pathlib.Path, callback: Callable[[], None]) -> None:
+        """Stage the creation of a directory, calling back once it has been created."""
+        self._overlay.create(path, DIRECTORY)
+        operation = _Operation(_OP_DIR, path)
+        operation.callbacks.append(callback)
+        self._operations.append(operation)
+
+    def create_file(self, path: pathlib.Path, callback: Callable[[], None]) -> None:
+        """Stage the creation of an empty file, or the clearing of its content, calling back once it is in place."""
+        self._stage_file(path, False).callbacks.append(callback)
+
+    def append(self, path: pathlib.Path, encode: Callable[[], str], callback: Callable[[int], None]) -> None:
+        """Stage text to be appended to a file.
+
+        Args:
+            path: The path of the file, which must exist in the overlay.
+            encode: Return the text to write. It is called when the file is staged, possibly on a worker thread.
+            callback: Called with the position the text was written at, once the file is in place.
+        """
+        operation = self._staged_files.get(self._key(path))
+        if operation is None:
+            operation = self._stage_file(path, True)
+        operation.staged_file.writes.append((encode, callback))
+
+    def remove(self, path: pathlib.Path, callback: Callable[[], None]) -> None:
+        """Stage the removal of a file or directory into the trash, calling back once it has been removed."""
+        self._overlay.remove(path)
+        key = self._key(path)
+        for staged in [staged for staged in self._staged_files if staged == key or key in staged.parents]:
+            del self._staged_files[staged]
+        operation = _Operation(_OP_REMOVE, path)
+        operation.callbacks.append(callback)
+        self._operations.append(operation)
+
+    def _stage_file(self, path: pathlib.Path, keep_content: bool) -> _Operation:
+        self._overlay.create(path, FILE)
+        operation = _Operation(_OP_FILE, path, _StagedFile(path, keep_content))
+        self._staged_files[self._key(path)] = operation
+        self._operations.append(operation)
+        return operation
+
+    def _get_staging_dir(self) -> pathlib.Path:
+        if self._staging_dir is None:
+            trestle_root = None
+            for operation in self._operations:
+                trestle_root = settings.find_trestle_root(operation.path)
+                if trestle_root is not None:
+                    break
+            if trestle_root is None:
+                raise TrestleError('Staged files should be written within a valid trestle project')
+            staging_root = trestle_root / const.TRESTLE_CONFIG_DIR / const.STAGING_DIR
+            staging_root.mkdir(exist_ok=True)
+            self._staging_dir = pathlib.Path(tempfile.mkdtemp(dir=staging_root))
+            (self._staging_dir / _OWNER).write_text(str(os.getpid()), encoding=const.FILE_ENCODING)
+        return self._staging_dir
+
+    def _write_staged_file(self, staged_file: _StagedFile) -> None:
+        """Write the full new content of a file to the staging directory."""
+        if staged_file.keep_content and staged_file.path.is_file():
+            shutil.copyfile(staged_file.path, staged_file.staged_path)
+        elif staged_file.path.is_file():
+            # the file replaced keeps its permissions
+            staged_file.staged_path.touch()
+            shutil.copymode(staged_file.path, staged_file.staged_path)
+        with open(staged_file.staged_path, 'a') as writer:
+            for encode, _ in staged_file.writes:
+                staged_file.positions.append(writer.tell())
+                writer.write(encode())
+
+    @staticmethod
+    def _sync_staged_file(staged_file: _StagedFile) -> None:
+        """Flush a staged file to disk."""
+        fd = os.open(staged_file.staged_path, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _run(
+        function: Callable[[_StagedFile], None], staged_files: List[_StagedFile], executor: Optional[Executor]
+    ) -> None:
+        if executor is None:
+            for staged_file in staged_files:
+                function(staged_file)
+        else:
+            for future in [executor.submit(function, staged_file) for staged_file in staged_files]:
+                future.result()
+
+    def commit(self, executor: Optional[Executor] = None) -> None:
+        """Write the staged files, then apply the changes in the order they were staged.
+
+        If a change cannot be applied, the changes already applied are undone before raising.
+
+        Args:
+            executor: Executor writing the staged files concurrently, e.g. a thread pool, or None to write them in turn.
+        """
+        staged_files = [operation.staged_file for operation in self._operations if operation.kind == _OP_FILE]
+        if staged_files:
+            staging_dir = self._get_staging_dir()
+            for index, staged_file in enumerate(staged_files):
+                staged_file.staged_path = staging_dir / f'{index:06d}{staged_file.path.suffix}'
+        try:
+            self._run(self._write_staged_file, staged_files, executor)
+            # every file is written before any is flushed, so the flushes of the files overlap
+            self._run(self._sync_staged_file, staged_files, executor)
+        except OSError as e:
+            raise TrestleError(f'Unable to stage the files to write: {e}')
+
+        steps = self._plan_steps()
+        if steps:
+            staging_dir = self._get_staging_dir()
+            try:
+                _write_durably(staging_dir / _JOURNAL, json.dumps([step.to_json() for step in steps]))
+            except OSError as e:
+                raise TrestleError(f'Unable to write the journal of the transaction: {e}')
+        for index, step in enumerate(steps):
+            try:
+                step.apply()
+            except OSError as e:
+                if not _undo_steps(steps[:index + 1]):
+                    self._keep_staging_dir = True
+                    logger.error(f'The files that could not be put back are kept in {self._staging_dir}')
+                raise TrestleError(f'Unable to commit the change of {step.path}, the changes were undone: {e}')
+
+        replaced_dirs = {operation.path.parent for operation in self._operations if operation.kind == _OP_FILE}
+        for dir_path in replaced_dirs:
+            _fsync_dir(dir_path)
+        if steps:
+            try:
+                _write_durably(self._staging_dir / _COMMITTED, '')
+            except OSError as e:
+                logger.warning(f'Unable to mark the transaction as committed: {e}')
+        for operation in self._operations:
+            if operation.kind == _OP_FILE:
+                for (_, callback), position in zip(operation.staged_file.writes, operation.staged_file.positions):
+                    callback(position)
+            for callback in operation.callbacks:
+                callback()
+        if not _finish_steps(steps):
+            self._keep_staging_dir = True
+
+    def _plan_steps(self) -> List[_Step]:
+        """Return the steps applying the operations, replaying them over the file system as it is before the commit."""
+        overlay = FileSystemOverlay()
+        steps: List[_Step] = []
+        originals_dir = None
+        for operation in self._operations:
+            path = operation.path
+            kind = overlay.kind(path)
+            if operation.kind == _OP_DIR:
+                if kind != DIRECTORY:
+                    steps.append(_Step(_STEP_MKDIR, path))
+                overlay.create(path, DIRECTORY)
+                continue
+            if operation.kind == _OP_FILE:
+                staged_path = operation.staged_file.staged_path
+                if kind != FILE:
+                    steps.append(_Step(_STEP_CREATE, path, staged_path))
+                    overlay.create(path, FILE)
+                    continue
+            elif kind is None:
+                continue
+            if originals_dir is None:
+                originals_dir = self._get_staging_dir() / _ORIGINALS_DIR
+                originals_dir.mkdir(exist_ok=True)
+            original_path = originals_dir / f'{len(steps):06d}'
+            if operation.kind == _OP_FILE:
+                steps.append(_Step(_STEP_REPLACE, path, staged_path, original_path))
+            else:
+                steps.append(_Step(_STEP_REMOVE, path, None, original_path))
+                overlay.remove(path)
+        return steps
+
+    def close(self) -> None:
+        """Remove the staging directory, with the files not committed."""
+        if self._staging_dir is not None:
+            if not self._keep_staging_dir:
+                shutil.rmtree(self._staging_dir, ignore_errors=True)
+            self._staging_dir = None
+
+
+def recover_transactions(trestle_root: pathlib.Path) -> int:
+    """Recover from the transactions of a trestle project interrupted while committing, and remove their leftovers.
+
+    The changes of a commit not marked as done are undone, while the paths removed by a commit marked as done are moved
+    into the trash. The staging directories of the transactions whose trestle process is still running are left alone.
+
+    Args:
+        trestle_root: Path of the trestle project.
+    Returns:
+        The number of interrupted commits undone or completed.
+    """
+    staging_root = trestle_root / const.TRESTLE_CONFIG_DIR / const.STAGING_DIR
+    if not staging_root.is_dir():
+        return 0
+    recovered = 0
+    for staging_dir in staging_root.iterdir():
+        if not staging_dir.is_dir() or not _is_abandoned(staging_dir):
+            continue
+        try:
+            steps = [
+                _Step.from_json(obj)
+                for obj in json.loads((staging_dir / _JOURNAL).read_text(encoding=const.FILE_ENCODING))
+            ]
+        except (OSError, ValueError, KeyError, TypeError):
+            # without a complete journal, no change was applied
+            steps = []
+        if steps:
+            recovered += 1
+            if (staging_dir / _COMMITTED).exists():
+                logger.info(f'Completing the transaction interrupted after its commit in {staging_dir}')
+                done = _finish_steps(steps)
+            else:
+                logger.warning(f'Undoing the changes of the transaction interrupted while committing in {staging_dir}')
+                done = _undo_steps(steps)
+            if not done:
+                continue
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return recovered
+
+
+def _is_abandoned(staging_dir: pathlib.Path) -> bool:
+    """Check whether the trestle process owning a staging directory has stopped."""
+    try:
+        pid: Optional[int] = int((staging_dir / _OWNER).read_text(encoding=const.FILE_ENCODING))
+    except (OSError, ValueError):
+        pid = None
+    if pid == os.getpid():
+        return False
+    if pid is not None and os.name == 'posix':
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass
+        return False
+    try:
+        return time.time() - staging_dir.stat().st_mtime > _ABANDONED_SECONDS
+    except OSError:
+        return False
+
+
+def _undo_steps(steps: List[_Step]) -> bool:
+    """Undo the steps, the last first, and return whether they were all undone."""
+    undone = True
+    for step in reversed(steps):
+        try:
+            step.undo()
+        except OSError as e:
+            logger.error(f'Unable to undo the change of {step.path}: {e}')
+            undone = False
+    return undone
+
+
+def _finish_steps(steps: List[_Step]) -> bool:
+    """Move the paths removed by the steps of a commit done into the trash, and return whether they all were."""
+    finished = True
+    for step in steps:
+        if step.kind == _STEP_REMOVE and step.original_path.exists():
+            try:
+                _store_in_trash(step.original_path, step.path)
+            except (OSError, AssertionError) as e:
+                logger.warning(f'Unable to move {step.path} into the trash: {e}')
+                finished = False
+    return finished
+
+
+def _write_durably(path: pathlib.Path, content: str) -> None:
+    """Write a file and flush it, and the directory holding it, to disk."""
+    with open(path, 'w', encoding=const.FILE_ENCODING) as writer:
+        writer.write(content)
+        writer.flush()
+        os.fsync(writer.fileno())
+    _fsync_dir(path.parent)
+
+
+def _keep_original(path: pathlib.Path, original_path: pathlib.Path) -> None:
+    """Keep the content of a file about to be replaced, as a hard link where supported, else as a copy."""
+    try:
+        os.link(path, original_path)
+    except OSError:
+        shutil.copy2(path, original_path)
+
+
+def _store_in_trash(content_path: pathlib.Path, path: pathlib.Path) -> None:
+    """Move the content of a path removed into the trash, as trash.store would have the path itself."""
+    if content_path.is_dir():
+        for item_path in content_path.iterdir():
+            _store_in_trash(item_path, path / item_path.name)
+        content_path.rmdir()
+    else:
+        trash_path = trash.to_trash_file_path(path)
+        trash_path.parent.mkdir(exist_ok=True, parents=True)
+        os.replace(content_path, trash_path)
+
+
+def _fsync_dir(dir_path: pathlib.Path) -> None:
+    """Flush the entries of a directory to disk, where supported, so the renames into it are durable."""
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        logger.debug(f'Unable to flush directory {dir_path}: {e}')
+    finally:
+        os.close(fd)
@@ -16,28 +16,32 @@
 """Validate by confirming no duplicate items."""
 
 import re
+from typing import Any, List
 
 from trestle.core.base_model import OscalBaseModel
 from trestle.core.const import NCNAME_REGEX
-from trestle.core.validator import Validator
-from trestle.core.validator_helper import find_values_by_name
+from trestle.core.validator import ModelVisitor, VisitingValidator
 
+_NCNAME_PATTERN = re.compile(NCNAME_REGEX)
 
-class NcNameValidator(Validator):
-    """Check that all item values conform to NCName regex."""
 
-    def _model_is_valid_role_id(self, model: OscalBaseModel) -> bool:
+class _NcNameVisitor(ModelVisitor):
+    """Check the role ids of a model."""
+
+    def visit(self, name: str, value: Any, path: List[str]) -> bool:
         """Handle specific case for role_id."""
-        role_ids_list = find_values_by_name(model, 'role_ids')
-        p = re.compile(NCNAME_REGEX)
-        for role_id_list in role_ids_list:
-            for role_id in role_id_list:
-                s = str(role_id.__root__)
-                matched = p.match(s)
-                if matched is None:
-                    return False
+        for role_id in value:
+            s = str(role_id.__root__)
+            if _NCNAME_PATTERN.match(s) is None:
+                return False
         return True
 
-    def model_is_valid(self, model: OscalBaseModel) -> bool:
-        """Test if the model is valid."""
-        return self._model_is_valid_role_id(model)
+
+class NcNameValidator(VisitingValidator):
+    """Check that all item values conform to NCName regex."""
+
+    visit_names = frozenset(['role_ids'])
+
+    def create_visitor(self, model: OscalBaseModel) -> ModelVisitor:
+        """Return a new visitor to check the model."""
+        return _NcNameVisitor()
@@ -0,0 +1,144 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Reachability index of the pydantic model classes, e.g. those of trestle.oscal.
+
+The index records, for each field of a model class, the field names (and aliases) and model classes which may occur
+within the values of the field, as declared by the pydantic field metadata. Traversals looking for a field name or a
+model class use it to skip the subtrees of a model which cannot contain a match, e.g. the groups of a catalog when
+looking for role_ids.
+The index of a class is built lazily, on first use, and is bounded like the dynamically created model types.
+"""
+
+import functools
+from typing import Any, Dict, FrozenSet, Iterable, Set, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic.fields import ModelField
+
+from trestle.core import const
+
+# Unparameterized types whose values may hold anything
+_OPEN_TYPES = (object, dict, list, tuple, set, frozenset)
+
+
+class Reach:
+    """Field names and model classes which may occur within a value."""
+
+    __slots__ = ('names', 'model_types', 'is_open', '_type_checks')
+
+    def __init__(self, names: FrozenSet[str], model_types: FrozenSet[Type[BaseModel]], is_open: bool) -> None:
+        """Initialize the reach.
+
+        Args:
+            names: The field names and aliases of the models which may occur within the value.
+            model_types: The declared model classes of the models which may occur within the value, including itself.
+            is_open: Whether the value may hold anything, e.g. a field of type Any, in which case nothing is pruned.
+        """
+        self.names = names
+        self.model_types = model_types
+        self.is_open = is_open
+        self._type_checks: Dict[Type[Any], bool] = {}
+
+    def may_contain_name(self, name: str) -> bool:
+        """Check whether a field of the name may occur within the value."""
+        return self.is_open or name in self.names
+
+    def may_contain_any_name(self, names: FrozenSet[str]) -> bool:
+        """Check whether a field of any of the names may occur within the value."""
+        return self.is_open or not self.names.isdisjoint(names)
+
+    def may_contain_type(self, type_of_interest: Type[Any]) -> bool:
+        """Check whether an instance of the type may occur within the value.
+
+        Only model classes are indexed, so the check always succeeds for other types, e.g. str.
+        An instance of a declared model class may be of a subclass, hence classes related either way are matched.
+        """
+        if self.is_open or not (isinstance(type_of_interest, type) and issubclass(type_of_interest, BaseModel)):
+            return True
+        may_contain = self._type_checks.get(type_of_interest)
+        if may_contain is None:
+            may_contain = any(
+                issubclass(model_type, type_of_interest) or issubclass(type_of_interest, model_type)
+                for model_type in self.model_types
+            )
+            self._type_checks[type_of_interest] = may_contain
+        return may_contain
+
+
+def _declared_model_types(field: ModelField, model_types: Set[Type[BaseModel]]) -> bool:
+    """Collect the model classes a field is declared to hold, directly or in collections, and return if it is open."""
+    is_open = False
+    if field.sub_fields:
+        for sub_field in field.sub_fields:
+            is_open = _declared_model_types(sub_field, model_types) or is_open
+    field_type = field.type_
+    if field_type is Any or field_type in _OPEN_TYPES:
+        is_open = True
+    elif isinstance(field_type, type):
+        if issubclass(field_type, BaseModel):
+            model_types.add(field_type)
+    elif not field.sub_fields:
+        # Any, forward references and other annotations which are not resolved to classes
+        is_open = True
+    return is_open
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def _direct_fields(model_type: Type[BaseModel]) -> Tuple[Tuple[str, str, FrozenSet[Type[BaseModel]], bool], ...]:
+    """Return the name and alias of each field of a model class, the model classes it holds and if it is open."""
+    fields = []
+    for field in model_type.__fields__.values():
+        model_types: Set[Type[BaseModel]] = set()
+        is_open = _declared_model_types(field, model_types)
+        fields.append((field.name, field.alias, frozenset(model_types), is_open))
+    return tuple(fields)
+
+
+def _closure(model_types: Iterable[Type[BaseModel]]) -> Reach:
+    """Return the reach of instances of the model classes, following the fields of every class reachable."""
+    names: Set[str] = set()
+    reached: Set[Type[BaseModel]] = set(model_types)
+    pending = list(reached)
+    is_open = False
+    while pending:
+        for name, alias, field_types, field_is_open in _direct_fields(pending.pop()):
+            names.add(name)
+            names.add(alias)
+            is_open = is_open or field_is_open
+            for field_type in field_types - reached:
+                reached.add(field_type)
+                pending.append(field_type)
+    return Reach(frozenset(names), frozenset(reached), is_open)
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def model_reach(model_type: Type[BaseModel]) -> Reach:
+    """Return the field names and model classes which may occur within an instance of the model class."""
+    return _closure([model_type])
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def field_reaches(model_type: Type[BaseModel]) -> Dict[str, Reach]:
+    """Return the field names and model classes which may occur within the value of each field of the model class.
+
+    The reach of a field does not include the name of the field itself, only the names found within its value.
+    """
+    reaches = {}
+    for name, _, field_types, is_open in _direct_fields(model_type):
+        reach = _closure(field_types)
+        reaches[name] = Reach(reach.names, reach.model_types, reach.is_open or is_open)
+    return reaches
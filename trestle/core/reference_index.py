@@ -0,0 +1,163 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Index of the uuids and ids defined in a model and of the references to them.
+
+The index is built with a single traversal of the model. A uuid is defined by a uuid field or by the key of a collection
+keyed by uuid, e.g. the components of a system implementation, and an id by an id field. References are the fields
+of const.UUID_REF_FIELDS and const.UUID_REF_LIST_FIELDS, e.g. uuid_ref and member_of_organizations, and any other
+*_uuid and *_uuids field, which refer to uuids, and the fields role_id and role_ids and the keys of the
+responsible parties and roles, which refer to the ids of roles. Every reference can then be resolved in constant time.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+from trestle.core import const
+from trestle.core.reachability import field_reaches
+from trestle.core.validator_helper import is_uuid_ref_field, is_uuid_ref_list_field, json_path
+
+REF_KIND_UUID = 'uuid'
+REF_KIND_ROLE = 'role'
+
+
+class Reference:
+    """A reference within a model to a uuid or to the id of a role."""
+
+    __slots__ = ('path', 'field', 'value', 'kind')
+
+    def __init__(self, path: str, field: str, value: str, kind: str) -> None:
+        """Initialize the reference.
+
+        Args:
+            path: The JSON path of the reference within the model.
+            field: The name of the field holding the reference, or keyed by it.
+            value: The uuid or id referred to.
+            kind: The kind of the target, uuid or role.
+        """
+        self.path = path
+        self.field = field
+        self.value = value
+        self.kind = kind
+
+    def __repr__(self) -> str:
+        """Return the reference as a string."""
+        return f'Reference({self.path}={self.value})'
+
+
+class ReferenceIndex:
+    """Definitions of the uuids and ids of a model with the references to them."""
+
+    def __init__(self, model: BaseModel) -> None:
+        """Build the index of a model with a single traversal.
+
+        Args:
+            model: The model to index, e.g. assessment results.
+        """
+        # uuid or id to the JSON path of its first definition
+        self.uuids: Dict[str, str] = {}
+        self.ids: Dict[str, str] = {}
+        self.role_ids: Dict[str, str] = {}
+        self.references: List[Reference] = []
+        self._referrers: Optional[Dict[str, List[Reference]]] = None
+        self._walk(model, [])
+
+    def resolve(self, reference: Reference) -> Optional[str]:
+        """Return the JSON path of the definition the reference refers to, or None if it is dangling."""
+        if reference.kind == REF_KIND_ROLE:
+            return self.role_ids.get(reference.value)
+        return self.uuids.get(reference.value)
+
+    def dangling(self) -> List[Reference]:
+        """Return the references to uuids or roles which are not defined within the model."""
+        return [reference for reference in self.references if self.resolve(reference) is None]
+
+    def references_to(self, value: str) -> List[Reference]:
+        """Return the references to a uuid or a role id."""
+        if self._referrers is None:
+            self._referrers = {}
+            for reference in self.references:
+                self._referrers.setdefault(reference.value, []).append(reference)
+        return self._referrers.get(value, [])
+
+    def _add_reference(self, path: List[Union[str, int]], field: str, value: Any, kind: str) -> None:
+        self.references.append(Reference(json_path(path), field, str(_scalar(value)), kind))
+
+    def _walk(self, node: Any, path: List[Union[str, int]]) -> None:
+        if isinstance(node, BaseModel):
+            values = node.__dict__
+            if '__root__' in values:
+                self._walk(values['__root__'], path)
+                return
+            fields = node.__fields__
+            reaches = field_reaches(type(node))
+            for name, value in values.items():
+                if value is None:
+                    continue
+                path.append(fields[name].alias)
+                self._index_field(name, value, path)
+                reach = reaches[name]
+                if reach.model_types or reach.is_open:
+                    self._walk(value, path)
+                path.pop()
+        elif isinstance(node, list):
+            for index, item in enumerate(node):
+                path.append(index)
+                self._walk(item, path)
+                path.pop()
+        elif isinstance(node, dict):
+            for key, item in node.items():
+                path.append(key)
+                self._walk(item, path)
+                path.pop()
+
+    def _index_field(self, name: str, value: Any, path: List[Union[str, int]]) -> None:
+        if name == 'uuid':
+            self.uuids.setdefault(str(_scalar(value)), json_path(path))
+        elif name == 'id':
+            id_ = str(_scalar(value))
+            self.ids.setdefault(id_, json_path(path))
+            # the id of a role is found at roles[i].id
+            if len(path) >= 3 and path[-3] == 'roles':
+                self.role_ids.setdefault(id_, json_path(path))
+        elif is_uuid_ref_field(name):
+            self._add_reference(path, name, value, REF_KIND_UUID)
+        elif name == 'role_id':
+            self._add_reference(path, name, value, REF_KIND_ROLE)
+        elif is_uuid_ref_list_field(name) or name == 'role_ids':
+            kind = REF_KIND_ROLE if name == 'role_ids' else REF_KIND_UUID
+            for index, item in enumerate(value):
+                path.append(index)
+                self._add_reference(path, name, item, kind)
+                path.pop()
+        elif isinstance(value, dict):
+            for key in value:
+                path.append(key)
+                if name in const.UUID_KEYED_FIELDS:
+                    self.uuids.setdefault(key, json_path(path))
+                elif name in const.UUID_REF_KEYED_FIELDS:
+                    self._add_reference(path, name, key, REF_KIND_UUID)
+                elif name in const.ROLE_KEYED_FIELDS:
+                    self._add_reference(path, name, key, REF_KIND_ROLE)
+                path.pop()
+
+
+def _scalar(value: Any) -> Any:
+    """Return the value of a model with a custom root, e.g. a party uuid, or the value itself."""
+    while isinstance(value, BaseModel) and '__root__' in value.__dict__:
+        value = value.__dict__['__root__']
+    return value
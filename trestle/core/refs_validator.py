@@ -14,25 +14,59 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Validate by confirming all refs have corresponding id."""
+import logging
+from typing import Any, List, Set
+
 from trestle.core.base_model import OscalBaseModel
-from trestle.core.validator import Validator
-from trestle.core.validator_helper import find_values_by_name
+from trestle.core.reference_index import ReferenceIndex
+from trestle.core.validator import ModelVisitor, Validator, VisitingValidator
+
+logger = logging.getLogger(__name__)
+
+
+class _RefsVisitor(ModelVisitor):
+    """Collect the roles and the responsible parties within the metadata of a model."""
+
+    def __init__(self) -> None:
+        self._roles: Set[Any] = set()
+        self._parties: List[Any] = []
+
+    def visit(self, name: str, value: Any, path: List[str]) -> bool:
+        """Collect the roles or responsible parties."""
+        if path[0] == 'metadata':
+            if name == 'roles':
+                self._roles.update(item.id for item in value)
+            else:
+                self._parties.extend(value.keys())
+        return True
+
+    def is_valid(self) -> bool:
+        """Check all responsible parties are found in roles."""
+        return all(party in self._roles for party in self._parties)
 
 
-class RefsValidator(Validator):
+class RefsValidator(VisitingValidator):
     """Validator to confirm all references in responsible parties are found in roles."""
 
+    visit_names = frozenset(['roles', 'responsible_parties'])
+
+    def create_visitor(self, model: OscalBaseModel) -> ModelVisitor:
+        """Return a new visitor to check the model."""
+        return _RefsVisitor()
+
+
+class RefsFullValidator(Validator):
+    """Validator to confirm all references to uuids and roles throughout the model are defined within the model.
+
+    References to the content of other documents, e.g. the components of a system security plan from its assessment
+    results, are reported as dangling, hence the validator is not run in the all mode.
+    """
+
+    run_in_all_mode = False
+
     def model_is_valid(self, model: OscalBaseModel) -> bool:
-        """Test if the model is valid."""
-        metadata = model.metadata
-        roles_list_of_lists = find_values_by_name(metadata, 'roles')
-        roles_list = [item.id for sublist in roles_list_of_lists for item in sublist]
-        roles_set = set(roles_list)
-        responsible_parties_dict_list = find_values_by_name(metadata, 'responsible_parties')
-        parties = []
-        for d in responsible_parties_dict_list:
-            parties.extend(d.keys())
-        for party in parties:
-            if party not in roles_set:
-                return False
-        return True
+        """Test if the model is valid, logging every dangling reference."""
+        dangling = ReferenceIndex(model).dangling()
+        for reference in dangling:
+            logger.warning(f'Dangling reference to {reference.kind} {reference.value} at {reference.path}')
+        return not dangling
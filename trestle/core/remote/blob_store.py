@@ -0,0 +1,330 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Content-addressed store of the remote objects cached under .trestle/cache.
+
+The content of each object fetched is stored once under .trestle/cache/_blobs, in a blob named by the sha256 digest of
+the content, however many uris it was fetched from. The path of the object in the cache, which mirrors its uri, e.g.
+hostname/path/file, only holds the index entry of the object: its metadata file, recording the blob of its content.
+Blobs are optionally compressed with gzip.
+
+The store is bounded in size. Once the blobs exceed the maximum size, the least recently used are evicted, and the
+objects whose content was evicted are fetched again on next use.
+"""
+
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+from trestle.core import const
+from trestle.core import settings
+
+logger = logging.getLogger(__name__)
+
+_TMP_SUFFIX = '.tmp'
+_COMPRESSED_SUFFIX = '.gz'
+_CHUNK_SIZE = 1024 * 1024
+
+# The use of a blob is only recorded if it was not used within this many seconds, so that reading the same blob over
+# and over does not keep updating its mtime.
+_USE_GRANULARITY_SECONDS = 60
+
+# Blobs and downloads more recent than this are left alone when pruning, as they may belong to a fetch in progress,
+# e.g. of another trestle process sharing the project.
+_PRUNE_GRACE_SECONDS = 3600
+
+
+def file_digest(path: pathlib.Path) -> str:
+    """Return the sha256 hex digest of the content of the file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """Size bounded content-addressed store of the remote objects cached for a trestle project."""
+
+    _stores: Dict[pathlib.Path, 'BlobStore'] = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(
+        self, cache_dir: pathlib.Path, max_size: int = const.REMOTE_CACHE_MAX_SIZE, compress: bool = False
+    ) -> None:
+        """Initialize the store of a remote cache.
+
+        Args:
+            cache_dir: The directory of the remote cache, i.e. .trestle/cache.
+            max_size: Maximum size in bytes of all the blobs before the least recently used are evicted.
+            compress: Whether new blobs are compressed with gzip.
+        """
+        self._cache_dir = cache_dir
+        self._blobs_dir = cache_dir / const.REMOTE_CACHE_BLOBS_DIR
+        self._max_size = max_size
+        self._compress = compress
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    @classmethod
+    def for_trestle_root(cls, trestle_root: pathlib.Path) -> 'BlobStore':
+        """Return the store of the remote cache of the trestle project.
+
+        The maximum size is set in bytes by the remote_cache_max_size option of the [cache] section of
+        .trestle/config.ini, or the TRESTLE_REMOTE_CACHE_MAX_SIZE environment variable, and compression is enabled by
+        the remote_cache_compress option, or the TRESTLE_REMOTE_CACHE_COMPRESS environment variable.
+        """
+        store = cls._stores.get(trestle_root)
+        if store is None:
+            max_size = settings.get_int_setting(
+                trestle_root,
+                const.CACHE_SECTION,
+                'remote_cache_max_size',
+                const.ENV_REMOTE_CACHE_MAX_SIZE,
+                const.REMOTE_CACHE_MAX_SIZE
+            )
+            compress = settings.get_bool_setting(
+                trestle_root, const.CACHE_SECTION, 'remote_cache_compress', const.ENV_REMOTE_CACHE_COMPRESS
+            )
+            cache_dir = trestle_root / const.TRESTLE_CONFIG_DIR / 'cache'
+            with cls._stores_lock:
+                store = cls._stores.setdefault(trestle_root, cls(cache_dir, max_size, compress))
+        return store
+
+    @property
+    def cache_dir(self) -> pathlib.Path:
+        """Return the directory of the remote cache."""
+        return self._cache_dir
+
+    def path(self, blob: str) -> pathlib.Path:
+        """Return the path of the blob, given by its name relative to the blobs directory."""
+        return self._blobs_dir / blob
+
+    @staticmethod
+    def is_compressed(blob: str) -> bool:
+        """Check whether the blob is compressed."""
+        return blob.endswith(_COMPRESSED_SUFFIX)
+
+    @contextlib.contextmanager
+    def download(self) -> Iterator[pathlib.Path]:
+        """Provide an empty temporary file to download the content of an object into, before it is put in the store.
+
+        The file is removed on exit unless it was put in the store.
+        """
+        self._blobs_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self._blobs_dir, suffix=_TMP_SUFFIX)
+        os.close(fd)
+        try:
+            yield pathlib.Path(tmp_name)
+        finally:
+            _discard(pathlib.Path(tmp_name))
+
+    def put(self, path: pathlib.Path, suffix: str, digest: Optional[str] = None) -> Tuple[str, str]:
+        """Move the downloaded content of an object into the store, unless a blob of the same content is stored already.
+
+        Args:
+            path: The temporary file holding the content, provided by download.
+            suffix: The suffix of the object, e.g. .json, which the blob keeps so its content type is known.
+            digest: The sha256 digest of the content if already known, computed otherwise.
+
+        Returns:
+            The digest of the content and the name of its blob.
+        """
+        if digest is None:
+            digest = file_digest(path)
+        name = f'{digest[:2]}/{digest}{suffix}'
+        for blob in [name, name + _COMPRESSED_SUFFIX]:
+            if self.path(blob).exists():
+                self.mark_used(blob)
+                return digest, blob
+        blob = name + _COMPRESSED_SUFFIX if self._compress else name
+        blob_path = self.path(blob)
+        blob_path.parent.mkdir(exist_ok=True)
+        if self._compress:
+            fd, tmp_name = tempfile.mkstemp(dir=self._blobs_dir, suffix=_TMP_SUFFIX)
+            try:
+                with open(path, 'rb') as src, os.fdopen(fd, 'wb') as raw:
+                    with gzip.GzipFile(fileobj=raw, mode='wb') as dst:
+                        shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+                os.replace(tmp_name, blob_path)
+            finally:
+                _discard(pathlib.Path(tmp_name))
+        else:
+            os.replace(path, blob_path)
+        with self._lock:
+            if self._size is not None:
+                self._size += blob_path.stat().st_size
+        self._evict(self._max_size, self._max_size * 9 // 10, blob_path)
+        return digest, blob
+
+    def read_bytes(self, blob: str) -> bytes:
+        """Return the content of the blob, decompressed."""
+        content = self.path(blob).read_bytes()
+        self.mark_used(blob)
+        return gzip.decompress(content) if self.is_compressed(blob) else content
+
+    def mark_used(self, blob: str) -> None:
+        """Record the use of the blob, which is evicted after the blobs used less recently."""
+        blob_path = self.path(blob)
+        try:
+            if time.time() - blob_path.stat().st_mtime > _USE_GRANULARITY_SECONDS:
+                os.utime(blob_path)
+        except OSError:
+            pass
+
+    def _blobs(self) -> Dict[pathlib.Path, os.stat_result]:
+        blobs: Dict[pathlib.Path, os.stat_result] = {}
+        if not self._blobs_dir.is_dir():
+            return blobs
+        for prefix_dir in os.scandir(self._blobs_dir):
+            if not prefix_dir.is_dir():
+                continue
+            for entry in os.scandir(prefix_dir.path):
+                try:
+                    blobs[pathlib.Path(entry.path)] = entry.stat()
+                except OSError:
+                    pass
+        return blobs
+
+    def _walk_objects(self) -> Iterator[Tuple[pathlib.Path, bool]]:
+        """Yield the files of the cache outside the blobs directory and whether each is an index entry."""
+        if not self._cache_dir.is_dir():
+            return
+        for dir_name, dir_names, file_names in os.walk(self._cache_dir):
+            if pathlib.Path(dir_name) == self._cache_dir and const.REMOTE_CACHE_BLOBS_DIR in dir_names:
+                dir_names.remove(const.REMOTE_CACHE_BLOBS_DIR)
+            for file_name in file_names:
+                yield pathlib.Path(dir_name) / file_name, file_name.endswith(const.REMOTE_CACHE_METADATA_SUFFIX)
+
+    def _index(self) -> Dict[pathlib.Path, Optional[str]]:
+        """Return the path of each index entry and the name of the blob it records, if any."""
+        index: Dict[pathlib.Path, Optional[str]] = {}
+        for path, is_entry in self._walk_objects():
+            if not is_entry:
+                continue
+            try:
+                blob = json.loads(path.read_text(encoding=const.FILE_ENCODING)).get('blob')
+            except (OSError, ValueError, AttributeError):
+                blob = None
+            index[path] = blob if isinstance(blob, str) else None
+        return index
+
+    def _evict(self, max_size: int, target_size: int, keep: Optional[pathlib.Path] = None) -> int:
+        """Remove the least recently used blobs, other than the one kept, once their size exceeds the maximum size.
+
+        Returns:
+            The number of blobs evicted.
+        """
+        evicted = 0
+        with self._lock:
+            if self._size is None:
+                self._size = sum(blob_stat.st_size for blob_stat in self._blobs().values())
+            if self._size <= max_size:
+                return evicted
+            blobs = self._blobs()
+            self._size = sum(blob_stat.st_size for blob_stat in blobs.values())
+            for blob_path, blob_stat in sorted(blobs.items(), key=lambda item: item[1].st_mtime_ns):
+                if self._size <= target_size:
+                    break
+                if blob_path == keep:
+                    continue
+                _discard(blob_path)
+                self._size -= blob_stat.st_size
+                evicted += 1
+            logger.debug(f'remote cache evicted down to {self._size} bytes')
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of objects cached, the number of blobs, their total size and the maximum size."""
+        blobs = self._blobs()
+        size = sum(blob_stat.st_size for blob_stat in blobs.values())
+        with self._lock:
+            self._size = size
+        objects = sum(1 for blob in self._index().values() if blob is not None and self.path(blob) in blobs)
+        return {'objects': objects, 'blobs': len(blobs), 'size': size, 'max_size': self._max_size}
+
+    def prune(self, max_size: Optional[int] = None) -> Dict[str, int]:
+        """Remove what is no longer used from the cache, then evict the least recently used blobs down to the max size.
+
+        The index entries whose blob was evicted, the blobs no index entry records, the interrupted downloads and the
+        objects cached before the store was introduced are removed. Blobs and downloads of the last hour are kept, since
+        they may belong to a fetch in progress.
+
+        Args:
+            max_size: The size in bytes to evict down to, by default the maximum size of the store.
+
+        Returns:
+            The number of index entries and of blobs removed, and of blobs evicted.
+        """
+        removed_entries = 0
+        recorded = set()
+        for path, blob in self._index().items():
+            if blob is not None and self.path(blob).exists():
+                recorded.add(self.path(blob))
+            else:
+                _discard(path)
+                removed_entries += 1
+        for path, is_entry in list(self._walk_objects()):
+            if not is_entry:
+                _discard(path)
+                removed_entries += 1
+        removed_blobs = 0
+        cutoff = time.time() - _PRUNE_GRACE_SECONDS
+        for blob_path, blob_stat in self._blobs().items():
+            if blob_path not in recorded and blob_stat.st_mtime < cutoff:
+                _discard(blob_path)
+                removed_blobs += 1
+        if self._blobs_dir.is_dir():
+            for tmp_path in self._blobs_dir.glob('*' + _TMP_SUFFIX):
+                try:
+                    if tmp_path.stat().st_mtime < cutoff:
+                        _discard(tmp_path)
+                except OSError:
+                    pass
+        with self._lock:
+            self._size = None
+        max_size = self._max_size if max_size is None else max_size
+        evicted = self._evict(max_size, max_size)
+        return {'entries': removed_entries, 'blobs': removed_blobs, 'evicted': evicted}
+
+    def clear(self) -> int:
+        """Remove everything from the cache and return the number of objects removed."""
+        objects = len(self._index())
+        if self._cache_dir.is_dir():
+            for entry in os.scandir(self._cache_dir):
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    _discard(pathlib.Path(entry.path))
+        with self._lock:
+            self._size = 0
+        return objects
+
+
+def _discard(path: pathlib.Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
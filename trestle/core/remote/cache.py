@@ -19,6 +19,7 @@ Trestle cache operations library.
 Allows for using uris to reference external directories and then expand.
 """
 
+import contextlib
 import getpass
 import json
 import logging
@@ -26,10 +27,12 @@ import os
 import pathlib
 import re
 import shutil
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
-from json.decoder import JSONDecodeError
-from typing import Any, Dict, Type
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
 from urllib import parse
 
 import paramiko
@@ -38,8 +41,16 @@ import requests
 from requests.auth import HTTPBasicAuth
 
 from trestle.core import const
+from trestle.core import json_backend
+from trestle.core import settings
+from trestle.core import yaml_backend
 from trestle.core.base_model import OscalBaseModel
 from trestle.core.err import TrestleError
+from trestle.core.models.file_content_type import FileContentType
+from trestle.core.remote.blob_store import BlobStore, file_digest
+from trestle.core.remote.parsed_models import parsed_models
+from trestle.core.stream_reader import check_json
+from trestle.core.utils import classname_to_alias
 from trestle.utils import fs
 
 logger = logging.getLogger(__name__)
@@ -58,6 +69,7 @@ class FetcherBase(ABC):
             cache_only: Whether or not the operation should only target the cache copy
         """
         logger.debug('Initializing FetcherBase')
+        # path of the object in the cache mirroring the uri, next to which its index entry is kept
         self._inst_cache_path: pathlib.Path
         self._uri = uri
         self._refresh = refresh
@@ -65,12 +77,40 @@ class FetcherBase(ABC):
         self._trestle_cache_path: pathlib.Path = trestle_root / const.TRESTLE_CONFIG_DIR / 'cache'
         # ensure trestle cache directory exists.
         self._trestle_cache_path.mkdir(exist_ok=True)
+        # store of the content of the cached objects
+        self._store = BlobStore.for_trestle_root(trestle_root)
+        # maximum estimated size in bytes of the objects parsed from the cache kept in memory
+        self._parsed_max_size = settings.get_int_setting(
+            trestle_root,
+            const.CACHE_SECTION,
+            'parsed_model_cache_max_size',
+            const.ENV_PARSED_MODEL_CACHE_MAX_SIZE,
+            const.PARSED_MODEL_CACHE_MAX_SIZE
+        )
+        # seconds for which a cached object is fresh and not refreshed, 0 to always refresh on request
+        self._ttl = settings.get_int_setting(
+            trestle_root, const.CACHE_SECTION, 'remote_ttl', const.ENV_REMOTE_CACHE_TTL, 0
+        )
+        # metadata of the cached object, e.g. when it was fetched, loaded when the cache is updated
+        self._metadata: Dict[str, Any] = {}
+        # connections shared with the other fetchers of a batch, if any
+        self._connection_pool: Optional['ConnectionPool'] = None
+        # sha256 digest the content downloaded must have, if given by the uri
+        self._expected_digest: Optional[str] = None
 
     @abstractmethod
-    def _sync_cache(self) -> None:
+    def _sync_cache(self, download_path: pathlib.Path) -> bool:
         """Fetch a object from a remote source.
 
-        This contains the underlying logic to update the cache.
+        This contains the underlying logic to update the cache. The content is streamed to the download path, and
+        then verified before it is moved into the cache, so an interrupted or corrupt download never replaces the
+        cached content.
+
+        Args:
+            download_path: The temporary file to download the content of the object into.
+
+        Returns:
+            Whether the content was downloaded, or False if the cached content is still current.
         """
         pass
 
@@ -83,13 +123,71 @@ class FetcherBase(ABC):
         if self._cache_only:
             # Don't update if cache only...
             return
-        if not self.in_cache() or self._refresh:
+        if not self.in_cache() or (self._refresh and not self.is_fresh()):
+            self._metadata = self._load_metadata() if self.in_cache() else {}
             try:
-                self._sync_cache()
+                with self._store.download() as download_path:
+                    if self._sync_cache(download_path):
+                        digest = self._verify_download(download_path)
+                        digest, blob = self._store.put(download_path, self._inst_cache_path.suffix, digest)
+                        self._metadata['digest'] = digest
+                        self._metadata['blob'] = blob
             except Exception as e:
                 logger.error(f'Unable to update cache for {self._uri}')
                 logger.debug(e)
                 raise TrestleError(f'Cache update failure for {self._uri}') from e
+            self._metadata['fetched-at'] = time.time()
+            self._save_metadata()
+
+    def _verify_download(self, download_path: pathlib.Path) -> str:
+        """Verify the digest of the content downloaded, if given by the uri, and that JSON content is well-formed.
+
+        Returns:
+            The sha256 digest of the content.
+        """
+        digest = file_digest(download_path)
+        if self._expected_digest is not None and digest != self._expected_digest:
+            raise TrestleError(f'Digest mismatch for {self._uri}: expected {self._expected_digest} but got {digest}')
+        if FileContentType.to_content_type(self._inst_cache_path.suffix) == FileContentType.JSON:
+            check_json(download_path)
+        return digest
+
+    def _digest_from_uri(self) -> Optional[str]:
+        """Return the sha256 digest given by a sha256=<hex digest> fragment of the uri, if any."""
+        values = parse.parse_qs(parse.urlparse(self._uri).fragment).get('sha256')
+        if not values:
+            return None
+        if not re.fullmatch('[0-9a-fA-F]{64}', values[0]):
+            logger.error(f'Malformed URI, the sha256 fragment must be a hex digest {self._uri}')
+            raise TrestleError(f'Cache request for invalid input URI: malformed sha256 digest {self._uri}')
+        return values[0].lower()
+
+    def _metadata_path(self) -> pathlib.Path:
+        return self._inst_cache_path.with_name(self._inst_cache_path.name + const.REMOTE_CACHE_METADATA_SUFFIX)
+
+    def _load_metadata(self) -> Dict[str, Any]:
+        try:
+            metadata = json.loads(self._metadata_path().read_text(encoding=const.FILE_ENCODING))
+        except (OSError, ValueError):
+            return {}
+        return metadata if isinstance(metadata, dict) else {}
+
+    def _save_metadata(self) -> None:
+        try:
+            self._metadata_path().write_text(json.dumps(self._metadata), encoding=const.FILE_ENCODING)
+        except OSError as e:
+            logger.debug(f'Unable to write the cache metadata of {self._uri}: {e}')
+
+    def is_fresh(self) -> bool:
+        """Return whether the object is cached and was fetched within the freshness TTL.
+
+        The TTL is set in seconds by the remote_ttl option of the [cache] section of .trestle/config.ini, or the
+        TRESTLE_REMOTE_CACHE_TTL environment variable. A fresh object is not fetched again even when refreshing.
+        """
+        if self._ttl <= 0 or not self.in_cache():
+            return False
+        fetched_at = self._load_metadata().get('fetched-at')
+        return isinstance(fetched_at, (int, float)) and 0 <= time.time() - fetched_at < self._ttl
 
     def get_raw(self) -> Dict[str, Any]:
         """Retrieve the raw dictionary representing the underlying object."""
@@ -99,26 +197,45 @@ class FetcherBase(ABC):
             logger.error(f'Cannot get_raw due to failed _update_cache for {self._uri}')
             logger.debug(e)
             raise TrestleError(f'Cache get failure for {self._uri}') from e
-        # Return results in the cache, whether yaml or json, or whatever is supported by fs.load_file().
+        # Return results in the cache, whether yaml or json.
+        blob = self._cached_blob()
         try:
-            return fs.load_file(self._inst_cache_path)
+            return parsed_models.get(
+                (blob, None), lambda: self._load_content(self._store.read_bytes(blob)), self._parsed_max_size
+            )
         except Exception as e:
-            logger.error(f'Cannot fs.load_file {self._inst_cache_path}')
+            logger.error(f'Cannot load the cached content of {self._uri}')
             logger.debug(e)
             raise TrestleError(f'Cache get failure for {self._uri}') from e
 
+    def _cached_blob(self) -> Optional[str]:
+        """Return the name of the blob holding the cached content of the object, if recorded."""
+        blob = self._load_metadata().get('blob')
+        return blob if isinstance(blob, str) else None
+
+    def _load_content(self, content: bytes) -> Dict[str, Any]:
+        if FileContentType.to_content_type(self._inst_cache_path.suffix) == FileContentType.YAML:
+            return yaml_backend.load(content)
+        return json_backend.loads(content)
+
     def get_oscal(self, model_type: Type[OscalBaseModel]) -> OscalBaseModel:
         """Retrieve the cached file as a particular OSCAL model.
 
+        The object is only parsed once per process, and every call returns its own copy, see
+        trestle.core.remote.parsed_models.
+
         Argument:
         ---------
         model_type: Type[OscalBaseModel]
             Identifies what OSCAL model to cast the retrieved object as.
         """
-        cache_file = self._inst_cache_path
-        if cache_file.exists():
+        blob = self._cached_blob()
+        if blob is not None and self._store.path(blob).exists():
             try:
-                return model_type.oscal_read(cache_file)
+                self._store.mark_used(blob)
+                return parsed_models.get(
+                    (blob, model_type), lambda: self._parse(blob, model_type), self._parsed_max_size
+                )
             except Exception as e:
                 logger.error(f'get_oscal failed, JSON error loading cache file for {self._uri} as {model_type}')
                 logger.debug(e)
@@ -127,9 +244,16 @@ class FetcherBase(ABC):
             logger.error(f'get_oscal error, no cached file for {self._uri}')
             raise TrestleError(f'get_oscal failure for {self._uri}')
 
+    def _parse(self, blob: str, model_type: Type[OscalBaseModel]) -> OscalBaseModel:
+        if not BlobStore.is_compressed(blob):
+            return model_type.oscal_read(self._store.path(blob))
+        obj = self._load_content(self._store.read_bytes(blob))
+        return model_type.parse_obj(obj[classname_to_alias(model_type.__name__, 'json')])
+
     def in_cache(self) -> bool:
-        """Return whether object is contained within the cache or not."""
-        return self._inst_cache_path.exists()
+        """Return whether object is contained within the cache or not, i.e. its content was not evicted."""
+        blob = self._cached_blob()
+        return blob is not None and self._store.path(blob).exists()
 
 
 class LocalFetcher(FetcherBase):
@@ -167,7 +291,7 @@ class LocalFetcher(FetcherBase):
         localhost_cached_dir.mkdir(parents=True, exist_ok=True)
         self._inst_cache_path = localhost_cached_dir / pathlib.Path(pathlib.Path(self._uri).name)
 
-    def _sync_cache(self) -> None:
+    def _sync_cache(self, download_path: pathlib.Path) -> bool:
         """Copy the local resource into the cache."""
         # Do not allow remote fetch from a trestle project:
         if fs.get_trestle_project_root(self._abs_path) is not None:
@@ -176,7 +300,8 @@ class LocalFetcher(FetcherBase):
                 'Cache request for invalid input URI:'
                 f'Attempt to cache from location within a trestle project {self._uri}'
             )
-        shutil.copy(self._abs_path, self._inst_cache_path)
+        shutil.copy(self._abs_path, download_path)
+        return True
 
 
 class HTTPSFetcher(FetcherBase):
@@ -191,6 +316,7 @@ class HTTPSFetcher(FetcherBase):
         self._password = None
         u = parse.urlparse(self._uri)
         self._url = uri
+        self._expected_digest = self._digest_from_uri()
         # If the either the username or password is omitted in the url, then the other becomes ''
         # so we test for either None or ''.
         if u.username != '' and u.username is not None:
@@ -253,7 +379,7 @@ class HTTPSFetcher(FetcherBase):
         https_cached_dir.mkdir(parents=True, exist_ok=True)
         self._inst_cache_path = https_cached_dir / pathlib.Path(pathlib.Path(u.path).name)
 
-    def _sync_cache(self) -> None:
+    def _sync_cache(self, download_path: pathlib.Path) -> bool:
         auth = None
         verify = None
         # This order reflects requests library behavior: REQUESTS_CA_BUNDLE comes first.
@@ -268,23 +394,52 @@ class HTTPSFetcher(FetcherBase):
                     raise TrestleError(f'Cache update failure with bad inputenv var: {err_str}')
         if self._username is not None and self._password is not None:
             auth = HTTPBasicAuth(self._username, self._password)
+        # revalidate the cached object with the validators of the response it was fetched from
+        headers = {}
+        if self.in_cache():
+            if 'etag' in self._metadata:
+                headers['If-None-Match'] = self._metadata['etag']
+            if 'last-modified' in self._metadata:
+                headers['If-Modified-Since'] = self._metadata['last-modified']
         try:
-            response = requests.get(self._url, auth=auth, verify=verify)
+            if self._connection_pool is None:
+                response = requests.get(self._url, auth=auth, verify=verify, headers=headers, stream=True)
+            else:
+                response = self._connection_pool.http_session(self._url).get(
+                    self._url, auth=auth, verify=verify, headers=headers, stream=True
+                )
         except Exception as e:
             logger.error(f'Error connecting to {self._url}: {e}')
             raise TrestleError(f'Cache update failure to connect via HTTPS: {self._url} ({e})')
 
-        if response.status_code == 200:
+        with response:
+            if response.status_code == 304 and headers:
+                logger.debug(f'Cached copy of {self._url} is not modified')
+                return False
+            if response.status_code != 200:
+                raise TrestleError(f'GET returned code {response.status_code}: {self._uri}')
+            # stream the content to the download path so that only a chunk of it is ever held in memory
+            size = 0
             try:
-                result = response.json()
-            except JSONDecodeError as err:
-                logger.debug(f'HTTPSFetcher._sync_cache() request.json() method failed for url {self._url}: {err}')
-                logger.error(f'HTTPSFetcher sync failed, JSON error from getting url {self._url}: {err}')
-                raise TrestleError(f'Cache update failure with expected JSON via HTTPS: {self._url} ({err})')
-            else:
-                self._inst_cache_path.write_text(json.dumps(result))
-        else:
-            raise TrestleError(f'GET returned code {response.status_code}: {self._uri}')
+                with open(download_path, 'wb') as download_file:
+                    for chunk in response.iter_content(chunk_size=const.REMOTE_DOWNLOAD_CHUNK_SIZE):
+                        download_file.write(chunk)
+                        size += len(chunk)
+            except requests.RequestException as e:
+                logger.error(f'Download of {self._url} interrupted: {e}')
+                raise TrestleError(f'Cache update failure, download interrupted via HTTPS: {self._url} ({e})')
+            # the length sent is only the length downloaded if the content was not encoded, e.g. compressed
+            content_length = response.headers.get('content-length', '')
+            if content_length.isdigit() and 'content-encoding' not in response.headers and int(content_length) != size:
+                raise TrestleError(
+                    f'Cache update failure, incomplete download via HTTPS: {self._url} '
+                    f'({size} of {content_length} bytes)'
+                )
+            for header in ['etag', 'last-modified']:
+                self._metadata.pop(header, None)
+                if header in response.headers:
+                    self._metadata[header] = response.headers[header]
+        return True
 
 
 class SFTPFetcher(FetcherBase):
@@ -315,14 +470,28 @@ class SFTPFetcher(FetcherBase):
         sftp_cached_dir = sftp_cached_dir / path_parent
         sftp_cached_dir.mkdir(parents=True, exist_ok=True)
         self._inst_cache_path = sftp_cached_dir / pathlib.Path(pathlib.Path(u.path).name)
+        self._expected_digest = self._digest_from_uri()
 
-    def _sync_cache(self) -> None:
+    def _sync_cache(self, download_path: pathlib.Path) -> bool:
         """Fetch remote object and update the cache if appropriate and possible to do so.
 
         Authentication relies on the user's private key being either active via ssh-agent or
         supplied via environment variable SSH_KEY. In the latter case, it must not require a passphrase prompt.
+        Within a batch fetch, the SFTP session of the host is shared with the other fetchers of the batch.
         """
         u = parse.urlparse(self._uri)
+        username = getpass.getuser() if not u.username else u.username
+        if self._connection_pool is None:
+            _, sftp_client = self._connect(u, username)
+            self._get(sftp_client, u, download_path)
+            return True
+        with self._connection_pool.sftp_session((u.hostname, u.port, username),
+                                                lambda: self._connect(u, username)) as sftp_client:
+            self._get(sftp_client, u, download_path)
+        return True
+
+    def _connect(self, u: parse.ParseResult, username: str) -> Tuple[paramiko.SSHClient, paramiko.SFTPClient]:
+        """Connect to the host of the uri and open an sftp session."""
         client = paramiko.SSHClient()
         # Must pick up host keys from the default known_hosts on this environment:
         try:
@@ -339,7 +508,6 @@ class SFTPFetcher(FetcherBase):
             pkey = None
             look_for_keys = True
 
-        username = getpass.getuser() if not u.username else u.username
         try:
             client.connect(
                 u.hostname,
@@ -360,14 +528,115 @@ class SFTPFetcher(FetcherBase):
             logger.error(f'Error opening sftp session for {username}@{u.hostname}')
             logger.debug(e)
             raise TrestleError(f'Cache update failure to open sftp for {username}@{u.hostname}')
+        return client, sftp_client
 
-        localpath = self._inst_cache_path
+    def _get(self, sftp_client: paramiko.SFTPClient, u: parse.ParseResult, localpath: pathlib.Path) -> None:
+        """Get the remote file into the local path, checking it was transferred in full."""
         try:
+            expected_size = sftp_client.stat(u.path[1:]).st_size
             sftp_client.get(remotepath=u.path[1:], localpath=(localpath.__str__()))
         except Exception as e:
             logger.error(f'Error getting remote resource {self._uri} into cache {localpath}')
             logger.debug(e)
             raise TrestleError(f'Cache update failure for {self._uri}')
+        size = localpath.stat().st_size
+        if expected_size is not None and size != expected_size:
+            raise TrestleError(
+                f'Cache update failure, incomplete transfer of {self._uri} ({size} of {expected_size} bytes)'
+            )
+
+
+class ConnectionPool:
+    """Connections shared by the fetchers of a batch, i.e. a keep-alive HTTP session and an SFTP session per host."""
+
+    def __init__(self) -> None:
+        """Initialize an empty pool, the connections being opened on first use."""
+        self._lock = threading.Lock()
+        self._http_sessions: Dict[Tuple[str, str], requests.Session] = {}
+        self._sftp_sessions: Dict[Tuple[Any, ...], _SFTPSession] = {}
+
+    def http_session(self, url: str) -> requests.Session:
+        """Return the HTTP session of the host of the url, which may be used concurrently."""
+        u = parse.urlparse(url)
+        key = (u.scheme, f'{u.hostname}:{u.port}')
+        with self._lock:
+            session = self._http_sessions.get(key)
+            if session is None:
+                session = self._http_sessions[key] = requests.Session()
+        return session
+
+    @contextlib.contextmanager
+    def sftp_session(
+        self,
+        key: Tuple[Any, ...],
+        connect: Callable[[], Tuple[paramiko.SSHClient, paramiko.SFTPClient]],
+    ) -> Iterator[paramiko.SFTPClient]:
+        """Use the SFTP session of a host, connecting on first use.
+
+        An SFTP session handles one transfer at a time, so the fetchers of a host take turns.
+
+        Args:
+            key: The host, port and username of the session.
+            connect: Connect to the host and open the session.
+        """
+        with self._lock:
+            session = self._sftp_sessions.get(key)
+            if session is None:
+                session = self._sftp_sessions[key] = _SFTPSession()
+        with session.lock:
+            if session.sftp_client is None:
+                session.ssh_client, session.sftp_client = connect()
+            yield session.sftp_client
+
+    def close(self) -> None:
+        """Close all the connections."""
+        with self._lock:
+            for session in self._http_sessions.values():
+                session.close()
+            for sftp_session in self._sftp_sessions.values():
+                sftp_session.close()
+            self._http_sessions = {}
+            self._sftp_sessions = {}
+
+
+class _SFTPSession:
+    """SSH connection and SFTP session to a host."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.ssh_client: Optional[paramiko.SSHClient] = None
+        self.sftp_client: Optional[paramiko.SFTPClient] = None
+
+    def close(self) -> None:
+        for client in [self.sftp_client, self.ssh_client]:
+            if client is not None:
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.debug(f'Error closing SSH connection: {e}')
+
+
+class FetchResult:
+    """Outcome of fetching a uri in a batch."""
+
+    __slots__ = ('uri', 'fetcher', 'error')
+
+    def __init__(self, uri: str, fetcher: Optional[FetcherBase], error: Optional[str]) -> None:
+        """Initialize the outcome.
+
+        Args:
+            uri: The uri fetched.
+            fetcher: The fetcher of the uri, from which the cached object can be read, or None if the uri is invalid.
+            error: The reason the uri could not be fetched, or None if it was fetched.
+        """
+        self.uri = uri
+        self.fetcher = fetcher
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Return whether the uri was fetched."""
+        return self.error is None
 
 
 # For passing variables:
@@ -409,3 +678,58 @@ class FetcherFactory(object):
             return LocalFetcher(trestle_root, uri, refresh, cache_only)
         else:
             raise TrestleError(f'Unable to fetch uri: {uri} as the uri did not match a suppported format.')
+
+    @classmethod
+    def fetch_all(
+        cls,
+        trestle_root: pathlib.Path,
+        uris: List[str],
+        refresh: bool = False,
+        cache_only: bool = False,
+        max_workers: Optional[int] = None
+    ) -> List[FetchResult]:
+        """Fetch many uris into the cache concurrently, sharing one connection per host.
+
+        The fetchers of the uris of a host share a keep-alive HTTP session, or a single SSH connection and SFTP
+        session, so the host is only connected to once. A uri given more than once is fetched once.
+
+        Args:
+            trestle_root: Path of the Trestle project path, i.e., within which .trestle is to be found.
+            uris: References to the remote objects to cache.
+            refresh: Whether or not the cache should be refreshed
+            cache_only: Whether or not the operation should only target the cache copy
+            max_workers: The maximum number of worker threads. Defaults to the ThreadPoolExecutor default.
+
+        Returns:
+            The outcome of fetching each uri, in the order of the uris.
+        """
+        results: Dict[str, FetchResult] = {}
+        pool = ConnectionPool()
+
+        def fetch(fetcher: FetcherBase) -> None:
+            fetcher._update_cache()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {}
+                for uri in uris:
+                    if uri in results:
+                        continue
+                    try:
+                        fetcher = cls.get_fetcher(trestle_root, uri, refresh, cache_only)
+                    except TrestleError as e:
+                        results[uri] = FetchResult(uri, None, str(e))
+                        continue
+                    fetcher._connection_pool = pool
+                    results[uri] = FetchResult(uri, fetcher, None)
+                    futures[uri] = executor.submit(fetch, fetcher)
+                for uri, future in futures.items():
+                    error = future.exception()
+                    if error is not None:
+                        results[uri].error = str(error)
+        finally:
+            pool.close()
+        for result in results.values():
+            if result.fetcher is not None:
+                result.fetcher._connection_pool = None
+        return [results[uri] for uri in uris]
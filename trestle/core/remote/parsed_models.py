@@ -0,0 +1,172 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+In-process cache of the remote objects parsed from the remote cache.
+
+A remote object referenced many times in a run, e.g. a catalog imported by several profiles, is only decoded and parsed
+once. The entries are keyed by the blob holding the content of the object, which is named by the digest of the content
+and so never changes, and by the model class it was parsed as, or None for the decoded content returned by get_raw.
+
+Every caller gets its own copy of the cached object, so that modifying it cannot corrupt the cache. The copy only
+duplicates the models, lists and dicts of the object and shares the immutable leaves, e.g. strings, which is much faster
+than parsing or a deep copy. The cache is bounded by an estimate of the memory held by its entries, the least recently
+used being evicted beyond the maximum size.
+"""
+
+import collections
+import datetime
+import enum
+import sys
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from pydantic import BaseModel
+
+from trestle.core import const
+
+# Leaves of the models which are immutable, and so shared by the copies
+_IMMUTABLE_TYPES = (str, int, float, bool, bytes, enum.Enum, datetime.date, datetime.time, datetime.timedelta)
+
+
+def copy_value(value: Any) -> Any:
+    """Return a copy of the models, lists and dicts of the value, sharing its immutable leaves."""
+    if value is None or isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    if isinstance(value, BaseModel):
+        model_type = type(value)
+        instance = model_type.__new__(model_type)
+        object.__setattr__(instance, '__dict__', {name: copy_value(item) for name, item in value.__dict__.items()})
+        object.__setattr__(instance, '__fields_set__', set(value.__fields_set__))
+        for name in model_type.__private_attributes__:
+            if hasattr(value, name):
+                object.__setattr__(instance, name, copy_value(getattr(value, name)))
+        return instance
+    if isinstance(value, list):
+        return [copy_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: copy_value(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return tuple(copy_value(item) for item in value)
+    if isinstance(value, set):
+        return {copy_value(item) for item in value}
+    # e.g. pydantic urls, which are strings, or other immutable values
+    return value
+
+
+def deep_size(value: Any) -> int:
+    """Return an estimate in bytes of the memory held by the value and everything it refers to."""
+    size = 0
+    seen: Set[int] = set()
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, BaseModel):
+            pending.append(item.__dict__)
+        elif isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            pending.extend(item)
+    return size
+
+
+class ParsedModelCache:
+    """Size bounded LRU cache of parsed objects, returning a copy of the cached object to every caller."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        # key to the cached object and its estimated size, the most recently used last
+        self._entries: 'collections.OrderedDict[Hashable, Any]' = collections.OrderedDict()
+        self._size = 0
+        self._max_size = const.PARSED_MODEL_CACHE_MAX_SIZE
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, load: Callable[[], Any], max_size: Optional[int] = None) -> Any:
+        """Return a copy of the cached object, loading and caching it if not cached.
+
+        Args:
+            key: The key of the object.
+            load: Return the object, e.g. by parsing it, if it is not cached.
+            max_size: The maximum size in bytes of the cache to evict down to, if changed.
+
+        Returns:
+            A copy of the object, which the caller may modify.
+        """
+        with self._lock:
+            if max_size is not None:
+                self._max_size = max_size
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+        if entry is not None:
+            return copy_value(entry[0])
+        obj = load()
+        size = deep_size(obj)
+        with self._lock:
+            if size > self._max_size or key in self._entries:
+                return obj
+            self._entries[key] = (obj, size)
+            self._size += size
+            while self._size > self._max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+        # the object loaded is kept by the cache, so the caller gets a copy
+        return copy_value(obj)
+
+    def info(self) -> Dict[str, int]:
+        """Return the hits, misses and evictions, the number of entries, their estimated size and the maximum size."""
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'size': self._size,
+                'max_size': self._max_size
+            }
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+parsed_models = ParsedModelCache()
+
+
+def parsed_model_cache_info() -> Dict[str, int]:
+    """Return the statistics and the estimated memory held by the cache of parsed remote objects of this process."""
+    return parsed_models.info()
+
+
+def clear_parsed_model_cache() -> None:
+    """Clear the cache of parsed remote objects of this process."""
+    parsed_models.clear()
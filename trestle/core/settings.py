@@ -0,0 +1,135 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Trestle runtime settings.
+
+Settings are read from an environment variable first and then from the .trestle/config.ini of the trestle project.
+This module is deliberately free of dependencies on the rest of trestle so it can be used by the core models.
+"""
+
+import collections
+import configparser
+import functools
+import logging
+import os
+import pathlib
+import threading
+from typing import Optional
+
+from trestle.core import const
+
+logger = logging.getLogger(__name__)
+
+_TRUE_VALUES = ['1', 'true', 'yes', 'on']
+
+# Memoized map of directory to the root of the trestle project containing it, the least recently used first.
+# Directories outside of any project are not memoized, since a project may be initialized there later on.
+_roots: 'collections.OrderedDict[pathlib.Path, pathlib.Path]' = collections.OrderedDict()
+_roots_lock = threading.Lock()
+
+
+def _memoized_root(directory: pathlib.Path) -> Optional[pathlib.Path]:
+    with _roots_lock:
+        root = _roots.get(directory)
+        if root is not None:
+            _roots.move_to_end(directory)
+        return root
+
+
+def find_trestle_root(path: pathlib.Path) -> Optional[pathlib.Path]:
+    """Find the trestle project root containing the path without resolving symlinks.
+
+    Unlike fs.get_trestle_project_root, the result is memoized per directory since it is called for every file read.
+    """
+    if not path.is_absolute():
+        path = pathlib.Path.cwd() / path
+    directory = pathlib.Path(os.path.normpath(path.parent))
+    visited = []
+    root: Optional[pathlib.Path] = None
+    current = directory
+    while len(current.parts) > 1:
+        root = _memoized_root(current)
+        if root is not None:
+            break
+        visited.append(current)
+        if (current / const.TRESTLE_CONFIG_DIR).is_dir():
+            root = current
+            break
+        current = current.parent
+    if root is not None and visited:
+        with _roots_lock:
+            for visited_dir in visited:
+                _roots[visited_dir] = root
+            while len(_roots) > const.TRESTLE_ROOT_CACHE_SIZE:
+                _roots.popitem(last=False)
+    return root
+
+
+@functools.lru_cache(maxsize=32)
+def _read_config(config_path: pathlib.Path, mtime_ns: int) -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    try:
+        config.read(config_path, encoding=const.FILE_ENCODING)
+    except configparser.Error as e:
+        logger.warning(f'Unable to read trestle config {config_path}: {e}')
+    return config
+
+
+def get_setting(
+    trestle_root: Optional[pathlib.Path], section: str, option: str, env_var: str, default: str = ''
+) -> str:
+    """Get a setting from the environment or the trestle project config.ini.
+
+    Args:
+        trestle_root: The trestle project root, or None if there is no project.
+        section: Section of .trestle/config.ini holding the option.
+        option: Name of the option within the section.
+        env_var: Environment variable that overrides the config file.
+        default: Value returned if the setting is not found.
+
+    Returns:
+        The value of the setting as a string.
+    """
+    if env_var in os.environ:
+        return os.environ[env_var]
+    if trestle_root is None:
+        return default
+    config_path = trestle_root / const.TRESTLE_CONFIG_DIR / const.TRESTLE_CONFIG_FILE
+    try:
+        mtime_ns = config_path.stat().st_mtime_ns
+    except OSError:
+        return default
+    return _read_config(config_path, mtime_ns).get(section, option, fallback=default)
+
+
+def get_bool_setting(
+    trestle_root: Optional[pathlib.Path], section: str, option: str, env_var: str, default: bool = False
+) -> bool:
+    """Get a boolean setting from the environment or the trestle project config.ini."""
+    value = get_setting(trestle_root, section, option, env_var, str(default))
+    return value.strip().lower() in _TRUE_VALUES
+
+
+def get_int_setting(
+    trestle_root: Optional[pathlib.Path], section: str, option: str, env_var: str, default: int = 0
+) -> int:
+    """Get an integer setting from the environment or the trestle project config.ini."""
+    value = get_setting(trestle_root, section, option, env_var, str(default))
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f'Invalid integer value {value} for setting {section}.{option}, using {default}')
+        return default
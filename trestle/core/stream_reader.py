@@ -0,0 +1,460 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Streaming reader of large OSCAL documents.
+
+The reader parses a JSON document incrementally and yields the items of its large collections one at a time, e.g. the
+observations and findings of each result of assessment results, so that the memory used is bounded by the size of a
+single item rather than the size of the whole document. The other top level members of the document, e.g. the
+metadata, are available before the items are read.
+
+The streamed collections are given as element paths ending with a wildcard, e.g.
+assessment-results.results.*.observations.*, where every other element of the path is a list of OSCAL objects. An item
+whose own collections are also streamed is yielded after their items, without those collections.
+"""
+
+import json
+import logging
+import pathlib
+import re
+from typing import Any, Dict, Generator, Iterator, List, Optional, TextIO, Type
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST
+from pydantic.utils import lenient_issubclass
+
+import trestle.core.const as const
+from trestle.core import yaml_backend
+from trestle.core.err import TrestleError
+from trestle.core.models.file_content_type import FileContentType
+from trestle.core.utils import classname_to_alias
+
+logger = logging.getLogger(__name__)
+
+# The collections streamed when none are given, by the alias of the top level model.
+# POA&M documents of this OSCAL version have no findings or results.
+DEFAULT_STREAM_PATHS: Dict[str, List[str]] = {
+    'assessment-results': [
+        'assessment-results.results.*.observations.*',
+        'assessment-results.results.*.findings.*',
+        'assessment-results.results.*'
+    ],
+    'plan-of-action-and-milestones': [
+        'plan-of-action-and-milestones.observations.*',
+        'plan-of-action-and-milestones.risks.*',
+        'plan-of-action-and-milestones.poam-items.*'
+    ]
+}
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_DECODER = json.JSONDecoder()
+_NON_WHITESPACE = re.compile(r'\S')
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+_END = object()
+
+
+class _JsonTokenizer:
+    """Incremental reader of the values of a JSON document, holding one chunk of the file and the current value."""
+
+    def __init__(self, file: TextIO, chunk_size: int) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self, size: int = 0) -> bool:
+        if self._eof:
+            return False
+        # drop the content already read, the current position is always at the start of an incomplete token
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        data = self._file.read(max(size, self._chunk_size))
+        if not data:
+            self._eof = True
+            return False
+        self._buffer += data
+        return True
+
+    def at_end(self) -> bool:
+        """Skip whitespace and return whether the end of the content was reached."""
+        while True:
+            match = _NON_WHITESPACE.search(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return False
+            self._pos = len(self._buffer)
+            if not self._read_more():
+                return True
+
+    def peek(self) -> str:
+        """Return the next non whitespace character without consuming it."""
+        if self.at_end():
+            raise TrestleError('Unexpected end of JSON content')
+        return self._buffer[self._pos]
+
+    def expect(self, chars: str) -> str:
+        """Consume the next non whitespace character, which must be one of chars."""
+        char = self.peek()
+        if char not in chars:
+            raise TrestleError(f'Invalid JSON content, expected one of {chars} but found {char}')
+        self._pos += 1
+        return char
+
+    def read_value(self) -> Any:
+        """Decode the next value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # the value may continue past the buffer, read as much again so large values are decoded in few tries
+                if not self._read_more(len(self._buffer)):
+                    raise TrestleError(f'Invalid JSON content: {e}')
+                continue
+            # a number at the end of the buffer may continue in the next chunk, e.g. after its decimal point
+            if _NUMBER_TAIL.fullmatch(self._buffer, end) and self._read_more():
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """Consume the next value without decoding it."""
+        if self.peek() not in '[{':
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._read_more():
+                    raise TrestleError('Unexpected end of JSON content')
+                continue
+            self._pos = match.end()
+            char = match.group()
+            if char == '"':
+                string_end = _STRING_END.match(self._buffer, self._pos)
+                while string_end is None:
+                    if not self._read_more():
+                        raise TrestleError('Unexpected end of JSON content')
+                    string_end = _STRING_END.match(self._buffer, self._pos)
+                self._pos = string_end.end()
+            elif char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def members(self) -> Iterator[str]:
+        """Iterate over the keys of the next object, the value of each key must be consumed before the next key."""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise TrestleError(f'Invalid JSON content, expected an object key but found {key}')
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+    def items(self) -> Iterator[None]:
+        """Iterate over the items of the next array, each item must be consumed before the next one."""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self.expect(',]') == ']':
+                return
+
+
+def check_json(path: pathlib.Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Check that a file holds a single well-formed JSON value.
+
+    The file is read in chunks and only its strings and numbers are decoded, so the memory used is bounded by the size
+    of the largest of them rather than the size of the file.
+
+    Args:
+        path: The path of the file to check.
+        chunk_size: The number of characters read at a time.
+    Raises:
+        TrestleError: If the content is not well-formed JSON.
+    """
+    try:
+        with open(path, 'r', encoding=const.FILE_ENCODING) as f:
+            tokenizer = _JsonTokenizer(f, chunk_size)
+            # the objects and arrays being read, each positioned on the value of its next member or item when advanced
+            pending: List[Iterator[Any]] = []
+            while True:
+                char = tokenizer.peek()
+                if char == '{':
+                    pending.append(tokenizer.members())
+                elif char == '[':
+                    pending.append(tokenizer.items())
+                else:
+                    tokenizer.read_value()
+                while pending and next(pending[-1], _END) is _END:
+                    pending.pop()
+                if not pending:
+                    break
+            if not tokenizer.at_end():
+                raise TrestleError(f'Invalid JSON content, extra data after the value in {path}')
+    except UnicodeDecodeError as e:
+        raise TrestleError(f'Invalid JSON content, not {const.FILE_ENCODING} text in {path}: {e}')
+
+
+class _StreamNode:
+    """A model of which some list fields are streamed, and whether the model itself is yielded."""
+
+    def __init__(self, model_type: Type[BaseModel]) -> None:
+        self.model_type = model_type
+        self.members: Dict[str, _StreamNode] = {}
+        self.yielded = False
+        self._stripped_type: Optional[Type[BaseModel]] = None
+
+    def add_path(self, path: str, keys: List[str]) -> None:
+        node = self
+        for key in keys:
+            child = node.members.get(key)
+            if child is None:
+                field = node.model_type.alias_to_field_map().get(key)
+                if field is None or field.shape != SHAPE_LIST or not lenient_issubclass(field.type_, BaseModel):
+                    raise TrestleError(f'Element path {path} does not name a list of OSCAL objects at {key}')
+                child = _StreamNode(field.type_)
+                node.members[key] = child
+            node = child
+        node.yielded = True
+
+    def parse(self, obj: Dict[str, Any]) -> BaseModel:
+        """Parse an item, without its streamed collections."""
+        model_type = self.model_type
+        if self.members:
+            if self._stripped_type is None:
+                self._stripped_type = model_type.create_stripped_model_type(stripped_fields_aliases=list(self.members))
+            model_type = self._stripped_type
+        try:
+            return model_type.parse_obj(obj)
+        except Exception as e:
+            raise TrestleError(f'Error parsing {classname_to_alias(self.model_type.__name__, "json")}: {e}')
+
+
+class OscalStreamReader:
+    """
+    Reader of the items of the large collections of an OSCAL document, one item at a time.
+
+    Use as a context manager, e.g.:
+
+        with AssessmentResults.oscal_stream(path) as reader:
+            metadata = reader.metadata
+            for item in reader:
+                ...
+
+    Only JSON documents are read incrementally, YAML documents are decoded at once before their items are yielded.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        model_type: Type[BaseModel],
+        element_paths: Optional[List[str]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        """
+        Open the document and read its top level members up to the metadata.
+
+        Args:
+            path: Path of the OSCAL document.
+            model_type: The top level model class of the document, e.g. AssessmentResults.
+            element_paths: The element paths of the collections to stream, see DEFAULT_STREAM_PATHS for the default.
+            chunk_size: The number of characters read from the file at once.
+
+        Raises:
+            TrestleError: If the element paths are not valid for the model or the document cannot be read.
+        """
+        self._path = path
+        self._model_type = model_type
+        self._chunk_size = chunk_size
+        self._alias = classname_to_alias(model_type.__name__, 'json')
+        if element_paths is None:
+            element_paths = DEFAULT_STREAM_PATHS.get(self._alias)
+            if element_paths is None:
+                raise TrestleError(f'No default element paths to stream for {self._alias}')
+        self._root = _StreamNode(model_type)
+        for element_path in element_paths:
+            parts = element_path.split(const.ALIAS_PATH_SEPARATOR)
+            keys = parts[1::2]
+            if (parts[0] != self._alias or len(parts) < 3 or len(parts) % 2 == 0
+                    or any(part != '*' for part in parts[2::2]) or '*' in keys):
+                raise TrestleError(f'Invalid element path {element_path} to stream for {self._alias}')
+            self._root.add_path(element_path, keys)
+
+        self._header: Dict[str, Any] = {}
+        self._metadata: Optional[BaseModel] = None
+        self._file: Optional[TextIO] = None
+        self._json: Optional[_JsonTokenizer] = None
+        self._root_members: Optional[Iterator[str]] = None
+        self._pending_key: Optional[str] = None
+        self._restart = False
+        self._started = False
+        self._data: Optional[Dict[str, Any]] = None
+
+        content_type = FileContentType.to_content_type(path.suffix)
+        if content_type == FileContentType.JSON:
+            try:
+                self._open()
+                self._read_header()
+            except TrestleError:
+                self.close()
+                raise
+        else:
+            try:
+                with path.open('r', encoding=const.FILE_ENCODING) as yaml_file:
+                    self._data = self._unwrap(yaml_backend.load(yaml_file))
+            except TrestleError:
+                raise
+            except Exception as e:
+                raise TrestleError(f'Error loading file {path} {e}')
+            self._header = {key: value for key, value in self._data.items() if key not in self._root.members}
+
+    def __enter__(self) -> 'OscalStreamReader':
+        """Return the reader."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the document."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the document."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def header(self) -> Dict[str, Any]:
+        """Return the decoded top level members read so far, other than the streamed collections.
+
+        All the members are available once the items have been read.
+        """
+        return self._header
+
+    @property
+    def metadata(self) -> Optional[BaseModel]:
+        """Return the metadata of the document, if any."""
+        if self._metadata is None and 'metadata' in self._header:
+            field = self._model_type.alias_to_field_map()['metadata']
+            try:
+                self._metadata = field.type_.parse_obj(self._header['metadata'])
+            except Exception as e:
+                raise TrestleError(f'Error parsing metadata of {self._path} {e}')
+        return self._metadata
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        """Yield the items of the streamed collections, in document order."""
+        if self._started:
+            raise TrestleError(f'The items of {self._path} can only be read once')
+        self._started = True
+        if self._data is not None:
+            yield from self._walk_object(self._root, self._data)
+            return
+        if self._restart:
+            # a streamed collection preceded the metadata and was skipped, so read the document again
+            self.close()
+            self._open()
+            self._pending_key = None
+        if self._pending_key is not None:
+            yield from self._stream_items(self._root.members[self._pending_key])
+        for key in self._root_members:
+            member = self._root.members.get(key)
+            if member is not None:
+                yield from self._stream_items(member)
+            elif key in self._header:
+                self._json.skip_value()
+            else:
+                self._header[key] = self._json.read_value()
+        self.close()
+
+    def _unwrap(self, obj: Any) -> Dict[str, Any]:
+        if not isinstance(obj, dict) or not isinstance(obj.get(self._alias), dict):
+            raise TrestleError(f'File {self._path} does not hold an OSCAL {self._alias} object')
+        return obj[self._alias]
+
+    def _open(self) -> None:
+        try:
+            self._file = self._path.open('r', encoding=const.FILE_ENCODING)
+        except OSError as e:
+            raise TrestleError(f'Error loading file {self._path} {e}')
+        self._json = _JsonTokenizer(self._file, self._chunk_size)
+        for key in self._json.members():
+            if key == self._alias:
+                self._root_members = self._json.members()
+                return
+            self._json.skip_value()
+        raise TrestleError(f'File {self._path} does not hold an OSCAL {self._alias} object')
+
+    def _read_header(self) -> None:
+        for key in self._root_members:
+            if key in self._root.members:
+                if 'metadata' in self._header:
+                    self._pending_key = key
+                    return
+                self._restart = True
+                self._json.skip_value()
+            else:
+                self._header[key] = self._json.read_value()
+
+    def _stream_items(self, node: _StreamNode) -> Iterator[BaseModel]:
+        for _ in self._json.items():
+            if node.members:
+                values = yield from self._stream_object(node)
+                if node.yielded:
+                    yield node.parse(values)
+            else:
+                yield node.parse(self._json.read_value())
+
+    def _stream_object(self, node: _StreamNode) -> Generator[BaseModel, None, Dict[str, Any]]:
+        values: Dict[str, Any] = {}
+        for key in self._json.members():
+            member = node.members.get(key)
+            if member is not None:
+                yield from self._stream_items(member)
+            elif node.yielded:
+                values[key] = self._json.read_value()
+            else:
+                self._json.skip_value()
+        return values
+
+    def _walk_object(self, node: _StreamNode, obj: Dict[str, Any]) -> Iterator[BaseModel]:
+        for key, value in obj.items():
+            member = node.members.get(key)
+            if member is None or not isinstance(value, list):
+                continue
+            for item in value:
+                yield from self._walk_object(member, item)
+                if member.yielded:
+                    item_values = item
+                    if member.members:
+                        item_values = {name: item[name] for name in item if name not in member.members}
+                    yield member.parse(item_values)
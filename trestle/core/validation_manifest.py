@@ -0,0 +1,206 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Manifest of the outcome of the validation of the models of a trestle project.
+
+The manifest in .trestle records, for each model, the sha256 digest of every file of the model directory, i.e. all
+the fragments of a decomposed model, and for each validation mode the last outcome of validating the model. The
+fingerprint of a model combines the paths and digests of its fragments, so a model is only validated again when a
+fragment has been edited, added or removed. The whole manifest is discarded when the version of trestle changes, since
+the validators themselves may have changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from trestle import __version__
+from trestle.core import const
+from trestle.core import settings
+from trestle.core.content_stamps import RACY_STAMP_WINDOW_NS
+from trestle.core.model_cache import content_digest
+from trestle.utils import fs
+
+logger = logging.getLogger(__name__)
+
+_MANIFEST_VERSION = 1
+
+
+class ValidationManifest:
+    """Manifest of the fragments and last validation outcome of each model of a trestle project."""
+
+    def __init__(self, trestle_root: pathlib.Path) -> None:
+        """Load the manifest of a trestle project, starting afresh if it is missing, unreadable or out of date.
+
+        Args:
+            trestle_root: Path of the trestle project, i.e., within which .trestle is to be found.
+        """
+        self._trestle_root = trestle_root
+        self._manifest_path = trestle_root / const.TRESTLE_CONFIG_DIR / const.VALIDATION_MANIFEST_FILE
+        self._models: Dict[str, Dict[str, Any]] = self._load()
+        self._changed = False
+
+    @staticmethod
+    def is_enabled(trestle_root: pathlib.Path) -> bool:
+        """Check whether the validation manifest is enabled for the trestle project.
+
+        The manifest is enabled unless turned off by the validation_manifest option of the [cache] section of
+        .trestle/config.ini, or the TRESTLE_VALIDATION_MANIFEST environment variable.
+        """
+        return settings.get_bool_setting(
+            trestle_root, const.CACHE_SECTION, 'validation_manifest', const.ENV_VALIDATION_MANIFEST, True
+        )
+
+    @property
+    def manifest_path(self) -> pathlib.Path:
+        """Return the path of the manifest file."""
+        return self._manifest_path
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            manifest = json.loads(self._manifest_path.read_text(encoding=const.FILE_ENCODING))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.debug(f'Ignoring unreadable validation manifest {self._manifest_path}: {e}')
+            return {}
+        if not isinstance(manifest, dict) or manifest.get('version') != _MANIFEST_VERSION:
+            return {}
+        if manifest.get('trestle-version') != __version__ or not isinstance(manifest.get('models'), dict):
+            return {}
+        return manifest['models']
+
+    def _model_key(self, model_dir: pathlib.Path) -> str:
+        return model_dir.relative_to(self._trestle_root).as_posix()
+
+    def fingerprint(self, model_dir: pathlib.Path) -> Optional[str]:
+        """Return the digest of the paths and contents of all the files of a model directory.
+
+        The digest of a file is only computed again if its size or modification time differs from the one recorded,
+        or if it was recorded too soon after the file was modified to rule out an undetected rewrite.
+
+        Args:
+            model_dir: Path of the model directory, e.g. catalogs/mycatalog in the trestle project.
+
+        Returns:
+            The fingerprint of the model, or None if the model directory holds no files or cannot be read.
+        """
+        key = self._model_key(model_dir)
+        entry = self._models.get(key, {})
+        known = entry.get('fragments', {}) if entry.get('recorded-ns') is not None else {}
+        recorded_ns = time.time_ns()
+        fragments: Dict[str, Dict[str, Any]] = {}
+        rehashed = False
+        try:
+            for dir_path, dir_names, file_names in os.walk(model_dir):
+                dir_names[:] = [name for name in dir_names if not fs.should_ignore(name)]
+                for file_name in file_names:
+                    if fs.should_ignore(file_name):
+                        continue
+                    path = pathlib.Path(dir_path, file_name)
+                    rel_path = path.relative_to(model_dir).as_posix()
+                    file_stat = path.stat()
+                    fragment = known.get(rel_path)
+                    if not (fragment and fragment.get('size') == file_stat.st_size
+                            and fragment.get('mtime-ns') == file_stat.st_mtime_ns
+                            and entry['recorded-ns'] - file_stat.st_mtime_ns >= RACY_STAMP_WINDOW_NS):
+                        fragment = {
+                            'size': file_stat.st_size,
+                            'mtime-ns': file_stat.st_mtime_ns,
+                            'digest': content_digest(path.read_bytes())
+                        }
+                        rehashed = True
+                    fragments[rel_path] = fragment
+        except OSError as e:
+            logger.debug(f'Unable to fingerprint model {model_dir}: {e}')
+            return None
+        if not fragments:
+            return None
+
+        model_hash = hashlib.sha256()
+        for rel_path in sorted(fragments):
+            model_hash.update(f'{rel_path}\0{fragments[rel_path]["digest"]}\n'.encode(const.FILE_ENCODING))
+        fingerprint = model_hash.hexdigest()
+        if rehashed or fragments != entry.get('fragments'):
+            # outcomes of an earlier fingerprint no longer apply
+            results = entry.get('results', {}) if fingerprint == entry.get('fingerprint') else {}
+            self._models[key] = {
+                'fingerprint': fingerprint, 'recorded-ns': recorded_ns, 'fragments': fragments, 'results': results
+            }
+            self._changed = True
+        return fingerprint
+
+    def lookup(self, model_dir: pathlib.Path, mode: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the last outcome of validating the model in the mode, if its fingerprint has not changed since.
+
+        Args:
+            model_dir: Path of the model directory.
+            mode: The validation mode, e.g. all.
+            fingerprint: The current fingerprint of the model.
+
+        Returns:
+            The recorded outcome, holding the name of the validator the model failed as failed-validator, or None.
+        """
+        entry = self._models.get(self._model_key(model_dir))
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            return None
+        return entry.get('results', {}).get(mode)
+
+    def record(self, model_dir: pathlib.Path, mode: str, fingerprint: str, failed_validator: Optional[str]) -> None:
+        """Record the outcome of validating a model in the mode, for the fingerprint the model was validated with."""
+        entry = self._models.get(self._model_key(model_dir))
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            return
+        entry.setdefault('results', {})[mode] = {'failed-validator': failed_validator}
+        self._changed = True
+
+    def save(self) -> None:
+        """Write the manifest if it has changed, dropping the models which no longer exist."""
+        for key in [key for key in self._models if not (self._trestle_root / key).is_dir()]:
+            del self._models[key]
+            self._changed = True
+        if not self._changed:
+            return
+        manifest = {'version': _MANIFEST_VERSION, 'trestle-version': __version__, 'models': self._models}
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=self._manifest_path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding=const.FILE_ENCODING) as tmp_file:
+                json.dump(manifest, tmp_file)
+            os.replace(tmp_name, self._manifest_path)
+        except OSError as e:
+            logger.warning(f'Unable to write validation manifest {self._manifest_path}: {e}')
+            return
+        self._changed = False
+
+    def count(self) -> int:
+        """Return the number of models recorded."""
+        return len(self._models)
+
+    def clear(self) -> int:
+        """Remove the manifest and return the number of models it recorded."""
+        removed = len(self._models)
+        self._models = {}
+        self._changed = False
+        try:
+            self._manifest_path.unlink()
+        except FileNotFoundError:
+            pass
+        return removed
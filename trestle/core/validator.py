@@ -15,13 +15,21 @@
 """Base class for all validators."""
 
 import argparse
+import functools
+import json
 import logging
 import pathlib
+import time
 from abc import ABC, abstractmethod
-from typing import TypeVar
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple, Type, TypeVar
 
+from pydantic import BaseModel
+
+import trestle.core.const as const
 from trestle.core.base_model import OscalBaseModel
-from trestle.core.err import TrestleError
+from trestle.core.reachability import field_reaches
+from trestle.core.validation_manifest import ValidationManifest
 from trestle.utils import fs
 from trestle.utils.load_distributed import load_distributed
 
@@ -31,50 +39,343 @@ logger = logging.getLogger(__name__)
 TG = TypeVar('TG')
 
 
+class ModelValidationResult:
+    """Outcome of the validation of one model of a trestle project."""
+
+    def __init__(
+        self,
+        model_type: str,
+        model_name: str,
+        failed_validator: Optional[str] = None,
+        error: Optional[str] = None,
+        seconds: float = 0.0,
+        cached: bool = False
+    ) -> None:
+        """Initialize the outcome.
+
+        Args:
+            model_type: The type of the model, e.g. catalog.
+            model_name: The name of the model within the trestle project.
+            failed_validator: The name of the validator the model failed, if any.
+            error: The error preventing the model from being validated, if any.
+            seconds: The time taken to load and validate the model.
+            cached: Whether the outcome is the recorded one of the model, which is unchanged since last validated.
+        """
+        self.model_type = model_type
+        self.model_name = model_name
+        self.failed_validator = failed_validator
+        self.error = error
+        self.seconds = seconds
+        self.cached = cached
+
+    @property
+    def passed(self) -> bool:
+        """Return whether the model is valid."""
+        return self.failed_validator is None and self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the outcome as a json serializable dict."""
+        return {
+            'model-type': self.model_type,
+            'model-name': self.model_name,
+            'passed': self.passed,
+            'failed-validator': self.failed_validator,
+            'error': self.error,
+            'seconds': round(self.seconds, 3),
+            'cached': self.cached
+        }
+
+
 class Validator(ABC):
     """Validator base class."""
 
+    # Whether the validator is run in the all mode, which validators reporting possibly intended content opt out of
+    run_in_all_mode: bool = True
+
     @abstractmethod
     def model_is_valid(self, model: OscalBaseModel) -> bool:
         """Validate the model."""
 
+    def find_failure(self, model: OscalBaseModel) -> Optional[str]:
+        """Return the name of the validator the model fails, or None if the model is valid."""
+        return None if self.model_is_valid(model) else self.__class__.__name__
+
     def validate(self, args: argparse.Namespace) -> int:
         """Perform the validation according to user options."""
         trestle_root = fs.get_trestle_project_root(pathlib.Path.cwd())
+        parallel = 'parallel' in args and args.parallel
 
         # validate by type - all of type or just specified by name
         if 'type' in args and args.type is not None:
-            models = []
             if 'name' in args and args.name is not None:
-                models = [args.name]
+                models = [(args.type, args.name)]
             else:
-                models = fs.get_models_of_type(args.type)
-            models_path = trestle_root / fs.model_type_to_model_dir(args.type)
-            for m in models:
-                model_path = models_path / m
-                try:
-                    _, _, model = load_distributed(model_path)
-                except TrestleError as e:
-                    logger.warning(f'File load error {e}')
-                    return 1
-                if not self.model_is_valid(model):
-                    return 1
-            return 0
+                models = [(args.type, name) for name in fs.get_models_of_type(args.type)]
+            return self._validate_models(trestle_root, models, args)
 
         # validate all
         if 'all' in args and args.all:
-            model_tups = fs.get_all_models()
-            for mt in model_tups:
-                model_path = trestle_root / fs.model_type_to_model_dir(mt[0]) / mt[1]
-                _, _, model = load_distributed(model_path)
-                if not self.model_is_valid(model):
-                    return 1
-            return 0
+            return self._validate_models(trestle_root, fs.get_all_models(), args)
 
         # validate file
         if 'file' in args and args.file:
             file_path = trestle_root / args.file
-            _, _, model = load_distributed(file_path)
+            _, _, model = load_distributed(file_path, parallel=parallel)
             if not self.model_is_valid(model):
                 return 1
         return 0
+
+    def _validate_models(
+        self, trestle_root: pathlib.Path, models: List[Tuple[str, str]], args: argparse.Namespace
+    ) -> int:
+        """Validate every model, report the outcome of each and return 1 if any model is not valid."""
+        parallel = 'parallel' in args and args.parallel
+        jobs = args.jobs if 'jobs' in args and args.jobs is not None else 1
+        mode = args.mode if 'mode' in args and args.mode is not None else self.__class__.__name__
+        manifest = ValidationManifest(trestle_root) if ValidationManifest.is_enabled(trestle_root) else None
+        force = 'force' in args and args.force
+        start = time.perf_counter()
+        if manifest is None:
+            results = self.validate_models(trestle_root, models, jobs if jobs > 0 else None, parallel)
+        else:
+            results = self._validate_changed_models(
+                trestle_root, models, manifest, mode, force, jobs if jobs > 0 else None, parallel
+            )
+        elapsed = time.perf_counter() - start
+
+        for result in results:
+            timing = 'unchanged' if result.cached else f'{result.seconds:.2f}s'
+            if result.passed:
+                logger.info(f'PASS {result.model_type} {result.model_name} ({timing})')
+            else:
+                reason = result.error if result.error is not None else f'failed {result.failed_validator}'
+                logger.warning(f'FAIL {result.model_type} {result.model_name}: {reason} ({timing})')
+        n_failed = len([result for result in results if not result.passed])
+        logger.info(f'Validated {len(results)} models in {elapsed:.2f}s: {n_failed} failed.')
+
+        if 'report' in args and args.report is not None:
+            report = {
+                'passed': n_failed == 0,
+                'models': len(results),
+                'failed': n_failed,
+                'seconds': round(elapsed, 3),
+                'results': [result.to_dict() for result in results]
+            }
+            pathlib.Path(args.report).write_text(json.dumps(report, indent=2), encoding=const.FILE_ENCODING)
+        return 1 if n_failed else 0
+
+    def _validate_changed_models(
+        self,
+        trestle_root: pathlib.Path,
+        models: List[Tuple[str, str]],
+        manifest: ValidationManifest,
+        mode: str,
+        force: bool,
+        jobs: Optional[int],
+        parallel: bool
+    ) -> List[ModelValidationResult]:
+        """Validate the models changed since last validated in the mode, or all if forced, and update the manifest."""
+        model_dirs = [trestle_root / fs.model_type_to_model_dir(model_type) / name for model_type, name in models]
+        fingerprints = [manifest.fingerprint(model_dir) for model_dir in model_dirs]
+        results: List[Optional[ModelValidationResult]] = [None] * len(models)
+        if not force:
+            for i, (model_type, name) in enumerate(models):
+                outcome = manifest.lookup(model_dirs[i], mode, fingerprints[i]) if fingerprints[i] else None
+                if outcome is not None:
+                    results[i] = ModelValidationResult(model_type, name, outcome['failed-validator'], cached=True)
+
+        changed = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(changed, self.validate_models(trestle_root, [models[i] for i in changed], jobs, parallel)):
+            results[i] = result
+            # errors loading a model are not recorded since they may not be due to its content
+            if fingerprints[i] and result.error is None:
+                manifest.record(model_dirs[i], mode, fingerprints[i], result.failed_validator)
+        manifest.save()
+        return results
+
+    def validate_models(
+        self,
+        trestle_root: pathlib.Path,
+        models: List[Tuple[str, str]],
+        jobs: Optional[int] = 1,
+        parallel: bool = False
+    ) -> List[ModelValidationResult]:
+        """
+        Load and validate several models of a trestle project, none of which stops the validation of the others.
+
+        Args:
+            trestle_root: The root directory of the trestle project.
+            models: The models to validate, as (model type, model name) tuples.
+            jobs: The number of processes validating models concurrently, or None for the number of processors.
+            parallel: Whether the fragments of each decomposed model are read concurrently.
+
+        Returns:
+            The outcome of the validation of each model, in the order of the models.
+        """
+        model_paths = [
+            (model_type, name, trestle_root / fs.model_type_to_model_dir(model_type) / name) for model_type,
+            name in models
+        ]
+        if jobs == 1 or len(model_paths) <= 1:
+            return [_validate_model(self, *model_path, parallel) for model_path in model_paths]
+        # models are validated in separate processes, the validator itself is sent to each process
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(_validate_model, self, *model_path, parallel) for model_path in model_paths]
+            return [future.result() for future in futures]
+
+
+def _validate_model(
+    validator: Validator, model_type: str, model_name: str, model_path: pathlib.Path, parallel: bool
+) -> ModelValidationResult:
+    start = time.perf_counter()
+    try:
+        _, _, model = load_distributed(model_path, parallel=parallel)
+    except Exception as e:
+        return ModelValidationResult(
+            model_type, model_name, error=f'File load error {e}', seconds=time.perf_counter() - start
+        )
+    try:
+        failed_validator = validator.find_failure(model)
+    except Exception as e:
+        return ModelValidationResult(
+            model_type, model_name, error=f'Validator error {e}', seconds=time.perf_counter() - start
+        )
+    return ModelValidationResult(model_type, model_name, failed_validator, seconds=time.perf_counter() - start)
+
+
+class ModelVisitor(ABC):
+    """Check of one model by a visiting validator, fed the nodes of interest during a traversal of the model."""
+
+    @abstractmethod
+    def visit(self, name: str, value: Any, path: List[str]) -> bool:
+        """Check a visited node of the model.
+
+        Args:
+            name: The name of the field holding the value, which for items of lists and dicts visited by type is the
+                name of the field holding the collection.
+            value: The value of the node, which is never None.
+            path: The field names leading from the model to the node, which is only valid during the call.
+
+        Returns:
+            False if the model is known to be invalid, which ends the traversal, True otherwise.
+        """
+
+    def is_valid(self) -> bool:
+        """Return whether the model is valid, once all the nodes of interest have been visited."""
+        return True
+
+
+class VisitingValidator(Validator):
+    """
+    Validator checking only the nodes of a model with given field names or value types.
+
+    Visiting validators do not traverse the model themselves: a single traversal of the model feeds the nodes of
+    interest to all the visiting validators being run, see visit_model(), so adding a validator does not add a walk
+    of the model.
+    """
+
+    # The field names of the nodes to visit, whatever their value
+    visit_names: FrozenSet[str] = frozenset()
+    # The types of the nodes to visit, whatever the field holding them, including the items of lists and dicts
+    visit_types: Tuple[Type[Any], ...] = ()
+
+    @abstractmethod
+    def create_visitor(self, model: OscalBaseModel) -> ModelVisitor:
+        """Return a new visitor to check the model."""
+
+    def model_is_valid(self, model: OscalBaseModel) -> bool:
+        """Test if the model is valid."""
+        return visit_model(model, [self])
+
+
+def visit_model(model: OscalBaseModel, validators: Sequence[VisitingValidator]) -> bool:
+    """
+    Check a model against several visiting validators with a single traversal of the model.
+
+    Args:
+        model: The model to validate.
+        validators: The visiting validators to run.
+
+    Returns:
+        True if the model is valid for all the validators, False otherwise.
+    """
+    return find_visit_failure(model, validators) is None
+
+
+def find_visit_failure(model: OscalBaseModel, validators: Sequence[VisitingValidator]) -> Optional[VisitingValidator]:
+    """Return the first of the visiting validators the model fails, found with a single traversal, if any."""
+    visitors: List[ModelVisitor] = []
+    name_visitors: Dict[str, List[ModelVisitor]] = {}
+    type_visitors: List[Tuple[Tuple[Type[Any], ...], ModelVisitor]] = []
+    for validator in validators:
+        visitor = validator.create_visitor(model)
+        visitors.append(visitor)
+        for name in validator.visit_names:
+            name_visitors.setdefault(name, []).append(visitor)
+        if validator.visit_types:
+            type_visitors.append((validator.visit_types, visitor))
+    walker = _ModelWalker(name_visitors, type_visitors)
+    if not walker.walk(model, ''):
+        return validators[visitors.index(walker.failed_visitor)]
+    for validator, visitor in zip(validators, visitors):
+        if not visitor.is_valid():
+            return validator
+    return None
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def _field_plan(model_type: Type[BaseModel], names: FrozenSet[str], types: Tuple[Type[Any],
+                                                                                 ...]) -> Tuple[Tuple[str, bool], ...]:
+    """Return the field names of a model class, with whether the values of each field may hold nodes to visit."""
+    plan = []
+    for field_name, reach in field_reaches(model_type).items():
+        may_hold_nodes = reach.may_contain_any_name(names) or any(reach.may_contain_type(type_) for type_ in types)
+        plan.append((field_name, may_hold_nodes))
+    return tuple(plan)
+
+
+class _ModelWalker:
+    """Single traversal of a model feeding the nodes of interest to the visitors."""
+
+    def __init__(
+        self,
+        name_visitors: Dict[str, List[ModelVisitor]],
+        type_visitors: List[Tuple[Tuple[Type[Any], ...], ModelVisitor]]
+    ) -> None:
+        self._name_visitors = name_visitors
+        self._type_visitors = type_visitors
+        self._names = frozenset(name_visitors)
+        self._types = tuple(type_ for types, _ in type_visitors for type_ in types)
+        self._path: List[str] = []
+        # the visitor which ended the traversal, if any
+        self.failed_visitor: Optional[ModelVisitor] = None
+
+    def walk(self, node: Any, name: str) -> bool:
+        for types, visitor in self._type_visitors:
+            if isinstance(node, types) and not visitor.visit(name, node, self._path):
+                self.failed_visitor = visitor
+                return False
+        if isinstance(node, BaseModel):
+            path = self._path
+            values = node.__dict__
+            for field_name, may_hold_nodes in _field_plan(type(node), self._names, self._types):
+                value = values.get(field_name)
+                if value is None:
+                    continue
+                path.append(field_name)
+                for visitor in self._name_visitors.get(field_name, ()):
+                    if not visitor.visit(field_name, value, path):
+                        self.failed_visitor = visitor
+                        return False
+                if may_hold_nodes and not self.walk(value, field_name):
+                    return False
+                path.pop()
+        elif isinstance(node, list):
+            for item in node:
+                if not self.walk(item, name):
+                    return False
+        elif isinstance(node, dict):
+            for item in node.values():
+                if not self.walk(item, name):
+                    return False
+        return True
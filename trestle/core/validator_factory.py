@@ -28,6 +28,7 @@ validator_factory: ObjectFactory = ObjectFactory()
 validator_factory.register_object(const.VAL_MODE_DUPLICATES, duplicates_validator.DuplicatesValidator())
 validator_factory.register_object(const.VAL_MODE_NCNAME, ncname_validator.NcNameValidator())
 validator_factory.register_object(const.VAL_MODE_REFS, refs_validator.RefsValidator())
+validator_factory.register_object(const.VAL_MODE_REFS_FULL, refs_validator.RefsFullValidator())
 validator_factory.register_object(const.VAL_MODE_ALL, all_validator.AllValidator())
 
 
@@ -41,8 +42,31 @@ def init_arguments(cmd: Command) -> None:
     cmd.add_argument(
         '-m',
         '--mode',
-        choices=[const.VAL_MODE_DUPLICATES, const.VAL_MODE_NCNAME, const.VAL_MODE_REFS, const.VAL_MODE_ALL],
+        choices=[
+            const.VAL_MODE_DUPLICATES,
+            const.VAL_MODE_NCNAME,
+            const.VAL_MODE_REFS,
+            const.VAL_MODE_REFS_FULL,
+            const.VAL_MODE_ALL
+        ],
         help='Mode of validation to use.',
         required=False,
         default='all'
     )
+    cmd.add_argument(f'--{const.ARG_PARALLEL}', help=const.ARG_DESC_PARALLEL, action='store_true')
+    cmd.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        help='Number of processes validating models concurrently with --type or --all, 0 for one per processor.',
+        required=False,
+        default=1
+    )
+    cmd.add_argument(
+        '--report', help='Path of a json file to write the outcome of each model validated with --type or --all.'
+    )
+    cmd.add_argument(
+        '--force',
+        help='Validate every model with --type or --all, even those unchanged since they were last validated.',
+        action='store_true'
+    )
@@ -14,262 +14,415 @@
 # limitations under the License.
 """Utilities for dealing with models."""
 
+import functools
 import logging
 import re
 import uuid
-from typing import Any, Dict, List, Tuple, Type, TypeVar
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Pattern, Set, Tuple, Type, TypeVar, Union
 
 import pydantic
 
+from trestle.core import const
+from trestle.core.reachability import Reach, field_reaches
+
 logger = logging.getLogger(__name__)
 
 # Generic type var
 TG = TypeVar('TG')
 
+# Namespace of the namespaces of deterministic uuids, which are seeded
+_SEED_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, const.WEBSITE_ROOT)
 
-# TODO: Improve typing - this could potentially be done through type vars
-def find_values_by_name_generic(object_of_interest: Any, var_name: str) -> List[str]:
-    """Traverse object and return list of the values in dicts, tuples associated with variable name."""
-    loe = []
-    # looking for a dict or 2-element tuple containing specified variable name
-    if type(object_of_interest) == dict:
+# A location within an object, as the keys and indices leading to it from the object
+Path = List[Union[str, int]]
+
+_DOTTED_KEY_REGEX = re.compile(r'^[A-Za-z_][\w-]*$')
+
+
+def json_path(path: Path) -> str:
+    """Return the JSON path of a location, e.g. $.catalog.groups[0].id."""
+    segments = ['$']
+    for key in path:
+        if isinstance(key, int):
+            segments.append(f'[{key}]')
+        elif _DOTTED_KEY_REGEX.match(key):
+            segments.append(f'.{key}')
+        else:
+            segments.append(f"['{key}']")
+    return ''.join(segments)
+
+
+def _model_items(model: pydantic.BaseModel) -> Iterator[Tuple[str, str, Any, Reach]]:
+    """Yield the name, alias, value and reach of each field of a model, the alias being empty for a custom root."""
+    fields = model.__fields__
+    reaches = field_reaches(type(model))
+    for name, value in model.__dict__.items():
+        yield name, '' if name == '__root__' else fields[name].alias, value, reaches[name]
+
+
+def _child_path(path: Optional[Path], key: Union[str, int]) -> Optional[Path]:
+    if path is None or key == '':
+        return path
+    return path + [key]
+
+
+def _iter_generic(object_of_interest: Any, var_name: str, path: Optional[Path]) -> Iterator[Tuple[Any, Optional[Path]]]:
+    # looking for a dict, model field or 2-element tuple containing specified variable name
+    if type(object_of_interest) is dict:
         for key, value in object_of_interest.items():
             if (key == var_name) and value:
-                # found one so append its value to list
-                loe.append(value)
+                yield value, _child_path(path, key)
             else:
-                new_list = find_values_by_name_generic(value, var_name)
-                if new_list:
-                    loe.extend(new_list)
-    elif type(object_of_interest) == tuple and len(object_of_interest) == 2 and object_of_interest[0] == var_name:
+                yield from _iter_generic(value, var_name, _child_path(path, key))
+    elif isinstance(object_of_interest, pydantic.BaseModel):
+        for name, alias, value, reach in _model_items(object_of_interest):
+            if name == var_name:
+                if value:
+                    yield value, _child_path(path, alias)
+            elif reach.may_contain_name(var_name):
+                yield from _iter_generic(value, var_name, _child_path(path, alias))
+    elif type(object_of_interest) is tuple and len(object_of_interest) == 2 and object_of_interest[0] == var_name:
         if object_of_interest[1]:
-            loe.append(object_of_interest[1])
-    elif type(object_of_interest) != str:
+            yield object_of_interest[1], _child_path(path, var_name)
+    elif type(object_of_interest) is not str:
         try:
             # iterate over any iterable and recurse on its items
             o_iter = iter(object_of_interest)
         except Exception:
             # it is not a dict and not iterable
-            pass
-        else:
-            next_item = next(o_iter, None)
-            while next_item is not None:
-                new_list = find_values_by_name_generic(next_item, var_name)
-                if new_list:
-                    loe.extend(new_list)
-                next_item = next(o_iter, None)
-            return loe
-    return loe
+            return
+        for index, item in enumerate(o_iter):
+            if item is not None:
+                yield from _iter_generic(item, var_name, _child_path(path, index))
+
+
+def iter_values_by_name_generic(object_of_interest: Any, var_name: str) -> Iterator[Any]:
+    """Traverse object and yield the values in dicts, model fields and tuples associated with variable name."""
+    for value, _ in _iter_generic(object_of_interest, var_name, None):
+        yield value
+
+
+def find_values_by_name_generic(object_of_interest: Any, var_name: str) -> List[Any]:
+    """Traverse object and return list of the values in dicts, tuples associated with variable name."""
+    return list(iter_values_by_name_generic(object_of_interest, var_name))
 
 
 def has_no_duplicate_values_generic(object_of_interest: Any, var_name: str) -> bool:
     """Determine if duplicate values of variable exist in object."""
-    loe = find_values_by_name_generic(object_of_interest, var_name)
-    return len(loe) == len(set(loe))
+    return not _has_duplicate(iter_values_by_name_generic(object_of_interest, var_name))
 
 
-def find_values_by_type(object_of_interest: Any, type_of_interest: Type[TG]) -> List[TG]:
-    """Traverse object and return list of values of specified type."""
-    loe = []
-    # looking for a dict or 2-element tuple containing specified variable name
-    if type(object_of_interest) == type_of_interest:
-        loe.append(object_of_interest)
-        return loe
-    if type(object_of_interest) == dict:
-        for value in object_of_interest.values():
-            new_list = find_values_by_type(value, type_of_interest)
-            if new_list:
-                loe.extend(new_list)
-    elif type(object_of_interest) != str:
+def find_duplicate_values_generic(object_of_interest: Any, var_name: str) -> List[Tuple[Any, List[str]]]:
+    """Find the values of variable occurring more than once in object, with the JSON path of each occurrence."""
+    return _find_duplicates(_iter_generic(object_of_interest, var_name, []))
+
+
+def _iter_by_type(object_of_interest: Any, type_of_interest: Type[TG],
+                  path: Optional[Path]) -> Iterator[Tuple[TG, Optional[Path]]]:
+    if type(object_of_interest) is type_of_interest:
+        yield object_of_interest, path
+    elif type(object_of_interest) is dict:
+        for key, value in object_of_interest.items():
+            yield from _iter_by_type(value, type_of_interest, _child_path(path, key))
+    elif isinstance(object_of_interest, pydantic.BaseModel):
+        for _, alias, value, reach in _model_items(object_of_interest):
+            if reach.may_contain_type(type_of_interest):
+                yield from _iter_by_type(value, type_of_interest, _child_path(path, alias))
+    elif type(object_of_interest) is not str:
         try:
             # iterate over any iterable and recurse on its items
             o_iter = iter(object_of_interest)
         except Exception:
             # it is not a dict and not iterable
-            pass
-        else:
-            next_item = next(o_iter, None)
-            while next_item is not None:
-                new_list = find_values_by_type(next_item, type_of_interest)
-                if new_list:
-                    loe.extend(new_list)
-                next_item = next(o_iter, None)
-            return loe
-    return loe
+            return
+        for index, item in enumerate(o_iter):
+            if item is not None:
+                yield from _iter_by_type(item, type_of_interest, _child_path(path, index))
+
+
+def iter_values_by_type(object_of_interest: Any, type_of_interest: Type[TG]) -> Iterator[TG]:
+    """Traverse object and yield the values of specified type."""
+    for value, _ in _iter_by_type(object_of_interest, type_of_interest, None):
+        yield value
+
+
+def find_values_by_type(object_of_interest: Any, type_of_interest: Type[TG]) -> List[TG]:
+    """Traverse object and return list of values of specified type."""
+    return list(iter_values_by_type(object_of_interest, type_of_interest))
 
 
 def has_no_duplicate_values_by_type(object_of_interest: Any, type_of_interest: Type[TG]) -> bool:
     """Determine if duplicate values of type exist in object."""
-    loe = find_values_by_type(object_of_interest, type_of_interest)
-    n = len(loe)
-    if n > 1:
-        for i in range(n - 1):
-            for j in range(i + 1, n):
-                if loe[i] == loe[j]:
-                    return False
-    return True
+    return not _has_duplicate(iter_values_by_type(object_of_interest, type_of_interest))
 
 
-def find_values_by_name(object_of_interest: Any, name_of_interest: str) -> List[Any]:
-    """Traverse object and return list of values of specified name."""
-    loe = []
+def find_duplicate_values_by_type(object_of_interest: Any, type_of_interest: Type[TG]) -> List[Tuple[TG, List[str]]]:
+    """Find the values of type occurring more than once in object, with the JSON path of each occurrence."""
+    return _find_duplicates(_iter_by_type(object_of_interest, type_of_interest, []))
+
+
+def _iter_by_name(object_of_interest: Any, name_of_interest: str,
+                  path: Optional[Path]) -> Iterator[Tuple[Any, Optional[Path]]]:
     if isinstance(object_of_interest, pydantic.BaseModel):
         value = getattr(object_of_interest, name_of_interest, None)
         if value is not None:
-            loe.append(value)
+            field = object_of_interest.__fields__.get(name_of_interest)
+            yield value, _child_path(path, field.alias if field is not None else name_of_interest)
         fields = getattr(object_of_interest, '__fields_set__', None)
         if fields is not None:
-            for field in fields:
-                loe.extend(find_values_by_name(getattr(object_of_interest, field, None), name_of_interest))
+            model_fields = object_of_interest.__fields__
+            reaches = field_reaches(type(object_of_interest))
+            for field_name in fields:
+                if not reaches[field_name].may_contain_name(name_of_interest):
+                    continue
+                alias = '' if field_name == '__root__' else model_fields[field_name].alias
+                yield from _iter_by_name(
+                    getattr(object_of_interest, field_name, None), name_of_interest, _child_path(path, alias)
+                )
     elif type(object_of_interest) is list:
-        for item in object_of_interest:
-            loe.extend(find_values_by_name(item, name_of_interest))
+        for index, item in enumerate(object_of_interest):
+            yield from _iter_by_name(item, name_of_interest, _child_path(path, index))
     elif type(object_of_interest) is dict:
-        for item in object_of_interest.values():
-            loe.extend(find_values_by_name(item, name_of_interest))
-    return loe
+        for key, item in object_of_interest.items():
+            yield from _iter_by_name(item, name_of_interest, _child_path(path, key))
+
+
+def iter_values_by_name(object_of_interest: Any, name_of_interest: str) -> Iterator[Any]:
+    """Traverse object and yield the values of specified name."""
+    for value, _ in _iter_by_name(object_of_interest, name_of_interest, None):
+        yield value
+
+
+def find_values_by_name(object_of_interest: Any, name_of_interest: str) -> List[Any]:
+    """Traverse object and return list of values of specified name."""
+    return list(iter_values_by_name(object_of_interest, name_of_interest))
 
 
 def has_no_duplicate_values_by_name(object_of_interest: Any, name_of_interest: str) -> bool:
     """Determine if duplicate values of type exist in object."""
-    loe = find_values_by_name(object_of_interest, name_of_interest)
-    return len(loe) == len(set(loe))
+    return not _has_duplicate(iter_values_by_name(object_of_interest, name_of_interest))
+
+
+def find_duplicate_values_by_name(object_of_interest: Any, name_of_interest: str) -> List[Tuple[Any, List[str]]]:
+    """Find the values of specified name occurring more than once in object, with the JSON path of each occurrence."""
+    return _find_duplicates(_iter_by_name(object_of_interest, name_of_interest, []))
+
+
+def _hash_key(value: Any) -> Hashable:
+    """Return a hashable key of a value, equal for values comparing equal as the models and collections do."""
+    if isinstance(value, pydantic.BaseModel):
+        # models compare equal by their dict
+        return _hash_key(value.__dict__)
+    # the types mark the keys of dicts and lists apart from those of sets and tuples, which never compare equal
+    if isinstance(value, dict):
+        return dict, frozenset((key, _hash_key(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return list, tuple(_hash_key(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(_hash_key(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_hash_key(item) for item in value)
+    hash(value)
+    return value
+
+
+def _has_duplicate(values: Iterator[Any]) -> bool:
+    """Check whether any value is found more than once, stopping at the first duplicate."""
+    seen: Set[Hashable] = set()
+    unhashable: List[Any] = []
+    for value in values:
+        try:
+            key = _hash_key(value)
+        except TypeError:
+            if value in unhashable:
+                return True
+            unhashable.append(value)
+            continue
+        if key in seen:
+            return True
+        seen.add(key)
+    return False
+
+
+def _find_duplicates(found: Iterator[Tuple[Any, Optional[Path]]]) -> List[Tuple[Any, List[str]]]:
+    """Group the values found by equality and return those found more than once with the paths where they are."""
+    groups: Dict[Hashable, Tuple[Any, List[str]]] = {}
+    unhashable: List[Tuple[Any, List[str]]] = []
+    for value, path in found:
+        location = json_path(path or [])
+        try:
+            key = _hash_key(value)
+        except TypeError:
+            for other, locations in unhashable:
+                if other == value:
+                    locations.append(location)
+                    break
+            else:
+                unhashable.append((value, [location]))
+            continue
+        if key in groups:
+            groups[key][1].append(location)
+        else:
+            groups[key] = (value, [location])
+    return [group for group in list(groups.values()) + unhashable if len(group[1]) > 1]
 
 
-def find_all_attribs_by_regex(object_of_interest: Any, regex_of_interest: str) -> List[Tuple[str, Any]]:
-    """Find all attributes in object matching regex expression."""
-    all_attrs = []
-    p = re.compile(regex_of_interest)
+def _iter_attribs_by_regex(object_of_interest: Any, pattern: Pattern[str]) -> Iterator[Tuple[str, Any]]:
     if isinstance(object_of_interest, pydantic.BaseModel):
         # fields_set has names of fields set when model was initialized
         fields = getattr(object_of_interest, '__fields_set__', None)
         for field in fields:
-            if p.findall(field):
-                all_attrs.append((field, object_of_interest.__dict__[field]))
-            new_attrs = find_all_attribs_by_regex(object_of_interest.__dict__[field], regex_of_interest)
-            all_attrs.extend(new_attrs)
-        return all_attrs
+            if pattern.findall(field):
+                yield field, object_of_interest.__dict__[field]
+            yield from _iter_attribs_by_regex(object_of_interest.__dict__[field], pattern)
     elif type(object_of_interest) is list:
         for item in object_of_interest:
-            new_attrs = find_all_attribs_by_regex(item, regex_of_interest)
-            all_attrs.extend(new_attrs)
-        return all_attrs
+            yield from _iter_attribs_by_regex(item, pattern)
     elif type(object_of_interest) is dict:
         for key, value in object_of_interest.items():
-            if p.findall(key):
-                all_attrs.append((key, value))
-            new_attrs = find_all_attribs_by_regex(value, regex_of_interest)
-            all_attrs.extend(new_attrs)
-        return all_attrs
-    return all_attrs
+            if pattern.findall(key):
+                yield key, value
+            yield from _iter_attribs_by_regex(value, pattern)
 
 
-def regenerate_uuids_in_place(object_of_interest: Any, uuid_lut: Dict[str, str]) -> Tuple[Any, Dict[str, str]]:
-    """Update all uuids in model that require updating.
+def iter_attribs_by_regex(object_of_interest: Any, regex_of_interest: str) -> Iterator[Tuple[str, Any]]:
+    """Traverse object and yield all attributes matching regex expression."""
+    return _iter_attribs_by_regex(object_of_interest, re.compile(regex_of_interest))
 
-    Go through the model and replace all dicts with key == 'uuid' and replace the value with a new uuid4.
-    Build a lookup table of the updates that were made.
-    This function does not update the corresponding refs to those uuid's.  That is done by update_uuid_refs
-    Note that this function needs to be started off with uuid_lut == {}, i.e. an empty dict.
-    After that it recurses and grows the lut.
 
-    Args:
-        object_of_interest: pydantic.BaseModel, list, dict or str will be updated
-        uuid_lut: dict of the growing lut of old:new uuid's.  First call must be made with value {}
+def find_all_attribs_by_regex(object_of_interest: Any, regex_of_interest: str) -> List[Tuple[str, Any]]:
+    """Find all attributes in object matching regex expression."""
+    return list(iter_attribs_by_regex(object_of_interest, regex_of_interest))
 
-    Returns:
-        The updated object_of_interest with new uuid's (but refs to them are not updated)
-        The final lookup table of old:new uuid's
 
-    """
-    uuid_str = 'uuid'
-    if isinstance(object_of_interest, pydantic.BaseModel):
-        # fields_set has names of fields set when model was initialized
-        fields = getattr(object_of_interest, '__fields_set__', None)
-        for field in fields:
-            new_object = None
-            if field == uuid_str:
-                new_object = str(uuid.uuid4())
-                uuid_lut[object_of_interest.__dict__[field]] = new_object
-            else:
-                new_object, uuid_lut = regenerate_uuids_in_place(object_of_interest.__dict__[field], uuid_lut)
-            object_of_interest.__dict__[field] = new_object
-        return object_of_interest, uuid_lut
-    elif type(object_of_interest) is list:
-        new_list = []
-        for item in object_of_interest:
-            new_item, uuid_lut = regenerate_uuids_in_place(item, uuid_lut)
-            new_list.append(new_item)
-        return new_list, uuid_lut
-    elif type(object_of_interest) is dict:
-        new_dict = {}
-        for key, value in object_of_interest.items():
-            if key == uuid_str:
-                new_val = str(uuid.uuid4())
-                new_dict[uuid_str] = new_val
-                uuid_lut[value] = new_val
-            else:
-                new_value, uuid_lut = regenerate_uuids_in_place(value, uuid_lut)
-                new_dict[key] = new_value
-        return new_dict, uuid_lut
-    return object_of_interest, uuid_lut
+def is_uuid_ref_field(name: str) -> bool:
+    """Check whether a field, given by its name or alias, holds a reference to a uuid."""
+    name = name.replace('-', '_')
+    return name in const.UUID_REF_FIELDS or name.endswith('_uuid')
 
 
-def update_new_uuid_refs(object_of_interest: Any, uuid_lut: Dict[str, str]) -> Tuple[Any, int]:
-    """Update all refs to uuids that were changed."""
-    n_refs_updated = 0
-    if isinstance(object_of_interest, pydantic.BaseModel):
-        # fields_set has names of fields set when model was initialized
-        fields = getattr(object_of_interest, '__fields_set__', None)
-        for field in fields:
-            new_object, n_new_updates = update_new_uuid_refs(object_of_interest.__dict__[field], uuid_lut)
-            n_refs_updated += n_new_updates
-            object_of_interest.__dict__[field] = new_object
-        return object_of_interest, n_refs_updated
-    elif type(object_of_interest) is list:
-        new_list = []
-        for item in object_of_interest:
-            new_item, n_new_updates = update_new_uuid_refs(item, uuid_lut)
-            n_refs_updated += n_new_updates
-            new_list.append(new_item)
-        return new_list, n_refs_updated
-    elif type(object_of_interest) is dict:
-        new_dict = {}
-        for key, value in object_of_interest.items():
-            if isinstance(value, str):
-                if value in uuid_lut:
-                    new_dict[key] = uuid_lut[value]
-                    n_refs_updated += 1
-                else:
-                    new_dict[key] = value
-            else:
-                new_value, n_new_updates = update_new_uuid_refs(value, uuid_lut)
-                n_refs_updated += n_new_updates
-                new_dict[key] = new_value
-        return new_dict, n_refs_updated
-    elif isinstance(object_of_interest, str):
-        if object_of_interest in uuid_lut:
-            n_refs_updated += 1
-            return uuid_lut[object_of_interest], n_refs_updated
-    return object_of_interest, n_refs_updated
-
-
-def regenerate_uuids(object_of_interest: Any) -> Tuple[Any, Dict[str, str], int]:
+def is_uuid_ref_list_field(name: str) -> bool:
+    """Check whether a field, given by its name or alias, holds a list of references to uuids."""
+    name = name.replace('-', '_')
+    return name in const.UUID_REF_LIST_FIELDS or name.endswith('_uuids')
+
+
+@functools.lru_cache(maxsize=const.MODEL_TYPE_CACHE_SIZE)
+def _may_hold_uuids(reach: Reach) -> bool:
+    """Check whether uuids or references to uuids may occur within a value."""
+    return reach.is_open or any(
+        name == 'uuid' or is_uuid_ref_field(name) or is_uuid_ref_list_field(name) or name in const.UUID_KEYED_FIELDS
+        or name in const.UUID_REF_KEYED_FIELDS for name in reach.names
+    )
+
+
+class _UuidRegenerator:
+    """Regeneration of the uuids of an object with a single traversal, updating the references to them in place.
+
+    The uuids are replaced as they are found while the references, which may precede the uuid they refer to, are
+    recorded with their container and updated once all the uuids are known.
+    """
+
+    def __init__(self, seed: Optional[str]) -> None:
+        self.uuid_lut: Dict[str, str] = {}
+        self._namespace = None if seed is None else uuid.uuid5(_SEED_NAMESPACE, seed)
+        # container and key within the container of each reference found
+        self._refs: List[Tuple[Any, Any]] = []
+        # container and key within the container of each collection keyed by references
+        self._keyed_refs: List[Tuple[Dict[Any, Any], Any]] = []
+
+    def _regenerate(self, old_uuid: str) -> str:
+        if self._namespace is None:
+            new_uuid = str(uuid.uuid4())
+        else:
+            # OSCAL requires version 4 uuids, hence the version bits of the name based uuid are set accordingly
+            new_uuid = str(uuid.UUID(bytes=uuid.uuid5(self._namespace, old_uuid).bytes, version=4))
+        self.uuid_lut[old_uuid] = new_uuid
+        return new_uuid
+
+    def _add_ref(self, container: Any, key: Any) -> None:
+        value = container[key]
+        if isinstance(value, pydantic.BaseModel):
+            # a uuid wrapped in a model with a custom root, e.g. a party uuid
+            container, key = value.__dict__, '__root__'
+            if key not in container:
+                return
+        self._refs.append((container, key))
+
+    def walk(self, node: Any) -> None:
+        if isinstance(node, pydantic.BaseModel):
+            self._walk_fields(node.__dict__, field_reaches(type(node)))
+        elif type(node) is dict:
+            self._walk_fields(node, None)
+        elif type(node) is list:
+            for item in node:
+                self.walk(item)
+
+    def _walk_fields(self, fields: Dict[Any, Any], reaches: Optional[Dict[str, Reach]]) -> None:
+        """Walk the fields of a model, or the items of a dict whose keys are the aliases of the fields."""
+        for key, value in fields.items():
+            if value is None or not isinstance(key, str):
+                continue
+            name = key if reaches is not None else key.replace('-', '_')
+            if name == 'uuid':
+                if isinstance(value, str):
+                    fields[key] = self._regenerate(value)
+                continue
+            if is_uuid_ref_field(name):
+                self._add_ref(fields, key)
+                continue
+            if is_uuid_ref_list_field(name) and type(value) is list:
+                for index in range(len(value)):
+                    self._add_ref(value, index)
+                continue
+            if type(value) is dict and name in const.UUID_KEYED_FIELDS:
+                value = {self._regenerate(item_key): item for item_key, item in value.items()}
+                fields[key] = value
+            elif type(value) is dict and name in const.UUID_REF_KEYED_FIELDS:
+                self._keyed_refs.append((fields, key))
+            if reaches is None or _may_hold_uuids(reaches[key]):
+                self.walk(value)
+
+    def update_refs(self) -> int:
+        """Update the references to the uuids regenerated and return the number of references updated."""
+        n_refs_updated = 0
+        for container, key in self._refs:
+            new_uuid = self.uuid_lut.get(container[key])
+            if new_uuid is not None:
+                container[key] = new_uuid
+                n_refs_updated += 1
+        for container, key in self._keyed_refs:
+            collection = container[key]
+            n_keys_updated = len([item_key for item_key in collection if item_key in self.uuid_lut])
+            if n_keys_updated:
+                container[key] = {self.uuid_lut.get(item_key, item_key): item for item_key, item in collection.items()}
+                n_refs_updated += n_keys_updated
+        return n_refs_updated
+
+
+def regenerate_uuids(object_of_interest: Any, seed: Optional[str] = None) -> Tuple[Any, Dict[str, str], int]:
     """Regenerate all uuids in object and update corresponding references.
 
-    Find all dicts with key == 'uuid' and replace the value with a new uuid4.
-    Build a corresponding lookup table as you go, of old:new uuid values.
-    Then make a second pass through the object and replace all string values
-    present in the lookup table with the new value.
+    Replace the value of every uuid field, and the keys of the collections keyed by uuid, with a new uuid4, building a
+    lookup table of old:new uuid values in a single traversal of the object, which is updated in place. The reference
+    fields, i.e. those of const.UUID_REF_FIELDS and const.UUID_REF_LIST_FIELDS, e.g. member_of_organizations, and any
+    other *_uuid and *_uuids field, and the keys of the collections keyed by references, holding an old uuid are then
+    updated to the new one, whereas other strings are left as they are.
+
+    With a seed, the new uuids are derived from the old ones and the seed (as name based uuid5 in a namespace seeded
+    with the seed, with the version bits of a uuid4), so that regenerating the uuids of the same object with the
+    same seed always gives the same uuids.
 
     Args:
-        object_of_interest: pydantic.BaseModel, list, dict or str will be updated
+        object_of_interest: pydantic.BaseModel, list or dict, which is updated in place
+        seed: The seed of deterministic uuids, or None for random uuids
 
     Returns:
         The updated object with new uuid's and refs
         The final lookup table of old:new uuid's
         A count of the number of refs that were updated
     """
-    new_object, uuid_lut = regenerate_uuids_in_place(object_of_interest, {})
-    new_object, n_refs_updated = update_new_uuid_refs(new_object, uuid_lut)
-    return new_object, uuid_lut, n_refs_updated
+    regenerator = _UuidRegenerator(seed)
+    regenerator.walk(object_of_interest)
+    n_refs_updated = regenerator.update_refs()
+    return object_of_interest, regenerator.uuid_lut, n_refs_updated
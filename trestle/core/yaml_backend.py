@@ -0,0 +1,103 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+YAML encoding and decoding of OSCAL models.
+
+Models are converted directly into the plain data their JSON form would decode to, i.e. with None values excluded and
+fields keyed by alias, and emitted by the libyaml based dumper when PyYAML was built with it, without encoding and
+decoding the JSON text. The keys are sorted as before, but libyaml may break long quoted strings over lines at other
+points than the pure python emitter, which does not alter the content.
+"""
+
+import datetime
+import enum
+from typing import Any, Callable, IO, Optional
+
+from pydantic import BaseModel
+from pydantic.json import custom_pydantic_encoder
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper, SafeLoader  # type: ignore
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def load(stream: Any) -> Any:
+    """Decode YAML content from a string, bytes or file."""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump(data: Any, stream: Optional[IO[str]] = None) -> Optional[str]:
+    """Encode plain data as YAML, to the stream if given, otherwise as a returned string."""
+    return yaml.dump(data, stream, Dumper=SafeDumper)
+
+
+def to_yaml_data(obj: Any, encoder: Optional[Callable[[Any], Any]] = None) -> Any:
+    """
+    Convert a model, or any value holding models, into the plain data of its JSON form.
+
+    Args:
+        obj: The value to convert.
+        encoder: The fallback encoder of the values that are not plain data, as used by the json() method of the model.
+            Defaults to the encoder of obj if it is a model, otherwise to the pydantic encoder.
+
+    Returns:
+        The value as dicts, lists, strings, numbers, booleans and None, with the None fields of the models excluded.
+    """
+    if encoder is None:
+        encoder = obj.__json_encoder__ if isinstance(obj, BaseModel) else _default_encoder
+    return _convert(obj, encoder)
+
+
+def _default_encoder(value: Any) -> Any:
+    return custom_pydantic_encoder({}, value)
+
+
+def _convert(value: Any, encoder: Callable[[Any], Any]) -> Any:
+    value_type = type(value)
+    if value_type in _PLAIN_TYPES:
+        return value
+    if isinstance(value, BaseModel):
+        if value.__custom_root_type__:
+            return _convert(value.__dict__['__root__'], encoder)
+        data = {}
+        values = value.__dict__
+        for name, field in value.__fields__.items():
+            field_value = values.get(name)
+            if field_value is not None:
+                data[field.alias] = _convert(field_value, encoder)
+        return data
+    if isinstance(value, dict):
+        return {_convert(key, encoder): _convert(item, encoder) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_convert(item, encoder) for item in value]
+    if isinstance(value, enum.Enum) or isinstance(value, datetime.date):
+        return _convert(encoder(value), encoder)
+    # subclasses of the plain types, e.g. AnyUrl, are written as their base type like json.dumps does
+    if isinstance(value, str):
+        return str.__str__(value)
+    if isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, int):
+        return int.__int__(value)
+    if isinstance(value, float):
+        return float.__float__(value)
+    return _convert(encoder(value), encoder)
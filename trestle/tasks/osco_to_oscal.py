@@ -22,9 +22,8 @@ import pathlib
 import traceback
 from typing import Any, Dict, Optional
 
-import yaml
-
 import trestle.core.const as const
+from trestle.core import yaml_backend
 from trestle.tasks.base_task import TaskBase
 from trestle.tasks.base_task import TaskOutcome
 from trestle.utils import osco
@@ -213,7 +212,7 @@ class OscoToOscal(TaskBase):
         collection = {}
         #  handle OSCO individual yaml files (just one pairing)
         if ifile.suffix in ['.yml', '.yaml']:
-            ydict = yaml.load(ifile.open('r+'), Loader=yaml.Loader)
+            ydict = yaml_backend.load(ifile.open('r+'))
             oname = ifile.stem+'.json'
             logger.debug(f'========== <{oname}> ==========')
             logger.debug(ydict)
@@ -270,7 +269,7 @@ class OscoToOscal(TaskBase):
         """Get metadata, if it exists."""
         metadata = default_metadata
         try:
-            metadata = yaml.load(mfile.open('r+'),  Loader=yaml.Loader)
+            metadata = yaml_backend.load(mfile.open('r+'))
         except:
             logger.debug(traceback.format_exc())
         return metadata
@@ -15,18 +15,16 @@
 # limitations under the License.
 """Common file system utilities."""
 
-import json
 import logging
 import os
 import pathlib
-from typing import Any, Dict, List, Optional, Tuple, Type, cast
-
-from pydantic import create_model
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 from trestle.core import const
 from trestle.core import err
+from trestle.core import json_backend
 from trestle.core import utils
-from trestle.core.base_model import OscalBaseModel
+from trestle.core.base_model import OscalBaseModel, create_collection_wrapper_type
 from trestle.core.err import TrestleError
 from trestle.core.models.file_content_type import FileContentType
 
@@ -204,9 +202,8 @@ def get_stripped_contextual_model(path: pathlib.Path = None,
         malias = model_alias.split('.')[-1]
         class_name = utils.alias_to_classname(malias, 'json')
         logger.debug(f'collection field type class name {class_name} and alias {malias}')
-        model_type = create_model(class_name, __base__=OscalBaseModel, __root__=(singular_model_type, ...))
+        model_type = create_collection_wrapper_type(class_name, singular_model_type)
         logger.debug(f'model_type created: {model_type}')
-        model_type = cast(Type[OscalBaseModel], model_type)
         return model_type, model_alias
 
     malias = model_alias.split('.')[-1]
@@ -279,7 +276,7 @@ def load_file(file_name: pathlib.Path) -> Dict[str, Any]:
         if content_type == FileContentType.YAML:
             return yaml.load(f, yaml.FullLoader)
         elif content_type == FileContentType.JSON:
-            return json.load(f)
+            return json_backend.loads(f.read())
 
 
 def get_singular_alias(alias_path: str, contextual_mode: bool = False) -> str:
@@ -15,41 +15,73 @@
 # limitations under the License.
 """Module to load distributed model."""
 
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 from trestle.core.base_model import OscalBaseModel
 from trestle.core.err import TrestleNotFoundError
 from trestle.core.models.file_content_type import FileContentType
-from trestle.utils import fs
+from trestle.utils.project_index import ProjectIndex
 
+_LoadResult = Tuple[Type[OscalBaseModel], str, Any]
 
-def _load_list(filepath: Path) -> Tuple[Type[OscalBaseModel], str, List[OscalBaseModel]]:
-    """Given path to a directory of list(array) models, load the distributed models."""
-    aliases_not_to_be_stripped = []
-    instances_to_be_merged: List[OscalBaseModel] = []
-    # TODO: FIXME: fs.get_stripped_contextual_model fails without absolute file path!!! FIX IT!!
-    collection_model_type, collection_model_alias = fs.get_stripped_contextual_model(filepath.resolve())
 
-    for path in sorted(Path.iterdir(filepath)):
+def _is_leaf_fragment(path: Path) -> bool:
+    """Check whether the path is a fragment file that has not been decomposed any further."""
+    return path.is_file() and not path.with_name(path.stem).exists()
+
 
-        # ASSUMPTION HERE: if it is a directory, there's a file that can not be decomposed further.
-        if path.is_dir():
-            continue
-        model_type, model_alias, model_instance = load_distributed(path)
+def _load_paths(paths: List[Path], executor: Optional[Executor], trusted: bool) -> List[_LoadResult]:
+    """Load sibling paths, in the given order, optionally loading leaf fragments concurrently.
+
+    Only leaf fragment files are handed to the executor since they never recurse, so workers cannot block on each
+    other. Decomposed paths are loaded on the calling thread and share the same executor for their own children.
+    """
+    if executor is None:
+        return [load_distributed(path, trusted=trusted) for path in paths]
+
+    futures = {
+        path: executor.submit(load_distributed, path, trusted=trusted)
+        for path in paths
+        if _is_leaf_fragment(path)
+    }
+    results: List[_LoadResult] = []
+    for path in paths:
+        if path in futures:
+            results.append(futures[path].result())
+        else:
+            results.append(_load_distributed(path, None, executor, trusted))
+    return results
+
+
+def _load_list(filepath: Path,
+               executor: Optional[Executor] = None,
+               trusted: bool = False) -> Tuple[Type[OscalBaseModel], str, List[OscalBaseModel]]:
+    """Given path to a directory of list(array) models, load the distributed models."""
+    collection_model_type, collection_model_alias = ProjectIndex.for_path(filepath).get_stripped_contextual_model(
+        filepath
+    )
 
-        instances_to_be_merged.append(model_instance)
-        aliases_not_to_be_stripped.append(model_alias.split('.')[-1])
+    # ASSUMPTION HERE: if it is a directory, there's a file that can not be decomposed further.
+    paths = [path for path in sorted(Path.iterdir(filepath)) if not path.is_dir()]
+    instances_to_be_merged: List[OscalBaseModel] = [
+        model_instance for _, _, model_instance in _load_paths(paths, executor, trusted)
+    ]
 
     return collection_model_type, collection_model_alias, instances_to_be_merged
 
 
-def _load_dict(filepath: Path) -> Tuple[Type[OscalBaseModel], str, Dict[str, OscalBaseModel]]:
+def _load_dict(filepath: Path,
+               executor: Optional[Executor] = None,
+               trusted: bool = False) -> Tuple[Type[OscalBaseModel], str, Dict[str, OscalBaseModel]]:
     """Given path to a directory of additionalProperty(dict) models, load the distributed models."""
     model_dict: Dict[str, OscalBaseModel] = {}
-    collection_model_type, collection_model_alias = fs.get_stripped_contextual_model(filepath.resolve())
-    for path in sorted(Path.iterdir(filepath)):
-        model_type, model_alias, model_instance = load_distributed(path)
+    collection_model_type, collection_model_alias = ProjectIndex.for_path(filepath).get_stripped_contextual_model(
+        filepath
+    )
+    paths = sorted(Path.iterdir(filepath))
+    for path, (_, _, model_instance) in zip(paths, _load_paths(paths, executor, trusted)):
         field_name = path.parts[-1].split('__')[0]
         model_dict[field_name] = model_instance
 
@@ -58,7 +90,10 @@ def _load_dict(filepath: Path) -> Tuple[Type[OscalBaseModel], str, Dict[str, Osc
 
 def load_distributed(
     file_path: Path,
-    collection_type: Optional[Type[Any]] = None
+    collection_type: Optional[Type[Any]] = None,
+    parallel: bool = False,
+    max_workers: Optional[int] = None,
+    trusted: bool = False
 ) -> Tuple[Type[OscalBaseModel], str, Union[OscalBaseModel, List[OscalBaseModel], Dict[str, OscalBaseModel]]]:
     """
     Given path to a model, load the model.
@@ -70,6 +105,12 @@ def load_distributed(
         collection_type (Type[Any], optional): The type of collection model, if it is a collection model.
             typing.List if the model is a list, typing.Dict if the model is additionalProperty.
             Defaults to None.
+        parallel (bool, optional): Whether sibling fragment files are read and parsed concurrently by a pool of
+            worker threads. The merged model is assembled in the same order as a sequential load. Defaults to False.
+        max_workers (int, optional): The maximum number of worker threads used when parallel is True.
+            Defaults to the ThreadPoolExecutor default.
+        trusted (bool, optional): Whether the files that still match the content stamp recorded when trestle wrote
+            them are loaded without validation. See OscalBaseModel.oscal_read. Defaults to False.
 
     Returns:
         Tuple[Type[OscalBaseModel], str, Union[OscalBaseModel, List[OscalBaseModel], Dict[str, OscalBaseModel]]]: Return
@@ -77,6 +118,16 @@ def load_distributed(
             and Instance of the Model. If the model is decomposed/split/distributed, the instance of the model contains
             the decomposed models loaded recursively.
     """
+    if not parallel:
+        return _load_distributed(file_path, collection_type, None, trusted)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return _load_distributed(file_path, collection_type, executor, trusted)
+
+
+def _load_distributed(
+    file_path: Path, collection_type: Optional[Type[Any]], executor: Optional[Executor], trusted: bool
+) -> _LoadResult:
+    """Load the model at file_path, handing leaf fragments to the executor if one is provided."""
     # if trying to load file that does not exist, load path instead
     if not file_path.exists():
         file_path = file_path.with_name(file_path.stem)
@@ -86,21 +137,22 @@ def load_distributed(
 
     # If the path contains a list type model
     if collection_type is list:
-        return _load_list(file_path)
+        return _load_list(file_path, executor, trusted)
 
     # If the path contains a dict type model
     if collection_type is dict:
-        return _load_dict(file_path)
+        return _load_dict(file_path, executor, trusted)
 
     # Get current model
-    primary_model_type, primary_model_alias = fs.get_stripped_contextual_model(file_path.resolve())
+    project_index = ProjectIndex.for_path(file_path)
+    primary_model_type, primary_model_alias = project_index.get_stripped_contextual_model(file_path)
     primary_model_instance: Type[OscalBaseModel] = None
 
     # is this an attempt to load an actual json or yaml file?
     content_type = FileContentType.path_to_content_type(file_path)
     # if file is sought but it doesn't exist, ignore and load as decomposed model
     if FileContentType.is_readable_file(content_type) and file_path.exists():
-        primary_model_instance = primary_model_type.oscal_read(file_path)
+        primary_model_instance = primary_model_type.oscal_read(file_path, trusted)
     # Is model decomposed?
     decomposed_dir = file_path.with_name(file_path.stem)
 
@@ -108,15 +160,15 @@ def load_distributed(
         aliases_not_to_be_stripped = []
         instances_to_be_merged: List[OscalBaseModel] = []
 
+        paths_to_be_loaded: List[Path] = []
+        collection_dirs: Dict[Path, Type[Any]] = {}
         for path in sorted(Path.iterdir(decomposed_dir)):
 
             if path.is_file():
-                model_type, model_alias, model_instance = load_distributed(path)
-                aliases_not_to_be_stripped.append(model_alias.split('.')[-1])
-                instances_to_be_merged.append(model_instance)
+                paths_to_be_loaded.append(path)
 
             elif path.is_dir():
-                model_type, model_alias = fs.get_stripped_contextual_model(path.resolve())
+                model_type, model_alias = project_index.get_stripped_contextual_model(path)
                 # Only load the directory if it is a collection model. Otherwise do nothing - it gets loaded when
                 # iterating over the model file
 
@@ -129,16 +181,26 @@ def load_distributed(
 
                 if model_type.is_collection_container():
                     # This directory is a decomposed List or Dict
-                    collection_type = model_type.get_collection_type()
-                    model_type, model_alias, model_instance = load_distributed(path, collection_type)
-                    aliases_not_to_be_stripped.append(model_alias.split('.')[-1])
-                    instances_to_be_merged.append(model_instance)
+                    paths_to_be_loaded.append(path)
+                    collection_dirs[path] = model_type.get_collection_type()
+
+        file_paths = [path for path in paths_to_be_loaded if path not in collection_dirs]
+        file_results = dict(zip(file_paths, _load_paths(file_paths, executor, trusted)))
+        for path in paths_to_be_loaded:
+            if path in collection_dirs:
+                model_type, model_alias, model_instance = _load_distributed(
+                    path, collection_dirs[path], executor, trusted
+                )
+            else:
+                model_type, model_alias, model_instance = file_results[path]
+            aliases_not_to_be_stripped.append(model_alias.split('.')[-1])
+            instances_to_be_merged.append(model_instance)
         primary_model_dict = {}
         if primary_model_instance is not None:
             primary_model_dict = primary_model_instance.__dict__
 
-        merged_model_type, merged_model_alias = fs.get_stripped_contextual_model(
-            file_path.resolve(), aliases_not_to_be_stripped)
+        merged_model_type, merged_model_alias = project_index.get_stripped_contextual_model(
+            file_path, aliases_not_to_be_stripped)
 
         # The following use of top_level is to allow loading of a top level model by name only, e.g. MyCatalog
         # There may be a better overall way to approach this.
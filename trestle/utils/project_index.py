@@ -0,0 +1,268 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2021 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Index of the contextual model types of the files and directories within a trestle project model.
+
+fs.get_contextual_model_type and fs.get_stripped_contextual_model resolve the project root and walk the model
+type hierarchy from scratch for every path. The ProjectIndex walks a model directory once, memoizes the model type and
+alias of every path and caches the directory listings used to decide which fields are stripped, so that repeated
+lookups by the loaders and the split, merge and validate commands are dictionary lookups.
+"""
+
+import logging
+import os
+import pathlib
+import stat
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Type
+
+from trestle.core import const
+from trestle.core import utils
+from trestle.core.base_model import OscalBaseModel, create_collection_wrapper_type
+from trestle.core.err import TrestleError
+from trestle.utils import fs
+
+logger = logging.getLogger(__name__)
+
+# A directory listing read less than this long after the directory was last modified is not trusted, since a change
+# within the granularity of the filesystem timestamps would not alter the mtime.
+RACY_LISTING_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+class _DirListing:
+    """Names of the entries of a directory, with the directory mtime and the time they were read at."""
+
+    def __init__(self, mtime_ns: int, scanned_ns: int, entries: Dict[str, bool]) -> None:
+        self.mtime_ns = mtime_ns
+        self.scanned_ns = scanned_ns
+        # map of entry name to whether the entry is a directory
+        self.entries = entries
+
+    def is_current(self, mtime_ns: int) -> bool:
+        """Check whether the listing is still valid for a directory with the given mtime."""
+        return self.mtime_ns == mtime_ns and self.scanned_ns - self.mtime_ns > RACY_LISTING_WINDOW_NS
+
+
+class ProjectIndex:
+    """Index of the contextual model types within a trestle project model directory, e.g. catalogs/mycatalog."""
+
+    _indexes: Dict[pathlib.Path, 'ProjectIndex'] = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, model_path: pathlib.Path) -> None:
+        """Initialize the index by walking the model directory.
+
+        Args:
+            model_path: Path of the model directory within a trestle project, e.g. catalogs/mycatalog.
+
+        Raises:
+            TrestleError: If the path is not a model directory of a trestle project.
+        """
+        model_path = model_path.resolve()
+        root_path = fs.get_trestle_project_root(model_path)
+        if root_path is None or not fs.is_valid_project_model_path(model_path):
+            raise TrestleError(f'Trestle project model not found at {model_path}')
+        relative_path = model_path.relative_to(root_path)
+        if len(relative_path.parts) != 2:
+            raise TrestleError(f'{model_path} is not the directory of a trestle project model')
+
+        self._model_path = model_path
+        module_name = const.MODEL_TYPE_TO_MODEL_MODULE[relative_path.parts[0]]
+        root_model_type, self._root_alias = utils.get_root_model(module_name)
+        self._entries: Dict[pathlib.Path, Tuple[Type[OscalBaseModel], str]] = {
+            model_path: (root_model_type, self._root_alias)
+        }
+        self._listings: Dict[pathlib.Path, _DirListing] = {}
+        self.refresh()
+
+    @classmethod
+    def for_path(cls, path: pathlib.Path) -> 'ProjectIndex':
+        """Return the shared index of the project model containing the path, creating it on first use.
+
+        Args:
+            path: Path of a file or directory within a trestle project model.
+
+        Returns:
+            The index of the model directory the path belongs to.
+
+        Raises:
+            TrestleError: If the path is not within a trestle project model.
+        """
+        abs_path = cls._absolute(path)
+        for candidate in [abs_path, *abs_path.parents]:
+            index = cls._indexes.get(candidate)
+            if index is not None:
+                if index.model_path.is_dir():
+                    return index
+                cls._indexes.pop(candidate, None)
+                break
+
+        model_path = fs.get_project_model_path(path)
+        if model_path is None:
+            raise TrestleError(f'Trestle project model not found at {path}')
+        with cls._indexes_lock:
+            index = cls._indexes.get(model_path)
+            if index is None:
+                index = cls(model_path)
+                cls._indexes[model_path] = index
+        return index
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop all the shared indexes."""
+        with cls._indexes_lock:
+            cls._indexes.clear()
+
+    @property
+    def model_path(self) -> pathlib.Path:
+        """Return the model directory covered by the index."""
+        return self._model_path
+
+    def refresh(self) -> None:
+        """Re-read the listings of the directories of the model that changed since they were last read."""
+        for dir_path in list(self._listings.keys()):
+            if not dir_path.is_dir():
+                del self._listings[dir_path]
+        pending: List[pathlib.Path] = [self._model_path]
+        while pending:
+            dir_path = pending.pop()
+            entries = self._get_listing(dir_path)
+            if entries is None:
+                continue
+            pending.extend(dir_path / name for name, is_dir in entries.items() if is_dir)
+
+    def get_contextual_model_type(self, path: pathlib.Path) -> Tuple[Type[OscalBaseModel], str]:
+        """Get the full contextual model class and full jsonpath for the alias of the path.
+
+        This is the indexed equivalent of fs.get_contextual_model_type.
+        """
+        return self._get_entry(self._normalize(path))
+
+    def get_stripped_contextual_model(
+        self,
+        path: pathlib.Path,
+        aliases_not_to_be_stripped: Optional[List[str]] = None
+    ) -> Tuple[Type[OscalBaseModel], str]:
+        """Get the stripped contextual model class and alias of the path.
+
+        This is the indexed equivalent of fs.get_stripped_contextual_model.
+        """
+        path = self._normalize(path)
+        if aliases_not_to_be_stripped is None:
+            aliases_not_to_be_stripped = []
+
+        singular_model_type, model_alias = self._get_entry(path)
+        malias = model_alias.split('.')[-1]
+
+        # Stripped models do not apply to collection types such as List[] and Dict{}
+        if utils.is_collection_field_type(singular_model_type):
+            class_name = utils.alias_to_classname(malias, 'json')
+            return create_collection_wrapper_type(class_name, singular_model_type), model_alias
+
+        if self._is_dir(path) and malias != fs.extract_alias(path):
+            split_subdir = path / malias
+        else:
+            split_subdir = path.parent / path.with_suffix('').name
+
+        aliases_to_be_stripped = set()
+        entries = self._get_listing(split_subdir)
+        if entries is not None:
+            for name in entries:
+                alias = fs.extract_alias(pathlib.Path(name))
+                if alias not in aliases_not_to_be_stripped:
+                    aliases_to_be_stripped.add(alias)
+
+        if len(aliases_to_be_stripped) > 0:
+            model_type = singular_model_type.create_stripped_model_type(
+                stripped_fields_aliases=list(aliases_to_be_stripped)
+            )
+            return model_type, model_alias
+        return singular_model_type, model_alias
+
+    @staticmethod
+    def _absolute(path: pathlib.Path) -> pathlib.Path:
+        """Make the path absolute and normalized without touching the filesystem."""
+        if not path.is_absolute():
+            path = pathlib.Path.cwd() / path
+        return pathlib.Path(os.path.normpath(path))
+
+    def _contains(self, path: pathlib.Path) -> bool:
+        return path == self._model_path or self._model_path in path.parents
+
+    def _normalize(self, path: pathlib.Path) -> pathlib.Path:
+        """Return the absolute path, resolving it only if it does not lexically belong to the model."""
+        abs_path = self._absolute(path)
+        if not self._contains(abs_path):
+            abs_path = path.resolve()
+            if not self._contains(abs_path):
+                raise TrestleError(f'{path} is not within the trestle project model {self._model_path}')
+        return abs_path
+
+    def _get_entry(self, path: pathlib.Path) -> Tuple[Type[OscalBaseModel], str]:
+        """Return the memoized model type and full alias of a normalized path, deriving it from its parent."""
+        entry = self._entries.get(path)
+        if entry is not None:
+            return entry
+
+        model_type, full_alias = self._get_entry(path.parent)
+        alias = fs.extract_alias(path)
+        if path.parent != self._model_path or alias != self._root_alias:
+            full_alias = f'{full_alias}.{alias}'
+            if utils.is_collection_field_type(model_type):
+                model_type = utils.get_inner_type(model_type)
+            else:
+                model_type = model_type.alias_to_field_map()[alias].outer_type_
+        entry = (model_type, full_alias)
+        self._entries[path] = entry
+        return entry
+
+    def _is_dir(self, path: pathlib.Path) -> bool:
+        entries = self._get_listing(path.parent)
+        if entries is None:
+            return False
+        return entries.get(path.name, False)
+
+    def _get_listing(self, dir_path: pathlib.Path) -> Optional[Dict[str, bool]]:
+        """Return the entries of the directory, re-reading them only if the directory changed."""
+        try:
+            dir_stat = os.stat(dir_path)
+        except OSError:
+            self._listings.pop(dir_path, None)
+            return None
+        if not stat.S_ISDIR(dir_stat.st_mode):
+            return None
+
+        listing = self._listings.get(dir_path)
+        if listing is not None and listing.is_current(dir_stat.st_mtime_ns):
+            return listing.entries
+
+        scanned_ns = time.time_ns()
+        entries: Dict[str, bool] = {}
+        with os.scandir(dir_path) as it:
+            for dir_entry in it:
+                entries[dir_entry.name] = dir_entry.is_dir()
+        logger.debug(f'project index read listing of {dir_path}')
+        self._listings[dir_path] = _DirListing(dir_stat.st_mtime_ns, scanned_ns, entries)
+        if not self._contains(dir_path):
+            return entries
+        for name in entries:
+            try:
+                self._get_entry(dir_path / name)
+            except (AttributeError, KeyError, TrestleError):
+                # not a model file or directory, e.g. .keep
+                pass
+        return entries
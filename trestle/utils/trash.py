@@ -15,6 +15,7 @@
 # limitations under the License.
 """Trestle trash module."""
 
+import os
 import pathlib
 from shutil import copyfile
 from typing import List, Optional
@@ -133,6 +134,13 @@ def store_file(file_path: pathlib.Path, delete_source: bool = False) -> None:
 
     trash_file_path = to_trash_file_path(file_path)
     trash_file_path.parent.mkdir(exist_ok=True, parents=True)
+    if delete_source:
+        try:
+            # the trash is within the trestle project, so the file can usually be renamed rather than copied
+            os.replace(file_path, trash_file_path)
+            return
+        except OSError:
+            pass
     copyfile(file_path, trash_file_path)
 
     if delete_source:
@@ -179,6 +187,12 @@ def recover_file(file_path: pathlib.Path, delete_trash: bool = False) -> None:
         raise AssertionError(f'Specified path "{file_path}" could not be found in trash')
 
     file_path.parent.mkdir(exist_ok=True, parents=True)
+    if delete_trash:
+        try:
+            os.replace(trash_file_path, file_path)
+            return
+        except OSError:
+            pass
     copyfile(trash_file_path, file_path)
 
     if delete_trash: